@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Adaptive batching simulation: static vs. SLO-driven batch parameters.
+
+Replays open-loop Poisson traffic with a step profile and a bursty profile
+against BatchManager backed by a simulated model (service time
+fixed + per_item * batch_size, run on the inference thread). The same
+traffic is run with the static api.py defaults and with
+AdaptiveBatchController, and per-window p99 latency is printed next to
+the controller's chosen max_batch_size / max_wait_time so convergence
+can be followed.
+
+Usage:
+    python benchmarks/bench_adaptive_batching.py
+    python benchmarks/bench_adaptive_batching.py --slo-ms 150 --profile step
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+import torch
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(SCRIPT_DIR), "src"))
+
+from batch_manager import BatchManager  # noqa: E402
+from inference_executor import InferenceExecutor  # noqa: E402
+from adaptive_batching import AdaptiveBatchController, percentile  # noqa: E402
+
+WINDOW = 2.5
+BATCH_SIZE_LIMIT = 32
+
+# (duration seconds, arrival rate) segments
+PROFILES = {
+    'step': [(10, 20), (15, 180), (10, 20)],
+    'bursty': [(1, 300), (2, 15)] * 7,
+}
+
+
+class SimulatedModel:
+    """Service time grows linearly with batch size, like ResNet-50 on CPU."""
+    
+    def __init__(self, fixed_ms: float = 15.0, per_item_ms: float = 4.0):
+        self.fixed = fixed_ms / 1000
+        self.per_item = per_item_ms / 1000
+    
+    def __call__(self, batch: torch.Tensor) -> torch.Tensor:
+        time.sleep(self.fixed + self.per_item * batch.shape[0])
+        return torch.zeros(batch.shape[0], 1000)
+
+
+async def run_profile(segments, adaptive: bool, slo: float, seed: int = 0):
+    """Replay one traffic profile; returns per-window rows."""
+    if adaptive:
+        manager = BatchManager(max_batch_size=BATCH_SIZE_LIMIT, max_wait_time=0.05,
+                               executor=InferenceExecutor(num_threads=1))
+        controller = AdaptiveBatchController(manager, latency_slo=slo, interval=0.5)
+        controller.start()
+    else:
+        manager = BatchManager(max_batch_size=8, max_wait_time=0.05,
+                               executor=InferenceExecutor(num_threads=1))
+        controller = None
+    manager.start(SimulatedModel())
+    
+    rng = random.Random(seed)
+    tensor = torch.zeros(3, 224, 224)
+    completions = []  # (completion time, latency)
+    rows = []
+    
+    async def request():
+        sent = time.monotonic()
+        await manager.add_to_batch(tensor, "sim")
+        done = time.monotonic()
+        completions.append((done, done - sent))
+    
+    async def sample_windows(start):
+        while True:
+            await asyncio.sleep(WINDOW)
+            now = time.monotonic()
+            window = [lat for t, lat in completions if t > now - WINDOW]
+            rows.append({
+                't': now - start,
+                'p99': percentile(window, 99) if window else 0.0,
+                'done': len(window) / WINDOW,
+                'batch': manager.max_batch_size,
+                'wait': manager.max_wait_time,
+            })
+    
+    start = time.monotonic()
+    sampler = asyncio.create_task(sample_windows(start))
+    tasks = []
+    for duration, rate in segments:
+        segment_end = time.monotonic() + duration
+        while time.monotonic() < segment_end:
+            tasks.append(asyncio.create_task(request()))
+            await asyncio.sleep(rng.expovariate(rate))
+    await asyncio.gather(*tasks)
+    
+    sampler.cancel()
+    if controller:
+        controller.stop()
+    manager.stop()
+    
+    overall = percentile([lat for _, lat in completions], 99)
+    return rows, overall
+
+
+def offered_rate(segments, t: float) -> float:
+    elapsed = 0.0
+    for duration, rate in segments:
+        elapsed += duration
+        if t <= elapsed:
+            return rate
+    return segments[-1][1]
+
+
+async def main(profiles, slo: float):
+    for name in profiles:
+        segments = PROFILES[name]
+        print("="*86)
+        print(f"Profile: {name}  (SLO p99 = {slo*1000:.0f}ms, window = {WINDOW}s)")
+        print("="*86)
+        
+        static_rows, static_p99 = await run_profile(segments, adaptive=False, slo=slo)
+        adaptive_rows, adaptive_p99 = await run_profile(segments, adaptive=True, slo=slo)
+        
+        print(f"{'t':>6} | {'offered':>7} | {'static p99':>10} | {'adaptive p99':>12} | "
+              f"{'batch':>5} | {'wait':>7} | {'served':>7}")
+        print("-"*86)
+        for static, adaptive in zip(static_rows, adaptive_rows):
+            print(f"{adaptive['t']:>5.1f}s | {offered_rate(segments, adaptive['t'] - WINDOW / 2):>5.0f}/s | "
+                  f"{static['p99']*1000:>8.0f}ms | {adaptive['p99']*1000:>10.0f}ms | "
+                  f"{adaptive['batch']:>5} | {adaptive['wait']*1000:>5.1f}ms | {adaptive['done']:>5.0f}/s")
+        print("-"*86)
+        print(f"Overall p99: static {static_p99*1000:.0f}ms, adaptive {adaptive_p99*1000:.0f}ms")
+        print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--profile", choices=list(PROFILES), nargs="+", default=list(PROFILES))
+    parser.add_argument("--slo-ms", type=float, default=250.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.profile, args.slo_ms / 1000))
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Saturation benchmark: unbounded queue vs. admission control.
+
+Ramps open-loop Poisson traffic in steps past the simulated model's
+capacity (about 170 req/s at batch size 8), like the locustfile's
+StepLoadShape but without a think-time ceiling. Without a queue limit the
+backlog, and with it latency and memory, grows for as long as the overload
+lasts; with admission control excess requests are rejected immediately
+(429 in the API) and the p99 of accepted requests stays flat.
+
+Usage:
+    python benchmarks/bench_admission_control.py
+    python benchmarks/bench_admission_control.py --max-queue-size 16 --max-queue-wait-ms 150
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+import torch
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(SCRIPT_DIR), "src"))
+
+from batch_manager import BatchManager  # noqa: E402
+from inference_executor import InferenceExecutor  # noqa: E402
+from request_queue import QueueFullError  # noqa: E402
+from adaptive_batching import percentile  # noqa: E402
+
+# (duration seconds, arrival rate) steps
+STEPS = [(4, 60), (4, 120), (4, 180), (4, 240), (4, 300)]
+
+
+class SimulatedModel:
+    """Service time grows linearly with batch size, like ResNet-50 on CPU."""
+    
+    def __init__(self, fixed_ms: float = 15.0, per_item_ms: float = 4.0):
+        self.fixed = fixed_ms / 1000
+        self.per_item = per_item_ms / 1000
+    
+    def __call__(self, batch: torch.Tensor) -> torch.Tensor:
+        time.sleep(self.fixed + self.per_item * batch.shape[0])
+        return torch.zeros(batch.shape[0], 1000)
+
+
+async def run_steps(max_queue_size, max_queue_wait, seed: int = 0):
+    """Replay the step ramp; returns one row of stats per step."""
+    manager = BatchManager(max_batch_size=8, max_wait_time=0.05,
+                           executor=InferenceExecutor(num_threads=1),
+                           max_queue_size=max_queue_size,
+                           max_queue_wait=max_queue_wait)
+    manager.start(SimulatedModel())
+    
+    rng = random.Random(seed)
+    tensor = torch.zeros(3, 224, 224)
+    tasks = []
+    
+    async def request(stats):
+        sent = time.monotonic()
+        try:
+            await manager.add_to_batch(tensor, "sim")
+        except QueueFullError:
+            stats['rejected'] += 1
+            return
+        stats['latencies'].append(time.monotonic() - sent)
+    
+    rows = []
+    for duration, rate in STEPS:
+        stats = {'rate': rate, 'sent': 0, 'rejected': 0, 'latencies': [], 'max_queue': 0}
+        end = time.monotonic() + duration
+        while time.monotonic() < end:
+            stats['sent'] += 1
+            tasks.append(asyncio.create_task(request(stats)))
+            stats['max_queue'] = max(stats['max_queue'], len(manager.queue))
+            await asyncio.sleep(rng.expovariate(rate))
+        rows.append(stats)
+    
+    await asyncio.gather(*tasks)
+    manager.stop()
+    return rows
+
+
+async def main(args):
+    configs = [
+        ("unbounded", None, None),
+        ("bounded", args.max_queue_size or None, args.max_queue_wait_ms / 1000 or None),
+    ]
+    print("="*72)
+    print(f"Admission Control Benchmark (bounded: max_queue_size={args.max_queue_size}, "
+          f"max_queue_wait={args.max_queue_wait_ms:.0f}ms)")
+    print("="*72)
+    print(f"{'mode':<10} | {'rate':>6} | {'p50 ok':>8} | {'p99 ok':>8} | {'rejected':>8} | {'max queue':>9}")
+    print("-"*72)
+    
+    for name, max_queue_size, max_queue_wait in configs:
+        for stats in await run_steps(max_queue_size, max_queue_wait):
+            latencies_ms = [x * 1000 for x in stats['latencies']]
+            print(f"{name:<10} | {stats['rate']:>4}/s | {percentile(latencies_ms, 50):>6.0f}ms | "
+                  f"{percentile(latencies_ms, 99):>6.0f}ms | "
+                  f"{stats['rejected'] / stats['sent']:>8.0%} | {stats['max_queue']:>9}")
+        print("-"*72)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--max-queue-size", type=int, default=32)
+    parser.add_argument("--max-queue-wait-ms", type=float, default=0, help="0 = no wait limit")
+    args = parser.parse_args()
+    
+    asyncio.run(main(args))
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Inference backends: PyTorch eager vs. ONNX Runtime on CPU.
+
+Every backend goes through the same harness: load_backend() as the
+server calls it, then identical measurements. For each backend reports
+the one-off export time (ONNX only; later starts reuse the file), the
+load time with a cached export, the time to warm up every batch size,
+the max abs output difference vs. PyTorch eager, the median latency per
+batch size and the speedup over torch at the largest batch size.
+Backends whose optional packages are missing are skipped.
+
+ResNet-50 runs with random weights: latency does not depend on them.
+
+Usage:
+    python benchmarks/bench_backends.py
+    python benchmarks/bench_backends.py --backends torch,onnxruntime --batch-sizes 1,8,16 --threads 4
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import torch
+import torchvision.models as models
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(SCRIPT_DIR), "src"))
+
+from inference_backend import export_onnx, load_backend  # noqa: E402
+from preprocessing import INPUT_SHAPE  # noqa: E402
+
+
+def latency_ms(backend, batch, iterations):
+    """Median milliseconds per infer() call."""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        backend.infer(batch)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main(args):
+    torch.set_num_threads(args.threads)
+    torch.manual_seed(0)
+    eager = models.resnet50(weights=None).eval()
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",")]
+    max_batch_size = max(batch_sizes)
+    inputs = torch.randn(max_batch_size, *INPUT_SHAPE)
+    with torch.no_grad():
+        reference = eager(inputs)
+    
+    tmp_dir = tempfile.TemporaryDirectory()
+    options = {
+        'torch': {},
+        'onnxruntime': {'path': os.path.join(tmp_dir.name, "resnet50.onnx"), 'num_threads': args.threads},
+    }
+    
+    width = 64 + 10 * len(batch_sizes)
+    print("="*width)
+    print(f"Inference Latency by Backend ({args.threads} thread(s), median of {args.iterations})")
+    print("="*width)
+    header = f"{'backend':<12} | {'export':>7} | {'load':>6} | {'warmup':>7} | {'max diff':>8}"
+    for batch_size in batch_sizes:
+        header += f" | {'B=' + str(batch_size):>7}"
+    header += f" | {'vs torch':>8}"
+    print(header)
+    print("-"*width)
+    
+    baseline = None
+    for name in args.backends.split(","):
+        export = "-"
+        try:
+            if name == 'onnxruntime':
+                start = time.perf_counter()
+                export_onnx(eager, options[name]['path'])
+                export = f"{time.perf_counter() - start:.1f}s"
+            
+            start = time.perf_counter()
+            backend = load_backend(eager, name, warmup_iterations=0, **options[name])
+            load = time.perf_counter() - start
+        except ImportError as e:
+            print(f"{name:<12} | skipped: {e}")
+            continue
+        
+        start = time.perf_counter()
+        backend.warmup(max_batch_size, iterations=2)
+        warm = time.perf_counter() - start
+        
+        diff = (backend.infer(inputs) - reference).abs().max().item()
+        
+        row = f"{name:<12} | {export:>7} | {load:>5.1f}s | {warm:>6.1f}s | {diff:>8.1e}"
+        for batch_size in batch_sizes:
+            ms = latency_ms(backend, inputs[:batch_size], args.iterations)
+            row += f" | {ms:>5.0f}ms"
+        baseline = baseline or ms
+        row += f" | {baseline / ms:>7.2f}x"
+        print(row, flush=True)
+    print("-"*width)
+    tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--backends", default="torch,onnxruntime")
+    parser.add_argument("--batch-sizes", default="1,4,8")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=torch.get_num_threads())
+    args = parser.parse_args()
+    
+    main(args)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Batch input buffers: torch.stack per batch vs. preallocated buffer pool.
+
+Runs the same closed-loop load through BatchManager twice, once building
+every batch with torch.stack and once with a double-buffered
+BatchBufferPool, and reports batch tensor allocations and the time spent
+building batch inputs.
+
+Usage:
+    python benchmarks/bench_batch_buffers.py
+    python benchmarks/bench_batch_buffers.py --clients 32 --requests 4000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import torch
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(SCRIPT_DIR), "src"))
+
+from batch_manager import BatchManager  # noqa: E402
+from batch_buffers import BatchBufferPool  # noqa: E402
+from inference_executor import InferenceExecutor  # noqa: E402
+
+
+class TimedBatchManager(BatchManager):
+    """BatchManager that records how long building each batch input takes."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.build_times = []
+    
+    def build_batch(self, batch_items):
+        start = time.perf_counter()
+        batch_tensor = super().build_batch(batch_items)
+        self.build_times.append(time.perf_counter() - start)
+        return batch_tensor
+
+
+def simulated_model(batch: torch.Tensor) -> torch.Tensor:
+    """Touches the whole input like a first conv layer would."""
+    return batch.mean(dim=(2, 3)).repeat(1, 334)[:, :1000]
+
+
+async def run_mode(buffer_pool, clients: int, num_requests: int):
+    manager = TimedBatchManager(
+        max_batch_size=8,
+        max_wait_time=0.005,
+        executor=InferenceExecutor(num_threads=1),
+        buffer_pool=buffer_pool
+    )
+    manager.start(simulated_model)
+    
+    remaining = [num_requests]
+    
+    async def client(client_id):
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            # Each request brings its own preprocessed tensor
+            await manager.add_to_batch(torch.randn(3, 224, 224), f"c{client_id}")
+    
+    start = time.perf_counter()
+    await asyncio.gather(*[client(c) for c in range(clients)])
+    elapsed = time.perf_counter() - start
+    manager.stop()
+    
+    pool_allocations = buffer_pool.allocations if buffer_pool else 0
+    return {
+        'batches': len(manager.build_times),
+        'allocations': manager.stack_allocations + pool_allocations,
+        'build_us': statistics.mean(manager.build_times) * 1e6,
+        'throughput': num_requests / elapsed,
+    }
+
+
+async def main(clients: int, num_requests: int):
+    print("="*76)
+    print(f"Batch Input Buffers ({num_requests} requests, {clients} clients, max_batch_size=8)")
+    print("="*76)
+    print(f"{'mode':<22} | {'batches':>7} | {'allocations':>11} | {'build/batch':>11} | {'throughput':>11}")
+    print("-"*76)
+    
+    for name, pool in [("torch.stack", None),
+                       ("buffer pool (x2)", BatchBufferPool(max_batch_size=8, num_buffers=2))]:
+        stats = await run_mode(pool, clients, num_requests)
+        print(f"{name:<22} | {stats['batches']:>7} | {stats['allocations']:>11} | "
+              f"{stats['build_us']:>9.0f}us | {stats['throughput']:>7.0f} rps")
+    print("="*76)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.clients, args.requests))
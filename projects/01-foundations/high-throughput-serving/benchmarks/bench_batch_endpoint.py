@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Images/sec benchmark: N concurrent /predict calls vs. one /predict/batch call.
+
+Runs against a live server (python src/api.py). Every image gets a unique
+trailer after the JPEG end-of-image marker, so the prediction cache never
+answers and every image pays decode + inference. Modes:
+
+- single:  N concurrent multipart POSTs to /predict
+- files:   one POST to /predict/batch with N `files` parts
+- archive: one POST to /predict/batch with an N-member tar `archive`
+
+Reports wall time per round, images/sec and time to first result.
+
+Usage:
+    python benchmarks/bench_batch_endpoint.py
+    python benchmarks/bench_batch_endpoint.py --images 50 --rounds 3 --url http://localhost:8000
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import statistics
+import tarfile
+import time
+import uuid
+
+import aiohttp
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+IMAGE_PATH = os.path.join(os.path.dirname(SCRIPT_DIR), "test-data", "dog.jpg")
+
+with open(IMAGE_PATH, 'rb') as f:
+    IMAGE_BYTES = f.read()
+
+
+def unique_images(n):
+    """n copies of dog.jpg with distinct bytes (defeats the prediction cache)."""
+    return [IMAGE_BYTES + f"bench-{uuid.uuid4().hex}".encode() for _ in range(n)]
+
+
+def tar_archive(images):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as archive:
+        for i, data in enumerate(images):
+            info = tarfile.TarInfo(f"img{i}.jpg")
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+async def run_single(session, url, images):
+    """N concurrent /predict calls; returns (wall seconds, first result seconds)."""
+    start = time.perf_counter()
+    first = None
+    
+    async def one(data):
+        nonlocal first
+        form = aiohttp.FormData()
+        form.add_field('file', data, filename='dog.jpg', content_type='image/jpeg')
+        async with session.post(f"{url}/predict", data=form) as response:
+            response.raise_for_status()
+            await response.json()
+        if first is None:
+            first = time.perf_counter() - start
+    
+    await asyncio.gather(*(one(data) for data in images))
+    return time.perf_counter() - start, first
+
+
+async def run_batch(session, url, images, archive: bool):
+    """One /predict/batch call; returns (wall seconds, first result seconds)."""
+    form = aiohttp.FormData()
+    if archive:
+        form.add_field('archive', tar_archive(images), filename='images.tar', content_type='application/x-tar')
+    else:
+        for i, data in enumerate(images):
+            form.add_field('files', data, filename=f'img{i}.jpg', content_type='image/jpeg')
+    
+    start = time.perf_counter()
+    first = None
+    results = 0
+    async with session.post(f"{url}/predict/batch", data=form) as response:
+        response.raise_for_status()
+        async for line in response.content:
+            if first is None:
+                first = time.perf_counter() - start
+            results += b'"predictions"' in line
+    assert results == len(images), f"expected {len(images)} predictions, got {results}"
+    return time.perf_counter() - start, first
+
+
+async def main(args):
+    print("="*70)
+    print(f"/predict vs. /predict/batch ({args.images} images x {args.rounds} rounds, {args.url})")
+    print("="*70)
+    print(f"{'mode':<8} | {'wall/round':>10} | {'images/sec':>10} | {'first result':>12}")
+    print("-"*70)
+    
+    timeout = aiohttp.ClientTimeout(total=600)
+    connector = aiohttp.TCPConnector(limit=args.images)
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        # Warm up the model and the connection pool
+        await run_single(session, args.url, unique_images(min(args.images, 8)))
+        
+        modes = {
+            'single': lambda images: run_single(session, args.url, images),
+            'files': lambda images: run_batch(session, args.url, images, archive=False),
+            'archive': lambda images: run_batch(session, args.url, images, archive=True),
+        }
+        for name, run in modes.items():
+            walls, firsts = [], []
+            for _ in range(args.rounds):
+                wall, first = await run(unique_images(args.images))
+                walls.append(wall)
+                firsts.append(first)
+            wall = statistics.median(walls)
+            print(f"{name:<8} | {wall:>9.2f}s | {args.images / wall:>10.1f} | "
+                  f"{statistics.median(firsts) * 1000:>10.0f}ms")
+    print("-"*70)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--images", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    
+    asyncio.run(main(args))
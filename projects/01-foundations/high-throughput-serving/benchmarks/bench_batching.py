@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Queue-wait benchmark for the dynamic batcher.
+
+Replays Poisson arrivals at several rates against BatchManager with a
+simulated model and reports p50/p99 queue wait (arrival -> dispatch).
+The previous sleep-polling loop is included as a baseline.
+
+Usage:
+    python benchmarks/bench_batching.py
+    python benchmarks/bench_batching.py --rates 20 100 400 --requests 1000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+import torch
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(SCRIPT_DIR), "src"))
+
+from batch_manager import BatchManager  # noqa: E402
+
+
+class SimulatedModel:
+    """Stands in for ResNet-50: fixed cost plus a per-image cost."""
+    
+    def __init__(self, fixed_ms: float = 5.0, per_item_ms: float = 2.0):
+        self.fixed = fixed_ms / 1000
+        self.per_item = per_item_ms / 1000
+    
+    def __call__(self, batch: torch.Tensor) -> torch.Tensor:
+        time.sleep(self.fixed + self.per_item * batch.shape[0])
+        return torch.zeros(batch.shape[0], 1000)
+
+
+class RecordingBatchManager(BatchManager):
+    """BatchManager that records queue wait of every dispatched request."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.queue_waits = []
+        self.batch_sizes = []
+    
+    async def process_batch(self, model, batch_items):
+        now = time.monotonic()
+        self.queue_waits.extend(now - item['arrival_time'] for item in batch_items)
+        self.batch_sizes.append(len(batch_items))
+        await super().process_batch(model, batch_items)
+
+
+class SleepPollingBatchManager(RecordingBatchManager):
+    """The previous loop: sleep max_wait_time, then take whatever is queued."""
+    
+    async def collect_batch(self):
+        while True:
+            await asyncio.sleep(self.max_wait_time)
+            async with self.lock:
+                if self.queue:
+                    batch_size = min(len(self.queue), self.max_batch_size)
+                    return [self.queue.popleft() for _ in range(batch_size)]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_rate(manager_cls, rate: float, num_requests: int, seed: int = 0):
+    """Drive one manager at a given arrival rate (requests/second)."""
+    manager = manager_cls(max_batch_size=8, max_wait_time=0.05)
+    model = SimulatedModel()
+    manager.start(model)
+    
+    rng = random.Random(seed)
+    tensor = torch.zeros(3, 224, 224)
+    tasks = []
+    
+    for i in range(num_requests):
+        tasks.append(asyncio.create_task(manager.add_to_batch(tensor, f"req-{i}")))
+        await asyncio.sleep(rng.expovariate(rate))
+    
+    await asyncio.gather(*tasks)
+    manager.stop()
+    
+    waits_ms = [w * 1000 for w in manager.queue_waits]
+    return {
+        'p50': percentile(waits_ms, 50),
+        'p99': percentile(waits_ms, 99),
+        'avg_batch': statistics.mean(manager.batch_sizes),
+    }
+
+
+async def main(rates, num_requests):
+    print("="*72)
+    print("Dynamic Batcher Queue-Wait Benchmark (max_batch_size=8, max_wait=50ms)")
+    print("="*72)
+    print(f"{'rate (req/s)':>12} | {'loop':<13} | {'p50 wait':>9} | {'p99 wait':>9} | {'avg batch':>9}")
+    print("-"*72)
+    
+    for rate in rates:
+        for name, manager_cls in [("sleep-poll", SleepPollingBatchManager),
+                                  ("event-driven", RecordingBatchManager)]:
+            stats = await run_rate(manager_cls, rate, num_requests)
+            print(f"{rate:>12.0f} | {name:<13} | {stats['p50']:>7.1f}ms | "
+                  f"{stats['p99']:>7.1f}ms | {stats['avg_batch']:>9.2f}")
+        print("-"*72)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rates", type=float, nargs="+", default=[10, 50, 100, 200, 400])
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.rates, args.requests))
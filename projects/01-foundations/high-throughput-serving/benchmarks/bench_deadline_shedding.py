@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Overload benchmark: FIFO batching vs. deadline-aware scheduling with shedding.
+
+Replays open-loop Poisson traffic above the simulated model's capacity.
+Every client gives up after --timeout-ms and a fraction of requests are
+high priority. In FIFO mode the batcher knows nothing about deadlines, so
+requests are run long after their client gave up; in EDF mode requests
+carry their deadline and priority, and the ones that cannot make it are
+dropped before inference.
+
+Reported per mode: goodput (answers that arrived in time), late answers
+(forward passes spent on clients that had already given up), shed
+requests, and p99 latency of on-time answers.
+
+Usage:
+    python benchmarks/bench_deadline_shedding.py
+    python benchmarks/bench_deadline_shedding.py --rate 300 --timeout-ms 200
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+import torch
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(SCRIPT_DIR), "src"))
+
+from batch_manager import BatchManager  # noqa: E402
+from inference_executor import InferenceExecutor  # noqa: E402
+from request_queue import DeadlineExceededError  # noqa: E402
+from adaptive_batching import percentile  # noqa: E402
+
+
+class SimulatedModel:
+    """Service time grows linearly with batch size, like ResNet-50 on CPU."""
+    
+    def __init__(self, fixed_ms: float = 15.0, per_item_ms: float = 4.0):
+        self.fixed = fixed_ms / 1000
+        self.per_item = per_item_ms / 1000
+    
+    def __call__(self, batch: torch.Tensor) -> torch.Tensor:
+        time.sleep(self.fixed + self.per_item * batch.shape[0])
+        return torch.zeros(batch.shape[0], 1000)
+
+
+async def run_mode(edf: bool, rate: float, duration: float, timeout: float,
+                   high_fraction: float, seed: int = 0):
+    """Drive one batcher configuration; returns per-priority outcome counts."""
+    manager = BatchManager(max_batch_size=8, max_wait_time=0.05,
+                           executor=InferenceExecutor(num_threads=1))
+    manager.start(SimulatedModel())
+    
+    rng = random.Random(seed)
+    tensor = torch.zeros(3, 224, 224)
+    outcomes = {p: {'ok': 0, 'late': 0, 'shed': 0, 'latencies': []} for p in ('high', 'normal')}
+    tasks = []
+    
+    async def request(priority):
+        sent = time.monotonic()
+        stats = outcomes[priority]
+        try:
+            if edf:
+                await manager.add_to_batch(tensor, "sim", deadline=sent + timeout, priority=priority)
+            else:
+                await manager.add_to_batch(tensor, "sim")
+        except DeadlineExceededError:
+            stats['shed'] += 1
+            return
+        latency = time.monotonic() - sent
+        if latency <= timeout:
+            stats['ok'] += 1
+            stats['latencies'].append(latency)
+        else:
+            stats['late'] += 1
+    
+    end = time.monotonic() + duration
+    while time.monotonic() < end:
+        priority = 'high' if rng.random() < high_fraction else 'normal'
+        tasks.append(asyncio.create_task(request(priority)))
+        await asyncio.sleep(rng.expovariate(rate))
+    
+    await asyncio.gather(*tasks)
+    manager.stop()
+    return outcomes
+
+
+def print_row(name, priority, stats, duration):
+    total = stats['ok'] + stats['late'] + stats['shed']
+    latencies_ms = [x * 1000 for x in stats['latencies']]
+    p99 = f"{percentile(latencies_ms, 99):>7.0f}ms" if latencies_ms else f"{'-':>9}"
+    print(f"{name:<6} | {priority:<6} | {total:>6} | {stats['ok'] / duration:>9.1f}/s | "
+          f"{stats['late']:>6} | {stats['shed']:>6} | {p99}")
+
+
+async def main(args):
+    timeout = args.timeout_ms / 1000
+    print("="*74)
+    print(f"Deadline Shedding Benchmark (rate={args.rate:.0f}/s, timeout={args.timeout_ms:.0f}ms, "
+          f"high priority={args.high_fraction:.0%})")
+    print("="*74)
+    print(f"{'mode':<6} | {'class':<6} | {'sent':>6} | {'goodput':>11} | {'late':>6} | "
+          f"{'shed':>6} | {'p99 ok':>9}")
+    print("-"*74)
+    
+    for name, edf in [("fifo", False), ("edf", True)]:
+        outcomes = await run_mode(edf, args.rate, args.duration, timeout, args.high_fraction)
+        for priority, stats in outcomes.items():
+            print_row(name, priority, stats, args.duration)
+        print("-"*74)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rate", type=float, default=250, help="Offered load (requests/second)")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds of traffic per mode")
+    parser.add_argument("--timeout-ms", type=float, default=300, help="Client timeout")
+    parser.add_argument("--high-fraction", type=float, default=0.2, help="Share of high-priority requests")
+    args = parser.parse_args()
+    
+    asyncio.run(main(args))
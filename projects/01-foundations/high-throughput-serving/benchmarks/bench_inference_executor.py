@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Inline vs. inference-thread comparison for BatchManager.
+
+Runs closed-loop clients against BatchManager with a real ResNet-50
+forward pass (random weights, no download) and, alongside, a probe that
+behaves like a /health handler: it wakes every 20 ms and records how late
+it was served. Inline inference freezes the event loop for the whole
+forward pass; the inference executor keeps the loop responsive.
+
+Usage:
+    python benchmarks/bench_inference_executor.py
+    python benchmarks/bench_inference_executor.py --clients 16 --duration 20
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import torch
+import torchvision.models as models
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(SCRIPT_DIR), "src"))
+
+from batch_manager import BatchManager  # noqa: E402
+from inference_executor import InferenceExecutor  # noqa: E402
+
+
+PROBE_INTERVAL = 0.02
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def health_probe(stop: asyncio.Event, latencies: list):
+    """Emulates /health polling: how long until the loop serves a tick."""
+    while not stop.is_set():
+        scheduled = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        latencies.append(time.perf_counter() - scheduled - PROBE_INTERVAL)
+
+
+async def client(manager: BatchManager, client_id: int, stop: asyncio.Event, completed: list):
+    """Closed-loop client: send, wait for the result, repeat."""
+    tensor = torch.randn(3, 224, 224)
+    i = 0
+    while not stop.is_set():
+        await manager.add_to_batch(tensor, f"client-{client_id}-{i}")
+        completed.append(time.perf_counter())
+        i += 1
+
+
+async def run_mode(model, executor, clients: int, duration: float):
+    manager = BatchManager(max_batch_size=8, max_wait_time=0.05, executor=executor)
+    manager.start(model)
+    
+    stop = asyncio.Event()
+    completed, probe_latencies = [], []
+    tasks = [asyncio.create_task(client(manager, c, stop, completed)) for c in range(clients)]
+    tasks.append(asyncio.create_task(health_probe(stop, probe_latencies)))
+    
+    start = time.perf_counter()
+    await asyncio.sleep(duration)
+    stop.set()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    manager.stop()
+    
+    probe_ms = [lat * 1000 for lat in probe_latencies]
+    return {
+        'throughput': len(completed) / elapsed,
+        'health_p50': percentile(probe_ms, 50),
+        'health_p99': percentile(probe_ms, 99),
+        'health_max': max(probe_ms),
+    }
+
+
+async def main(clients: int, duration: float):
+    model = models.resnet50(weights=None)
+    model.eval()
+    
+    print("="*72)
+    print(f"Inference Executor Benchmark ({clients} clients, {duration:.0f}s per mode)")
+    print("="*72)
+    print(f"{'mode':<18} | {'throughput':>11} | {'health p50':>10} | {'health p99':>10} | {'health max':>10}")
+    print("-"*72)
+    
+    for name, executor in [("inline", None),
+                           ("inference thread", InferenceExecutor(num_threads=1))]:
+        stats = await run_mode(model, executor, clients, duration)
+        print(f"{name:<18} | {stats['throughput']:>7.1f} rps | {stats['health_p50']:>8.1f}ms | "
+              f"{stats['health_p99']:>8.1f}ms | {stats['health_max']:>8.1f}ms")
+    print("="*72)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=15.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.clients, args.duration))
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Reduced-resolution JPEG decode: decode time and accuracy parity.
+
+Decode time: dog.jpg is re-encoded at several resolutions (up to a 12 MP
+phone photo) and decode + preprocess is timed with full decode and with
+the DCT-domain draft decode (preprocessing.decode_image). A PNG is
+included to show that other formats take the full-decode path.
+
+Parity: for a sample set (the generated images, several crops of
+dog.jpg, and every image in --images), compares the model input tensors
+of both paths, and with pretrained ResNet-50 weights also top-1 agreement
+and top-5 overlap. The model part is skipped if the weights cannot be
+loaded (e.g. offline).
+
+Usage:
+    python benchmarks/bench_jpeg_draft.py
+    python benchmarks/bench_jpeg_draft.py --images ~/imagenet-sample --iterations 20
+"""
+
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+
+import torch
+from PIL import Image
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+from preprocessing import build_preprocess, decode_image, preprocess_bytes  # noqa: E402
+
+IMAGE_PATH = os.path.join(PROJECT_ROOT, "test-data", "dog.jpg")
+
+# (label, width, height, format)
+SIZES = [
+    ("VGA", 640, 480, "JPEG"),
+    ("2 MP", 1600, 1200, "JPEG"),
+    ("5 MP", 2592, 1944, "JPEG"),
+    ("12 MP", 4032, 3024, "JPEG"),
+    ("2 MP png", 1600, 1200, "PNG"),
+]
+
+
+def encode(image, size, fmt, quality=90):
+    buffer = io.BytesIO()
+    image.resize(size, Image.LANCZOS).save(buffer, format=fmt, quality=quality)
+    return buffer.getvalue()
+
+
+def time_per_call(fn, iterations):
+    """Median milliseconds per call."""
+    fn()  # warm-up
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def sample_set(source, generated, image_dir):
+    """(name, encoded bytes) pairs for the parity check."""
+    samples = [(label, data) for label, data in generated]
+    width, height = source.size
+    crops = {
+        "center": (width // 4, height // 4, 3 * width // 4, 3 * height // 4),
+        "left": (0, 0, width // 2, height),
+        "top": (0, 0, width, height // 2),
+    }
+    for name, box in crops.items():
+        crop = source.crop(box)
+        samples.append((f"crop {name}", encode(crop, (crop.width * 2, crop.height * 2), "JPEG")))
+    if image_dir:
+        for filename in sorted(os.listdir(image_dir)):
+            with open(os.path.join(image_dir, filename), 'rb') as f:
+                samples.append((filename, f.read()))
+    return samples
+
+
+def load_model():
+    try:
+        from torchvision.models import resnet50, ResNet50_Weights
+        model = resnet50(weights=ResNet50_Weights.IMAGENET1K_V1)
+    except Exception as e:
+        print(f"Pretrained weights unavailable ({type(e).__name__}); skipping top-1/top-5 parity")
+        return None
+    return model.eval()
+
+
+def main(args):
+    torch.set_num_threads(1)
+    preprocess = build_preprocess()
+    source = Image.open(IMAGE_PATH).convert('RGB')
+    generated = [(label, encode(source, (w, h), fmt)) for label, w, h, fmt in SIZES]
+    
+    print("="*78)
+    print(f"Decode + Preprocess Time (1 thread, median of {args.iterations})")
+    print("="*78)
+    print(f"{'image':<10} | {'size':>11} | {'decoded at':>11} | {'full':>9} | {'draft':>9} | {'speedup':>7}")
+    print("-"*78)
+    for (label, w, h, _), (_, data) in zip(SIZES, generated):
+        full = time_per_call(lambda: preprocess_bytes(data, preprocess, jpeg_draft=False), args.iterations)
+        draft = time_per_call(lambda: preprocess_bytes(data, preprocess, jpeg_draft=True), args.iterations)
+        decoded = decode_image(data, jpeg_draft=True).size
+        print(f"{label:<10} | {w:>5}x{h:<5} | {decoded[0]:>5}x{decoded[1]:<5} | "
+              f"{full:>7.1f}ms | {draft:>7.1f}ms | {full / draft:>6.1f}x")
+    print("-"*78)
+    
+    samples = sample_set(source, generated, args.images)
+    model = load_model()
+    print()
+    print("="*78)
+    print(f"Accuracy Parity, full vs. draft decode ({len(samples)} images)")
+    print("="*78)
+    print(f"{'image':<16} | {'mean |diff|':>11} | {'max |diff|':>10} | {'top-1':>6} | {'top-5 overlap':>13}")
+    print("-"*78)
+    agree = 0
+    overlaps = []
+    for name, data in samples:
+        full = preprocess_bytes(data, preprocess, jpeg_draft=False)
+        draft = preprocess_bytes(data, preprocess, jpeg_draft=True)
+        diff = (full - draft).abs()
+        top1, overlap = "-", "-"
+        if model is not None:
+            with torch.no_grad():
+                logits = model(torch.stack([full, draft]))
+            top5 = logits.topk(5).indices.tolist()
+            same = top5[0][0] == top5[1][0]
+            agree += same
+            overlaps.append(len(set(top5[0]) & set(top5[1])))
+            top1, overlap = ("same" if same else "DIFF"), f"{overlaps[-1]}/5"
+        print(f"{name[:16]:<16} | {diff.mean().item():>11.4f} | {diff.max().item():>10.4f} | {top1:>6} | {overlap:>13}")
+    print("-"*78)
+    if model is not None:
+        print(f"Top-1 agreement: {agree}/{len(samples)}, "
+              f"mean top-5 overlap: {statistics.mean(overlaps):.2f}/5")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--images", help="Directory of extra images for the parity check")
+    args = parser.parse_args()
+    
+    main(args)
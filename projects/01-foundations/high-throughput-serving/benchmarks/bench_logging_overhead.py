@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Logging overhead: event-loop latency with logging off vs. synchronous vs. asynchronous.
+
+Drives an asyncio loop at --rps simulated /predict requests per second,
+each emitting the INFO records the real request path does (3 from
+api.py, 2 from batch_manager.py, with the same `extra` fields), while a
+probe task measures how late the loop wakes it up. Modes:
+
+- off: log level WARNING, the INFO calls return at the level check
+- sync: setup_logging's StreamHandler formats and writes on the loop
+- async: setup_logging(async_queue_size=...), the loop only enqueues
+- async + sampling: also sample_rate=--sample-rate records/s per logger
+
+Records are JSON-formatted (as in production) and written to --output,
+flushed per record like stdout. Reports time spent in logging calls per
+request, probe lag p50/p99/max and records written/dropped.
+
+Usage:
+    python benchmarks/bench_logging_overhead.py
+    python benchmarks/bench_logging_overhead.py --rps 1000 --duration 10 --output /dev/stdout
+"""
+
+import argparse
+import asyncio
+import collections
+import contextlib
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+from logger_config import setup_logging, stop_logging  # noqa: E402
+
+api_logger = logging.getLogger("api")
+batch_logger = logging.getLogger("batch_manager")
+
+
+async def request(index, batch_wait, spent):
+    """One simulated /predict: its log calls, with a batching wait in between."""
+    request_id = f"req-{index}"
+    start = time.perf_counter()
+    api_logger.info("Request received", extra={'request_id': request_id, 'file_size_bytes': 110_000, 'upload': 'multipart'})
+    api_logger.info("Adding to batch queue", extra={'request_id': request_id})
+    spent.append(time.perf_counter() - start)
+    
+    await asyncio.sleep(batch_wait)
+    
+    start = time.perf_counter()
+    batch_logger.info("Processing batch of size %d", 1)
+    batch_logger.info("Batch inference completed in %.2fms", batch_wait * 1000)
+    api_logger.info(
+        "Request completed successfully",
+        extra={
+            'request_id': request_id,
+            'top_prediction': 'golden retriever',
+            'confidence': 0.91,
+            'total_latency_ms': 12.5,
+            'inference_ms': 8.1,
+            'file_size_bytes': 110_000,
+            'cached': False
+        }
+    )
+    spent[-1] += time.perf_counter() - start
+
+
+async def probe(interval, lags, done):
+    """Sleep for interval over and over, recording how late each wake-up is."""
+    while not done.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def drive(args):
+    """Issue --rps requests per second for --duration seconds while probing."""
+    loop = asyncio.get_running_loop()
+    lags, spent, tasks = [], [], []
+    done = asyncio.Event()
+    prober = asyncio.create_task(probe(args.probe_ms / 1000, lags, done))
+    
+    interval = 1.0 / args.rps
+    next_at = loop.time()
+    end = next_at + args.duration
+    index = 0
+    while next_at < end:
+        tasks.append(asyncio.create_task(request(index, args.batch_wait_ms / 1000, spent)))
+        index += 1
+        next_at += interval
+        await asyncio.sleep(max(0.0, next_at - loop.time()))
+    await asyncio.gather(*tasks)
+    done.set()
+    await prober
+    return lags, spent
+
+
+def run_mode(args, level, async_queue_size, sample_rate):
+    """Configure logging to --output, drive the loop, and collect the results."""
+    drops = collections.Counter()
+    with open(args.output, "w") as output:
+        with contextlib.redirect_stdout(output):  # the StreamHandler binds sys.stdout
+            setup_logging(
+                log_level=level,
+                json_logs=True,
+                async_queue_size=async_queue_size,
+                sample_rate=sample_rate,
+                on_drop=lambda reason: drops.update([reason])
+            )
+        try:
+            lags, spent = asyncio.run(drive(args))
+        finally:
+            stop_logging()
+            logging.getLogger().handlers.clear()
+    
+    written = 0
+    if args.output != os.devnull and os.path.isfile(args.output):
+        with open(args.output) as f:
+            written = sum(1 for _ in f)
+    lags_ms = sorted(lag * 1000 for lag in lags)
+    return {
+        'per_request_us': statistics.mean(spent) * 1e6,
+        'p50': lags_ms[len(lags_ms) // 2],
+        'p99': lags_ms[int(len(lags_ms) * 0.99)],
+        'max': lags_ms[-1],
+        'written': written,
+        'dropped': sum(drops.values()),
+    }
+
+
+def main(args):
+    cleanup = None
+    if args.output is None:
+        fd, args.output = tempfile.mkstemp(prefix="bench-logging-", suffix=".log")
+        os.close(fd)
+        cleanup = args.output
+    
+    modes = [
+        ("off", "WARNING", 0, 0.0),
+        ("sync", "INFO", 0, 0.0),
+        ("async", "INFO", args.queue_size, 0.0),
+        (f"async + {args.sample_rate:g}/s sampling", "INFO", args.queue_size, args.sample_rate),
+    ]
+    
+    try:
+        print("="*86)
+        print(f"Logging Overhead ({args.rps} requests/s x {args.duration}s, 5 INFO records per request, "
+              f"{args.probe_ms:g}ms probe)")
+        print("="*86)
+        print(f"{'mode':<26} | {'on loop/req':>11} | {'lag p50':>8} | {'lag p99':>8} | {'lag max':>8} | "
+              f"{'written':>7} | {'dropped':>7}")
+        print("-"*86)
+        for name, level, queue_size, sample_rate in modes:
+            r = run_mode(args, level, queue_size, sample_rate)
+            print(f"{name:<26} | {r['per_request_us']:>9.1f}us | {r['p50']:>6.2f}ms | {r['p99']:>6.2f}ms | "
+                  f"{r['max']:>6.2f}ms | {r['written']:>7} | {r['dropped']:>7}")
+        print("-"*86)
+    finally:
+        if cleanup:
+            os.remove(cleanup)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rps", type=int, default=500, help="Simulated requests per second")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per mode")
+    parser.add_argument("--batch-wait-ms", type=float, default=10.0, help="Simulated queue wait + inference")
+    parser.add_argument("--probe-ms", type=float, default=1.0, help="Event-loop probe sleep interval")
+    parser.add_argument("--queue-size", type=int, default=10000, help="Asynchronous log buffer (records)")
+    parser.add_argument("--sample-rate", type=float, default=50.0, help="Records per second per logger when sampling")
+    parser.add_argument("--output", default=None, help="Log destination (default: a temporary file)")
+    args = parser.parse_args()
+    
+    main(args)
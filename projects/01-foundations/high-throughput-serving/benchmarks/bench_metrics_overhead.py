@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Metrics overhead: per-request instrumentation cost, single-process vs. multiprocess.
+
+Replays the metric updates one /predict request makes (MetricsTracker,
+request/result counters, cache lookup, queue gauges, inference
+histogram) in a fresh process for each backend:
+
+- globals: the module-level counters api.py used to keep (per worker only)
+- single-process: prometheus_client's default in-memory values (per worker only)
+- multiprocess: values in memory-mapped files under PROMETHEUS_MULTIPROC_DIR,
+  aggregated over all workers
+
+Then --workers processes record --requests requests each into one
+multiprocess directory, and the scrape (collect_samples) time and the
+aggregated request total are reported.
+
+Usage:
+    python benchmarks/bench_metrics_overhead.py
+    python benchmarks/bench_metrics_overhead.py --iterations 100000 --workers 8
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+
+def record_request():
+    """The metric updates of one successful, uncached /predict request."""
+    import metrics
+    
+    with metrics.MetricsTracker("POST", "/predict"):
+        metrics.track_prediction_request()
+        metrics.track_prediction_cache("miss")
+        metrics.update_queue_length(3)
+        metrics.update_queue_estimated_wait(0.05)
+        metrics.track_inference("resnet50", 0.2)
+        metrics.track_prediction_success(0.25)
+
+
+def record_request_globals(counters):
+    """The counters api.py kept as module globals."""
+    counters['request_count'] += 1
+    counters['success_count'] += 1
+    counters['total_latency'] += 250.0
+
+
+def time_backend(backend, iterations, rounds, results):
+    """Child process: median microseconds per request for one backend."""
+    if backend == 'globals':
+        counters = {'request_count': 0, 'success_count': 0, 'total_latency': 0.0}
+        record = lambda: record_request_globals(counters)  # noqa: E731
+    else:
+        import metrics
+        assert metrics.multiprocess_enabled() == (backend == 'multiprocess')
+        record = record_request
+    
+    record()  # warm-up: creates the labelled children
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            record()
+        samples.append((time.perf_counter() - start) / iterations * 1e6)
+    results.put(statistics.median(samples))
+
+
+def record_worker(count, barrier):
+    """Child process: one worker recording count requests."""
+    barrier.wait()
+    for _ in range(count):
+        record_request()
+
+
+def scrape(results, repeats):
+    """Child process: aggregated request total and median scrape time in ms."""
+    import metrics
+    
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        values = metrics.collect_samples()
+        samples.append((time.perf_counter() - start) * 1000)
+    start = time.perf_counter()
+    metrics.get_metrics()
+    exposition = (time.perf_counter() - start) * 1000
+    results.put((metrics.sum_samples(values, 'prediction_requests_total'), statistics.median(samples), exposition))
+
+
+def run_child(ctx, target, args, env_dir):
+    """Run target in a fresh process with or without PROMETHEUS_MULTIPROC_DIR."""
+    if env_dir:
+        os.environ['PROMETHEUS_MULTIPROC_DIR'] = env_dir
+    else:
+        os.environ.pop('PROMETHEUS_MULTIPROC_DIR', None)
+    process = ctx.Process(target=target, args=args)
+    process.start()
+    return process
+
+
+def main(args):
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue()
+    metrics_dir = tempfile.mkdtemp(prefix="bench-metrics-")
+    
+    try:
+        print("="*64)
+        print(f"Per-Request Instrumentation Cost ({args.iterations} requests x {args.rounds} rounds)")
+        print("="*64)
+        print(f"{'backend':<16} | {'per request':>12} | {'aggregated':>10} | {'vs single':>9}")
+        print("-"*64)
+        timings = {}
+        for backend in ('globals', 'single-process', 'multiprocess'):
+            env_dir = metrics_dir if backend == 'multiprocess' else None
+            process = run_child(ctx, time_backend, (backend, args.iterations, args.rounds, results), env_dir)
+            timings[backend] = results.get()
+            process.join()
+        for backend, microseconds in timings.items():
+            relative = microseconds / timings['single-process']
+            aggregated = "yes" if backend == 'multiprocess' else "no"
+            print(f"{backend:<16} | {microseconds:>10.2f}us | {aggregated:>10} | {relative:>8.2f}x")
+        print("-"*64)
+        
+        # Fresh directory: only the workers below contribute
+        shutil.rmtree(metrics_dir)
+        os.makedirs(metrics_dir)
+        barrier = ctx.Barrier(args.workers)
+        start = time.perf_counter()
+        workers = [
+            run_child(ctx, record_worker, (args.requests, barrier), metrics_dir)
+            for _ in range(args.workers)
+        ]
+        for process in workers:
+            process.join()
+        elapsed = time.perf_counter() - start
+        
+        process = run_child(ctx, scrape, (results, 20), metrics_dir)
+        total, scrape_ms, exposition_ms = results.get()
+        process.join()
+        
+        expected = args.workers * args.requests
+        print(f"{args.workers} workers x {args.requests} requests recorded in {elapsed:.2f}s (incl. process start)")
+        print(f"Aggregated prediction_requests_total: {total:.0f} (expected {expected}) "
+              f"{'OK' if total == expected else 'MISMATCH'}")
+        print(f"Scrape: collect {scrape_ms:.2f}ms, /prometheus exposition {exposition_ms:.2f}ms")
+        print("-"*64)
+    finally:
+        os.environ.pop('PROMETHEUS_MULTIPROC_DIR', None)
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=20000, help="Requests per timing round")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=4, help="Processes for the aggregation check")
+    parser.add_argument("--requests", type=int, default=5000, help="Requests per worker for the aggregation check")
+    args = parser.parse_args()
+    
+    main(args)
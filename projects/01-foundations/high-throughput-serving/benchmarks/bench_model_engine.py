@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Model execution engines: eager vs. TorchScript vs. torch.compile on CPU.
+
+For each engine (with and without channels_last) reports the build time,
+the latency of the first call (what the first request would pay without
+warmup), the time to warm up every batch size, the max abs output
+difference vs. eager, the median forward-pass latency per batch size and
+the speedup over eager at the largest batch size.
+
+ResNet-50 runs with random weights: latency does not depend on them.
+
+Usage:
+    python benchmarks/bench_model_engine.py
+    python benchmarks/bench_model_engine.py --engines eager,torchscript --batch-sizes 1,8,16 --threads 4
+"""
+
+import argparse
+import copy
+import os
+import statistics
+import sys
+import time
+
+import torch
+import torchvision.models as models
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(SCRIPT_DIR), "src"))
+
+from model_engine import build_engine, warmup  # noqa: E402
+from preprocessing import INPUT_SHAPE  # noqa: E402
+
+
+def latency_ms(model, batch, iterations):
+    """Median milliseconds per forward pass."""
+    samples = []
+    with torch.no_grad():
+        for _ in range(iterations):
+            start = time.perf_counter()
+            model(batch)
+            samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main(args):
+    torch.set_num_threads(args.threads)
+    torch.manual_seed(0)
+    eager = models.resnet50(weights=None).eval()
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",")]
+    max_batch_size = max(batch_sizes)
+    inputs = torch.randn(max_batch_size, *INPUT_SHAPE)
+    with torch.no_grad():
+        reference = eager(inputs)
+    
+    configs = [
+        (engine, channels_last)
+        for engine in args.engines.split(",")
+        for channels_last in (False, True)
+    ]
+    
+    width = 68 + 10 * len(batch_sizes)
+    print("="*width)
+    print(f"Forward Pass Latency by Engine ({args.threads} thread(s), median of {args.iterations})")
+    print("="*width)
+    header = f"{'engine':<18} | {'build':>7} | {'1st call':>8} | {'warmup':>7} | {'max diff':>8}"
+    for batch_size in batch_sizes:
+        header += f" | {'B=' + str(batch_size):>7}"
+    header += f" | {'vs eager':>8}"
+    print(header)
+    print("-"*width)
+    
+    baseline = {}
+    for engine, channels_last in configs:
+        name = engine + (" +CL" if channels_last else "")
+        
+        start = time.perf_counter()
+        model = build_engine(copy.deepcopy(eager), engine, channels_last)
+        build = time.perf_counter() - start
+        
+        with torch.no_grad():
+            start = time.perf_counter()
+            model(inputs[:1])
+            first_call = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        warmup(model, max_batch_size, iterations=2)
+        warm = time.perf_counter() - start
+        
+        with torch.no_grad():
+            diff = (model(inputs) - reference).abs().max().item()
+        
+        row = f"{name:<18} | {build:>6.1f}s | {first_call:>7.2f}s | {warm:>6.1f}s | {diff:>8.1e}"
+        for batch_size in batch_sizes:
+            ms = latency_ms(model, inputs[:batch_size], args.iterations)
+            baseline.setdefault(batch_size, ms)
+            row += f" | {ms:>5.0f}ms"
+        row += f" | {baseline[max_batch_size] / ms:>7.2f}x"
+        print(row, flush=True)
+    print("-"*width)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--engines", default="eager,torchscript,compile")
+    parser.add_argument("--batch-sizes", default="1,4,8")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=torch.get_num_threads())
+    args = parser.parse_args()
+    
+    main(args)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Postprocessing micro-benchmark: per-request vs. batch-level.
+
+Compares the previous per-request path (softmax + topk on each output row,
+then five .item() calls and a label lookup per prediction) with
+postprocessing.top_k_predictions, which handles the whole [B, 1000]
+output at once. Reports CPU time per request.
+
+Usage:
+    python benchmarks/bench_postprocess.py
+    python benchmarks/bench_postprocess.py --batch-sizes 1 8 32 --iterations 2000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import torch
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(SCRIPT_DIR), "src"))
+
+from postprocessing import imagenet_labels, top_k_predictions  # noqa: E402
+
+IMAGENET_LABELS = imagenet_labels()
+
+
+def per_request(batch_output: torch.Tensor):
+    """The previous path: each request postprocesses its own output row."""
+    results = []
+    for output in batch_output:
+        probabilities = torch.nn.functional.softmax(output, dim=0)
+        top5_prob, top5_catid = torch.topk(probabilities, 5)
+        
+        predictions = []
+        for i in range(5):
+            class_id = top5_catid[i].item()
+            predictions.append({
+                "rank": i + 1,
+                "class_id": class_id,
+                "class_name": IMAGENET_LABELS[class_id],
+                "confidence": round(top5_prob[i].item(), 4)
+            })
+        results.append(predictions)
+    return results
+
+
+def time_per_request_us(fn, batch_output: torch.Tensor, iterations: int) -> float:
+    """CPU microseconds per request for fn over a batch."""
+    fn(batch_output)  # warmup
+    start = time.process_time()
+    for _ in range(iterations):
+        fn(batch_output)
+    elapsed = time.process_time() - start
+    return elapsed / (iterations * batch_output.shape[0]) * 1e6
+
+
+def main(batch_sizes, iterations: int):
+    torch.set_num_threads(1)
+    
+    print("="*64)
+    print("Postprocessing CPU Time per Request")
+    print("="*64)
+    print(f"{'batch':>6} | {'per-request':>12} | {'batch-level':>12} | {'saved':>10} | {'speedup':>7}")
+    print("-"*64)
+    
+    for batch_size in batch_sizes:
+        batch_output = torch.randn(batch_size, 1000)
+        assert per_request(batch_output) == top_k_predictions(batch_output)
+        
+        old = time_per_request_us(per_request, batch_output, iterations)
+        new = time_per_request_us(top_k_predictions, batch_output, iterations)
+        print(f"{batch_size:>6} | {old:>10.1f}us | {new:>10.1f}us | {old - new:>8.1f}us | {old / new:>6.1f}x")
+    print("="*64)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+    main(args.batch_sizes, args.iterations)
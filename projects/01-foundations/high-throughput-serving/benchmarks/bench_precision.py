@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Inference precision: fp32 vs. bf16 autocast vs. int8 static quantization.
+
+For each mode reports the conversion time, median forward-pass latency
+per batch size, speedup over fp32, and top-1/top-5 agreement with fp32.
+The image set (--images, or by default crops and flips of dog.jpg) is
+split in two: int8 is calibrated on the first half and every mode's
+agreement is measured on the second, as the server requires separate
+CALIBRATION_DIR and AGREEMENT_DIR. The default crops all come from one
+photo, so even split they overstate agreement; use --images for a real
+figure.
+
+Agreement is only meaningful with pretrained weights; if they cannot be
+loaded (e.g. offline), random weights are used for the timings and the
+agreement columns are marked as such.
+
+Usage:
+    python benchmarks/bench_precision.py
+    python benchmarks/bench_precision.py --images ~/imagenet-sample --batch-sizes 1,8,32 --threads 4
+"""
+
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+
+import torch
+import torchvision.models as models
+from PIL import Image, ImageOps
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+from precision import agreement, apply_precision, bf16_supported, load_images  # noqa: E402
+from preprocessing import build_preprocess  # noqa: E402
+
+IMAGE_PATH = os.path.join(PROJECT_ROOT, "test-data", "dog.jpg")
+
+
+def sample_images(count):
+    """Crops at several positions and scales of dog.jpg, and their mirror images."""
+    preprocess = build_preprocess()
+    with open(IMAGE_PATH, 'rb') as f:
+        image = Image.open(io.BytesIO(f.read())).convert('RGB')
+    width, height = image.size
+    tensors = []
+    for i in range(count // 2):
+        scale = 0.5 + 0.5 * (i % 4) / 3
+        w, h = int(width * scale), int(height * scale)
+        left = (width - w) * (i % 3) // 2
+        top = (height - h) * (i // 3 % 3) // 2
+        crop = image.crop((left, top, left + w, top + h))
+        tensors.append(preprocess(crop))
+        tensors.append(preprocess(ImageOps.mirror(crop)))
+    return torch.stack(tensors)
+
+
+def load_model():
+    try:
+        return models.resnet50(weights=models.ResNet50_Weights.IMAGENET1K_V1).eval(), True
+    except Exception as e:
+        print(f"Pretrained weights unavailable ({type(e).__name__}); using random weights")
+        torch.manual_seed(0)
+        return models.resnet50(weights=None).eval(), False
+
+
+def latency_ms(model, batch, iterations):
+    """Median milliseconds per forward pass."""
+    samples = []
+    with torch.no_grad():
+        model(batch)  # warm-up
+        for _ in range(iterations):
+            start = time.perf_counter()
+            model(batch)
+            samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main(args):
+    torch.set_num_threads(args.threads)
+    fp32, pretrained = load_model()
+    images = load_images(args.images) if args.images else sample_images(args.samples)
+    calibration, check = images[:len(images) // 2], images[len(images) // 2:]
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",")]
+    max_batch_size = max(batch_sizes)
+    inputs = images[torch.arange(max_batch_size) % len(images)]
+    
+    width = 62 + 10 * len(batch_sizes)
+    print("="*width)
+    print(f"Inference Precision ({args.threads} thread(s), {len(calibration)} calibration + {len(check)} check images, "
+          f"{'pretrained' if pretrained else 'random'} weights, bf16 native: {bf16_supported()})")
+    print("="*width)
+    header = f"{'mode':<6} | {'convert':>7}"
+    for batch_size in batch_sizes:
+        header += f" | {'B=' + str(batch_size):>7}"
+    header += f" | {'speedup':>7} | {'top-1 agree':>11} | {'top-5 agree':>11}"
+    print(header)
+    print("-"*width)
+    
+    baseline = None
+    for precision in ('fp32', 'bf16', 'int8'):
+        start = time.perf_counter()
+        model, mode = apply_precision(fp32, precision, calibration=calibration)
+        convert = time.perf_counter() - start
+        
+        row = f"{mode:<6} | {convert:>6.1f}s"
+        for batch_size in batch_sizes:
+            ms = latency_ms(model, inputs[:batch_size], args.iterations)
+            row += f" | {ms:>5.0f}ms"
+        baseline = baseline or ms
+        top1, top5 = agreement(fp32, model, check)
+        row += f" | {baseline / ms:>6.2f}x | {top1:>10.1%} | {top5:>10.1%}"
+        print(row, flush=True)
+    print("-"*width)
+    print(f"Speedup at B={max_batch_size}" + ("" if pretrained else "; agreement with random weights is not representative"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--images", help="Directory split into calibration/check images (default: crops of dog.jpg)")
+    parser.add_argument("--samples", type=int, default=32, help="Generated images when --images is not given")
+    parser.add_argument("--batch-sizes", default="1,8")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=torch.get_num_threads())
+    args = parser.parse_args()
+    
+    main(args)
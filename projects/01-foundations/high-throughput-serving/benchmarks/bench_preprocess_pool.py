@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Decode/preprocess throughput: event loop vs. PreprocessPool.
+
+Pushes the test image through decode + Resize/CenterCrop/ToTensor/Normalize
+with a fixed number of concurrent requests and reports images/second for
+inline preprocessing and for the process pool at several worker counts.
+
+Usage:
+    python benchmarks/bench_preprocess_pool.py
+    python benchmarks/bench_preprocess_pool.py --workers 1 2 4 8 --images 400
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+from preprocessing import build_preprocess, preprocess_bytes  # noqa: E402
+from preprocess_pool import PreprocessPool  # noqa: E402
+
+IMAGE_PATH = os.path.join(PROJECT_ROOT, "test-data", "dog.jpg")
+
+
+async def run_inline(data: bytes, num_images: int) -> float:
+    preprocess = build_preprocess()
+    start = time.perf_counter()
+    for _ in range(num_images):
+        preprocess_bytes(data, preprocess)
+    return num_images / (time.perf_counter() - start)
+
+
+async def run_pool(data: bytes, num_images: int, workers: int, concurrency: int) -> float:
+    pool = PreprocessPool(num_workers=workers)
+    await pool.start()
+    
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def one():
+        async with semaphore:
+            await pool.preprocess(data)
+    
+    start = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(num_images)])
+    elapsed = time.perf_counter() - start
+    pool.shutdown()
+    return num_images / elapsed
+
+
+async def main(worker_counts, num_images: int, concurrency: int):
+    with open(IMAGE_PATH, "rb") as f:
+        data = f.read()
+    
+    print("="*60)
+    print(f"Preprocessing Throughput ({num_images} images, {os.cpu_count()} cores)")
+    print("="*60)
+    
+    inline = await run_inline(data, num_images)
+    print(f"{'inline (event loop)':<24} {inline:>8.1f} img/s")
+    
+    for workers in worker_counts:
+        rate = await run_pool(data, num_images, workers, concurrency)
+        print(f"{f'pool, {workers} workers':<24} {rate:>8.1f} img/s  ({rate / inline:.2f}x)")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--images", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    asyncio.run(main(args.workers, args.images, args.concurrency))
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark: weight loading strategies and server time-to-ready.
+
+1. Weight loading, each run in a fresh Python process:
+   - hub-style: build ResNet-50 (random init), torch.load the state
+     dict into memory and copy it into the model (what
+     resnet50(pretrained=True) does after finding the hub cache)
+   - meta+mmap: model_loader.load_local_model (meta-device build,
+     torch.load(mmap=True), load_state_dict(assign=True))
+   Reports import time and the time to build the model and load weights.
+
+2. Server time-to-ready: starts uvicorn with the API in a new process,
+   polls /health until it reports healthy and reads the startup phase
+   breakdown from /metrics.
+
+Uses --weights if given, else random weights saved to a temporary file
+(load time does not depend on the values). No network access is needed.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --weights models/resnet50.pth --runs 5 --env PREPROCESS_WORKERS=2
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), "src")
+
+LOADERS = {
+    'hub-style': """
+start = time.perf_counter()
+import torch
+from torchvision.models import resnet50
+imported = time.perf_counter()
+model = resnet50(weights=None)
+model.load_state_dict(torch.load(path, map_location='cpu', weights_only=True))
+model.eval()
+""",
+    'meta+mmap': """
+start = time.perf_counter()
+import torch
+from torchvision.models import resnet50
+from model_loader import load_local_model
+imported = time.perf_counter()
+model = load_local_model(path)
+""",
+}
+
+LOADER_FOOTER = """
+loaded = time.perf_counter()
+print(json.dumps({'import': imported - start, 'load': loaded - imported, 'total': loaded - start}))
+"""
+
+
+def run_loader(name, path):
+    """Run one loader in a fresh interpreter; returns its timings in seconds."""
+    code = f"import json, sys, time\nsys.path.insert(0, {SRC_DIR!r})\npath = {path!r}\n"
+    code += LOADERS[name] + LOADER_FOOTER
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get_json(url):
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return json.loads(response.read())
+
+
+def time_to_ready(env, timeout):
+    """Start the server, wait for /health to report healthy; returns (seconds, startup phases)."""
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api:app", "--app-dir", SRC_DIR, "--port", str(port),
+         "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"Server exited with code {server.returncode} during startup")
+            try:
+                if get_json(f"{base}/health")["status"] == "healthy":
+                    ready = time.perf_counter() - start
+                    return ready, get_json(f"{base}/metrics").get("startup", {})
+            except OSError:
+                pass
+            time.sleep(0.05)
+        raise TimeoutError(f"Server not ready after {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(args):
+    tmp_dir = tempfile.TemporaryDirectory()
+    path = args.weights
+    if path is None:
+        import torch
+        from torchvision.models import resnet50
+        path = os.path.join(tmp_dir.name, "resnet50.pth")
+        torch.save(resnet50(weights=None).state_dict(), path)
+    
+    print("="*60)
+    print(f"Weight Loading (fresh process, median of {args.runs})")
+    print("="*60)
+    print(f"{'loader':<10} | {'import':>7} | {'build+load':>10} | {'total':>7}")
+    print("-"*60)
+    for name in LOADERS:
+        runs = [run_loader(name, path) for _ in range(args.runs)]
+        imported, loaded, total = (statistics.median(run[key] for run in runs) * 1000 for key in ('import', 'load', 'total'))
+        row = f"{name:<10} | {imported:>5.0f}ms | {loaded:>8.0f}ms | {total:>5.0f}ms"
+        print(row, flush=True)
+    print("-"*60)
+    
+    env = dict(os.environ, MODEL_PATH=path, MODEL_DOWNLOAD="0")
+    env.update(item.split("=", 1) for item in args.env)
+    
+    print()
+    print("="*60)
+    print(f"Server Time-to-Ready ({' '.join(args.env) or 'default config'})")
+    print("="*60)
+    readies = []
+    for run in range(args.runs):
+        ready, phases = time_to_ready(env, args.timeout)
+        readies.append(ready)
+        breakdown = ", ".join(f"{phase}={seconds:.2f}s" for phase, seconds in phases.items())
+        print(f"run {run + 1}: ready in {ready:.2f}s ({breakdown})", flush=True)
+    print("-"*60)
+    print(f"Median time-to-ready: {statistics.median(readies):.2f}s")
+    tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--weights", help="State dict to load (default: random weights in a temp file)")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--env", action="append", default=[], help="Server setting, e.g. PREPROCESS_WORKERS=2")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    args = parser.parse_args()
+    
+    main(args)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Input preparation cost: JPEG upload vs. pre-decoded tensor bodies.
+
+Measures, per request, the server-side work to turn a request body into
+the 3x224x224 model input: decode + preprocess for a JPEG (/predict), and
+validation + torch.frombuffer + normalize for raw and .npy bodies
+(/predict/tensor), both for already-cropped 224x224 pixels and for
+full-resolution pixels that still need resizing.
+
+Usage:
+    python benchmarks/bench_tensor_input.py
+    python benchmarks/bench_tensor_input.py --iterations 500
+"""
+
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import torch
+from PIL import Image
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+from preprocessing import build_preprocess, preprocess_bytes  # noqa: E402
+from tensor_input import tensor_from_body, to_model_input  # noqa: E402
+
+IMAGE_PATH = os.path.join(PROJECT_ROOT, "test-data", "dog.jpg")
+
+
+def npy_bytes(array):
+    buffer = io.BytesIO()
+    np.save(buffer, array)
+    return buffer.getvalue()
+
+
+def time_per_call(fn, iterations):
+    """Median milliseconds per call."""
+    fn()  # warm-up
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main(iterations):
+    torch.set_num_threads(1)
+    preprocess = build_preprocess()
+    
+    with open(IMAGE_PATH, 'rb') as f:
+        jpeg = f.read()
+    image = Image.open(io.BytesIO(jpeg)).convert('RGB')
+    full = np.asarray(image)
+    cropped = np.asarray(image.resize((224, 224)))
+    
+    # Bodies are built outside the timed region: they arrive off the wire
+    raw_cropped = cropped.tobytes()
+    npy_cropped = npy_bytes(cropped)
+    raw_full = full.tobytes()
+    full_shape = f"{full.shape[0]},{full.shape[1]},3"
+    
+    cases = [
+        ("jpeg (/predict)", len(jpeg),
+         lambda: preprocess_bytes(jpeg, preprocess)),
+        ("raw uint8 224x224x3", len(raw_cropped),
+         lambda: to_model_input(tensor_from_body(raw_cropped, "application/octet-stream", "224,224,3")[0])),
+        ("npy uint8 224x224x3", len(npy_cropped),
+         lambda: to_model_input(tensor_from_body(npy_cropped, "application/x-npy")[0])),
+        (f"raw uint8 {full.shape[0]}x{full.shape[1]}x3", len(raw_full),
+         lambda: to_model_input(tensor_from_body(raw_full, "application/octet-stream", full_shape)[0])),
+    ]
+    
+    print("="*66)
+    print(f"Input Preparation Cost per Request (1 thread, {iterations} iterations)")
+    print("="*66)
+    print(f"{'input':<26} | {'body size':>10} | {'median':>9} | {'vs jpeg':>8}")
+    print("-"*66)
+    baseline = None
+    for name, size, fn in cases:
+        ms = time_per_call(fn, iterations)
+        baseline = baseline or ms
+        print(f"{name:<26} | {size / 1024:>8.0f}KB | {ms:>7.2f}ms | {baseline / ms:>7.1f}x")
+    print("-"*66)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    
+    main(args.iterations)
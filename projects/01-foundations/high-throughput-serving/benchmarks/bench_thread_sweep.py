@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Workers x threads sweep: find the throughput-optimal thread-pool split for this host.
+
+For every split of the available CPUs (cgroup quota aware) into W worker
+processes with T intra-op threads each (W * T <= CPUs), W processes run
+ResNet-50 forward passes at the same time for --duration seconds, as W
+uvicorn workers would. Reports aggregate images/sec and median batch
+latency per split. The untuned default (every worker starting one thread
+per CPU) is measured for comparison with --untuned.
+
+The best split is written to --output (default config/threads.json),
+which config.py reads as the default WORKERS / TORCH_THREADS /
+TORCH_INTEROP_THREADS / PIN_WORKERS.
+
+Usage:
+    python benchmarks/bench_thread_sweep.py
+    python benchmarks/bench_thread_sweep.py --batch-size 8 --duration 20 --pin --untuned
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import statistics
+import sys
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+from thread_config import allowed_cpus, available_cpus  # noqa: E402
+
+
+def worker(threads, cpus, batch_size, duration, barrier, results):
+    """One worker process: forward passes until duration has elapsed."""
+    import torch
+    import torchvision.models as models
+    
+    if cpus:
+        os.sched_setaffinity(0, cpus)
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+    model = models.resnet50(weights=None).eval()
+    batch = torch.randn(batch_size, 3, 224, 224)
+    with torch.no_grad():
+        model(batch)  # warm-up
+        
+        barrier.wait()
+        latencies = []
+        start = time.perf_counter()
+        while time.perf_counter() - start < duration:
+            batch_start = time.perf_counter()
+            model(batch)
+            latencies.append(time.perf_counter() - batch_start)
+        elapsed = time.perf_counter() - start
+    results.put((len(latencies) * batch_size, elapsed, latencies))
+
+
+def run_split(workers, threads, args, pin):
+    """Run one split; returns (images/sec, median batch latency in ms)."""
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+    cpu_ids = allowed_cpus()
+    processes = []
+    for index in range(workers):
+        cpus = cpu_ids[index * threads:(index + 1) * threads] if pin else None
+        process = ctx.Process(
+            target=worker, args=(threads, cpus, args.batch_size, args.duration, barrier, results)
+        )
+        process.start()
+        processes.append(process)
+    
+    outputs = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    # The last batch of each worker runs past the deadline, so divide by
+    # the longest actual run time
+    images = sum(count for count, _, _ in outputs)
+    elapsed = max(seconds for _, seconds, _ in outputs)
+    latencies = [latency for _, _, samples in outputs for latency in samples]
+    return images / elapsed, statistics.median(latencies) * 1000
+
+
+def main(args):
+    cpus = available_cpus()
+    splits = [(workers, cpus // workers) for workers in range(1, cpus + 1) if cpus // workers >= 1]
+    splits = sorted(set(splits))
+    if args.max_workers:
+        splits = [split for split in splits if split[0] <= args.max_workers]
+    
+    print("="*64)
+    print(f"Workers x Threads Sweep ({cpus} CPU(s), batch size {args.batch_size}, "
+          f"{args.duration:.0f}s per split{', pinned' if args.pin else ''})")
+    print("="*64)
+    print(f"{'split':<18} | {'images/sec':>10} | {'batch p50':>10} | {'vs 1 x ' + str(cpus):>10}")
+    print("-"*64)
+    
+    results = []
+    for workers, threads in splits:
+        throughput, latency = run_split(workers, threads, args, args.pin)
+        results.append((throughput, workers, threads))
+        baseline = results[0][0]
+        print(f"{f'{workers} x {threads}':<18} | {throughput:>10.1f} | {latency:>8.0f}ms | "
+              f"{throughput / baseline:>9.2f}x", flush=True)
+    
+    if args.untuned:
+        for workers in range(2, (args.max_workers or cpus) + 1):
+            throughput, latency = run_split(workers, cpus, args, pin=False)
+            print(f"{f'{workers} x {cpus} (untuned)':<18} | {throughput:>10.1f} | {latency:>8.0f}ms | "
+                  f"{throughput / results[0][0]:>9.2f}x", flush=True)
+    print("-"*64)
+    
+    throughput, workers, threads = max(results)
+    best = {
+        'WORKERS': workers,
+        'TORCH_THREADS': threads,
+        'TORCH_INTEROP_THREADS': 1,
+        'PIN_WORKERS': int(args.pin),
+    }
+    print(f"Best: {workers} worker(s) x {threads} thread(s), {throughput:.1f} images/sec")
+    if not args.dry_run:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(best, f, indent=2)
+            f.write("\n")
+        print(f"Written to {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per split")
+    parser.add_argument("--max-workers", type=int, default=0, help="Largest worker count to try (0 = one per CPU)")
+    parser.add_argument("--pin", action="store_true", help="Pin each worker to its own cores")
+    parser.add_argument("--untuned", action="store_true", help="Also measure workers that each use every CPU")
+    parser.add_argument("--output", default=os.path.join(PROJECT_ROOT, "config", "threads.json"))
+    parser.add_argument("--dry-run", action="store_true", help="Do not write the config file")
+    args = parser.parse_args()
+    
+    main(args)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Queued input dtype: normalized float32 per request vs. uint8 + per-batch normalize.
+
+- Memory: bytes held per queued request, for a full queue, per batch
+  buffer and per preprocessing pool slot.
+- Throughput: the same closed-loop load through BatchManager (buffer
+  pool, simulated model) with each client preprocessing a decoded image
+  to float32, or to uint8 with preprocessing.normalize_batch applied once
+  per batch. Reports per-request preprocess time, per-batch build time
+  (including the normalize) and requests/sec.
+- Parity: max abs difference of the model inputs and of ResNet-50 logits
+  (random weights, fixed seed) between the two paths.
+
+Usage:
+    python benchmarks/bench_uint8_inputs.py
+    python benchmarks/bench_uint8_inputs.py --clients 32 --requests 2000
+"""
+
+import argparse
+import asyncio
+import io
+import math
+import os
+import statistics
+import sys
+import time
+
+import torch
+import torchvision.models as models
+from PIL import Image
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+from batch_manager import BatchManager  # noqa: E402
+from batch_buffers import BatchBufferPool  # noqa: E402
+from inference_executor import InferenceExecutor  # noqa: E402
+from preprocessing import INPUT_SHAPE, build_preprocess, normalize_batch  # noqa: E402
+
+IMAGE_PATH = os.path.join(PROJECT_ROOT, "test-data", "dog.jpg")
+
+MODES = {
+    'float32': dict(uint8=False, dtype=torch.float32, batch_transform=None),
+    'uint8': dict(uint8=True, dtype=torch.uint8, batch_transform=normalize_batch),
+}
+
+
+class TimedBatchManager(BatchManager):
+    """BatchManager that records how long building each batch input takes."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.build_times = []
+    
+    def build_batch(self, batch_items):
+        start = time.perf_counter()
+        batch_tensor = super().build_batch(batch_items)
+        self.build_times.append(time.perf_counter() - start)
+        return batch_tensor
+
+
+def simulated_model(batch: torch.Tensor) -> torch.Tensor:
+    """Touches the whole input like a first conv layer would."""
+    return batch.mean(dim=(2, 3)).repeat(1, 334)[:, :1000]
+
+
+async def run_mode(mode, image, args):
+    preprocess = build_preprocess(uint8=mode['uint8'])
+    manager = TimedBatchManager(
+        max_batch_size=args.batch_size,
+        max_wait_time=0.005,
+        executor=InferenceExecutor(num_threads=1),
+        buffer_pool=BatchBufferPool(args.batch_size, INPUT_SHAPE, dtype=mode['dtype']),
+        batch_transform=mode['batch_transform']
+    )
+    manager.start(simulated_model)
+    
+    remaining = [args.requests]
+    preprocess_times = []
+    
+    async def client(client_id):
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            start = time.perf_counter()
+            tensor = preprocess(image)
+            preprocess_times.append(time.perf_counter() - start)
+            await manager.add_to_batch(tensor, f"c{client_id}")
+    
+    start = time.perf_counter()
+    await asyncio.gather(*[client(c) for c in range(args.clients)])
+    elapsed = time.perf_counter() - start
+    manager.stop()
+    
+    return {
+        'preprocess_ms': statistics.median(preprocess_times) * 1000,
+        'build_us': statistics.median(manager.build_times) * 1e6,
+        'throughput': args.requests / elapsed,
+    }
+
+
+def parity(image_bytes):
+    """Input and logit differences between the two paths for a few crops."""
+    image = Image.open(io.BytesIO(image_bytes)).convert('RGB')
+    width, height = image.size
+    images = [image, image.crop((0, 0, width // 2, height)), image.resize((300, 800))]
+    
+    float_inputs = torch.stack([build_preprocess()(im) for im in images])
+    uint8_inputs = normalize_batch(torch.stack([build_preprocess(uint8=True)(im) for im in images]))
+    
+    torch.manual_seed(0)
+    model = models.resnet50(weights=None).eval()
+    with torch.no_grad():
+        float_logits = model(float_inputs)
+        uint8_logits = model(uint8_inputs)
+    same_top5 = (float_logits.topk(5).indices == uint8_logits.topk(5).indices).all(dim=1)
+    return {
+        'input_max_diff': (float_inputs - uint8_inputs).abs().max().item(),
+        'logit_max_diff': (float_logits - uint8_logits).abs().max().item(),
+        'top5_same': f"{int(same_top5.sum())}/{len(images)}",
+    }
+
+
+def main(args):
+    torch.set_num_threads(1)
+    with open(IMAGE_PATH, 'rb') as f:
+        image_bytes = f.read()
+    image = Image.open(io.BytesIO(image_bytes)).convert('RGB')
+    
+    pixels = math.prod(INPUT_SHAPE)
+    
+    print("="*70)
+    print("Memory per Queued Input")
+    print("="*70)
+    print(f"{'dtype':<8} | {'request':>9} | {'queue of ' + str(args.queue_size):>12} | "
+          f"{'batch buffer':>12} | {'pool slot':>9}")
+    print("-"*70)
+    for name, mode in MODES.items():
+        item = pixels * mode['dtype'].itemsize
+        print(f"{name:<8} | {item / 1024:>7.0f}KB | {item * args.queue_size / 1e6:>10.1f}MB | "
+              f"{item * args.batch_size / 1e6:>10.2f}MB | {item / 1024:>7.0f}KB")
+    print("-"*70)
+    
+    print()
+    print("="*70)
+    print(f"Closed Loop ({args.clients} clients, {args.requests} requests, batch {args.batch_size}, 1 thread)")
+    print("="*70)
+    print(f"{'dtype':<8} | {'preprocess':>10} | {'batch build':>11} | {'requests/sec':>12}")
+    print("-"*70)
+    for name, mode in MODES.items():
+        result = asyncio.run(run_mode(mode, image, args))
+        print(f"{name:<8} | {result['preprocess_ms']:>8.2f}ms | {result['build_us']:>9.0f}us | "
+              f"{result['throughput']:>12.1f}")
+    print("-"*70)
+    
+    result = parity(image_bytes)
+    print()
+    print("="*70)
+    print("Parity (float32 path vs. uint8 + normalize_batch)")
+    print("="*70)
+    print(f"Max abs input difference: {result['input_max_diff']:.2e}")
+    print(f"Max abs logit difference: {result['logit_max_diff']:.2e} (ResNet-50, random weights)")
+    print(f"Identical top-5:          {result['top5_same']}")
+    print("-"*70)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--queue-size", type=int, default=64)
+    args = parser.parse_args()
+    
+    main(args)
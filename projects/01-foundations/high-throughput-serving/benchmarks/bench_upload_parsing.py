@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Upload parsing overhead: FastAPI UploadFile vs. streaming multipart vs. raw body.
+
+Measures, per request, the server-side work to get the encoded image
+bytes out of a /predict request body arriving in 64KB ASGI chunks:
+
+- UploadFile: Starlette's request.form() spools the part into a
+  SpooledTemporaryFile (on disk above 1MB), then UploadFile.read()
+  copies it back (the previous /predict path)
+- streaming multipart: upload_input.read_multipart_file
+- raw body: upload_input.read_body on an image/jpeg body
+
+for test-data/dog.jpg and larger synthetic bodies. Reports median time
+per request and the peak Python memory allocated while parsing.
+
+Usage:
+    python benchmarks/bench_upload_parsing.py
+    python benchmarks/bench_upload_parsing.py --iterations 500 --sizes 1,4,16
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+from starlette.requests import Request
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+from upload_input import read_body, read_multipart_file  # noqa: E402
+
+IMAGE_PATH = os.path.join(PROJECT_ROOT, "test-data", "dog.jpg")
+BOUNDARY = b"----bench-upload-boundary"
+CHUNK_SIZE = 64 * 1024
+MAX_BYTES = 1 << 30
+
+
+def multipart_body(data):
+    return (
+        b"--" + BOUNDARY + b"\r\n"
+        b'Content-Disposition: form-data; name="file"; filename="image.jpg"\r\n'
+        b"Content-Type: image/jpeg\r\n\r\n" + data + b"\r\n"
+        b"--" + BOUNDARY + b"--\r\n"
+    )
+
+
+def make_request(body, content_type):
+    """A Request whose body arrives in CHUNK_SIZE pieces, as from uvicorn."""
+    # Each chunk is created when received (and freed once consumed), so
+    # the traced peak is the parser's memory, not a pre-split body
+    offsets = iter(range(0, len(body), CHUNK_SIZE))
+    
+    async def receive():
+        offset = next(offsets, None)
+        if offset is None:
+            return {"type": "http.request", "body": b"", "more_body": False}
+        return {"type": "http.request", "body": body[offset:offset + CHUNK_SIZE], "more_body": True}
+    
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/predict",
+        "headers": [
+            (b"content-type", content_type.encode()),
+            (b"content-length", str(len(body)).encode()),
+        ],
+    }
+    return Request(scope, receive)
+
+
+async def upload_file(body):
+    request = make_request(body, f"multipart/form-data; boundary={BOUNDARY.decode()}")
+    form = await request.form()
+    try:
+        return await form["file"].read()
+    finally:
+        await form.close()
+
+
+async def streaming_multipart(body):
+    request = make_request(body, f"multipart/form-data; boundary={BOUNDARY.decode()}")
+    data, _ = await read_multipart_file(request, MAX_BYTES)
+    return data
+
+
+async def raw_body(body):
+    return await read_body(make_request(body, "image/jpeg"), MAX_BYTES)
+
+
+def measure(parse, body, expected, iterations):
+    """Median milliseconds per request and peak traced memory in MB."""
+    loop = asyncio.new_event_loop()
+    try:
+        assert loop.run_until_complete(parse(body)) == expected  # warm-up + check
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            loop.run_until_complete(parse(body))
+            samples.append((time.perf_counter() - start) * 1000)
+        
+        tracemalloc.start()
+        loop.run_until_complete(parse(body))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        loop.close()
+    return statistics.median(samples), peak / (1024 * 1024)
+
+
+def main(args):
+    with open(IMAGE_PATH, "rb") as f:
+        images = [("dog.jpg", f.read())]
+    for size in args.sizes:
+        images.append((f"{size}MB", os.urandom(int(size * 1024 * 1024))))
+    
+    methods = [
+        ("UploadFile", upload_file, multipart_body),
+        ("streaming multipart", streaming_multipart, multipart_body),
+        ("raw body", raw_body, lambda data: data),
+    ]
+    
+    print("="*70)
+    print(f"Upload Parsing Overhead per Request ({CHUNK_SIZE // 1024}KB chunks, {args.iterations} iterations)")
+    print("="*70)
+    print(f"{'image':<10} | {'method':<20} | {'median':>9} | {'peak mem':>9} | {'speedup':>7}")
+    print("-"*70)
+    for name, data in images:
+        iterations = max(10, int(args.iterations * min(1.0, 256 * 1024 / len(data))))
+        baseline = None
+        for method, parse, build_body in methods:
+            ms, peak = measure(parse, build_body(data), data, iterations)
+            baseline = baseline or ms
+            print(f"{name:<10} | {method:<20} | {ms:>7.3f}ms | {peak:>7.1f}MB | {baseline / ms:>6.1f}x")
+        print("-"*70)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=200, help="Iterations for the smallest image")
+    parser.add_argument("--sizes", type=lambda s: [float(x) for x in s.split(",")], default=[2.0, 8.0],
+                        help="Synthetic body sizes in MB")
+    args = parser.parse_args()
+    
+    main(args)
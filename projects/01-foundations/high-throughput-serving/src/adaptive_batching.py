@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Adaptive batch size and wait-time controller.
+
+A fixed max_batch_size/max_wait_time is wrong at both ends: at low load
+requests wait for batches that never fill, and at high load batches are too
+small to keep up. AdaptiveBatchController periodically looks at what the
+BatchManager actually did (arrival rate, batch service times, per-request
+queue wait) and retunes both:
+
+- max_batch_size: the largest batch whose service time s(b) still fits in
+  the latency SLO behind one batch already running (2 * s(b) <= SLO).
+  This is the throughput knob; batches only get that big when requests
+  are queued.
+- max_wait_time: the time needed to fill the smallest batch that keeps
+  inference utilization (arrival_rate * s(b) / b) under target, capped by
+  what is left of the budget. At low load this goes to the minimum.
+
+s(b) = fixed + per_item * b is fitted to recent batches.
+
+Observed p99 feeds back through a headroom factor that shrinks the wait
+budget when the SLO is missed and relaxes it when there is slack.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Optional, Tuple
+
+from metrics import update_batching_params
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(values, pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class AdaptiveBatchController:
+    """Retunes a BatchManager's max_batch_size and max_wait_time at runtime."""
+    
+    def __init__(
+        self,
+        batch_manager,
+        latency_slo: float,
+        max_batch_size: Optional[int] = None,
+        min_wait_time: float = 0.001,
+        max_wait_time: float = 0.1,
+        interval: float = 1.0,
+        target_utilization: float = 0.85
+    ):
+        """
+        Initialize adaptive controller.
+        
+        Args:
+            batch_manager: BatchManager to tune
+            latency_slo: Target p99 request latency (seconds, queue + inference)
+            max_batch_size: Upper bound for max_batch_size (defaults to the
+                manager's current value, which is also the buffer capacity)
+            min_wait_time: Lower bound for max_wait_time (seconds)
+            max_wait_time: Upper bound for max_wait_time (seconds)
+            interval: Seconds between adjustments
+            target_utilization: Highest planned inference utilization
+        """
+        self.batch_manager = batch_manager
+        self.latency_slo = latency_slo
+        self.batch_size_limit = max_batch_size or batch_manager.max_batch_size
+        self.min_wait_time = min_wait_time
+        self.max_wait_time = max_wait_time
+        self.interval = interval
+        self.target_utilization = target_utilization
+        
+        # Smoothed state
+        self.arrival_rate = None
+        self.headroom = 1.0
+        self.last_p99 = None
+        
+        self._service_samples = deque(maxlen=256)  # (batch_size, service_time)
+        self._last_update = time.monotonic()
+        self._last_arrivals = batch_manager.arrival_count
+        self.task = None
+        
+        update_batching_params(batch_manager.max_batch_size, batch_manager.max_wait_time, 0.0)
+        logger.info(
+            f"AdaptiveBatchController initialized: slo={latency_slo*1000:.0f}ms, "
+            f"batch_size_limit={self.batch_size_limit}"
+        )
+    
+    def start(self) -> None:
+        """Start adjusting in the background."""
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+    
+    def stop(self) -> None:
+        """Stop adjusting; the current values stay in place."""
+        if self.task:
+            self.task.cancel()
+            self.task = None
+    
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.update()
+            except Exception as e:
+                logger.error(f"Adaptive batching update failed: {e}", exc_info=True)
+    
+    def update(self) -> None:
+        """Observe the last interval and retune the batch manager."""
+        now = time.monotonic()
+        elapsed = max(now - self._last_update, 1e-6)
+        
+        # Arrival rate, smoothed
+        arrivals = self.batch_manager.arrival_count - self._last_arrivals
+        rate = arrivals / elapsed
+        self.arrival_rate = rate if self.arrival_rate is None else 0.7 * rate + 0.3 * self.arrival_rate
+        
+        # Batches completed since the last update
+        latencies = []
+        for batch in self.batch_manager.recent_batches:
+            if batch['completed_at'] <= self._last_update:
+                continue
+            self._service_samples.append((batch['size'], batch['service_time']))
+            latencies.extend(wait + batch['service_time'] for wait in batch['queue_waits'])
+        
+        self._last_update = now
+        self._last_arrivals = self.batch_manager.arrival_count
+        
+        # Feedback on the SLO: shrink the budget on a miss, relax it with slack
+        if latencies:
+            self.last_p99 = percentile(latencies, 99)
+            if self.last_p99 > self.latency_slo:
+                self.headroom = max(0.3, self.headroom * 0.8)
+            elif self.last_p99 < 0.7 * self.latency_slo:
+                self.headroom = min(1.0, self.headroom * 1.05)
+        
+        service_model = self._fit_service_time()
+        if service_model is None:
+            return
+        
+        batch_size, wait_time = self._plan(*service_model)
+        if (batch_size, wait_time) != (self.batch_manager.max_batch_size, self.batch_manager.max_wait_time):
+            logger.debug(
+                f"Adaptive batching: max_batch_size={batch_size}, max_wait_time={wait_time*1000:.1f}ms "
+                f"(arrival_rate={self.arrival_rate:.1f}/s, p99={(self.last_p99 or 0)*1000:.0f}ms)"
+            )
+        self.batch_manager.max_batch_size = batch_size
+        self.batch_manager.max_wait_time = wait_time
+        update_batching_params(batch_size, wait_time, self.arrival_rate)
+    
+    def _fit_service_time(self) -> Optional[Tuple[float, float]]:
+        """Least-squares fit of service_time = fixed + per_item * batch_size."""
+        if not self._service_samples:
+            return None
+        
+        n = len(self._service_samples)
+        mean_b = sum(b for b, _ in self._service_samples) / n
+        mean_t = sum(t for _, t in self._service_samples) / n
+        var_b = sum((b - mean_b) ** 2 for b, _ in self._service_samples)
+        
+        if var_b > 0:
+            per_item = sum((b - mean_b) * (t - mean_t) for b, t in self._service_samples) / var_b
+            per_item = max(per_item, 0.0)
+            fixed = max(mean_t - per_item * mean_b, 0.0)
+        else:
+            # Only one batch size seen so far: assume an even split
+            fixed = mean_t / 2
+            per_item = mean_t / 2 / mean_b
+        return fixed, per_item
+    
+    def _plan(self, fixed: float, per_item: float) -> Tuple[int, float]:
+        """Pick max_batch_size for throughput and max_wait_time for latency."""
+        # Feedback only tightens the wait: shrinking batches when the SLO is
+        # missed under overload would cut throughput and make it worse
+        budget = self.latency_slo * self.headroom
+        rate = max(self.arrival_rate or 0.0, 1e-3)
+        
+        def service(batch_size):
+            return fixed + per_item * batch_size
+        
+        # Throughput: the largest batch that still fits in the budget behind
+        # one batch already in inference. Batches only reach this size when
+        # requests are queued, so a large cap costs nothing at low load.
+        batch_size = 1
+        for candidate in range(1, self.batch_size_limit + 1):
+            if 2 * service(candidate) <= self.latency_slo:
+                batch_size = candidate
+        
+        # Latency: wait only as long as it takes to fill the smallest batch
+        # that keeps inference utilization under target at this arrival rate
+        needed = batch_size
+        for candidate in range(1, batch_size + 1):
+            if rate * service(candidate) / candidate < self.target_utilization:
+                needed = candidate
+                break
+        
+        fill_wait = min((needed - 1) / rate, budget - 2 * service(needed))
+        return batch_size, self._clamp_wait(fill_wait)
+    
+    def _clamp_wait(self, wait_time: float) -> float:
+        return round(min(max(wait_time, self.min_wait_time), self.max_wait_time), 4)
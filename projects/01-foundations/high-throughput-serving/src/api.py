@@ -2,36 +2,73 @@
 """FastAPI service for ResNet-50 model serving."""
 import sys
 import os
+import time
 # Add the src directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse, Response
+# Reported as the "imports" startup phase. Only torchvision is deferred
+# (model_loader, preprocessing and postprocessing import it on first use).
+# torch, PIL, prometheus_client and the rest of src/ are still imported
+# here, torch being nearly all of this phase: no request can be served
+# without them, so importing them in the lifespan would not make the
+# process ready any sooner.
+_import_start = time.time()
+
+from fastapi import FastAPI, Header, Request, HTTPException
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.datastructures import UploadFile
 import torch
-import torchvision.models as models
-from torchvision import transforms
-from PIL import Image
-import io
-import time
+from typing import Awaitable, Callable, Optional, Tuple
+import asyncio
+import contextlib
+import functools
+import json
+import math
 import uuid
+import config
 from batch_manager import BatchManager
+from request_queue import PRIORITY_CLASSES, DEFAULT_PRIORITY, DeadlineExceededError, QueueFullError
+from batch_buffers import BatchBufferPool
+from adaptive_batching import AdaptiveBatchController
+from readiness import ReadinessMonitor
+from inference_executor import InferenceExecutor
+from replica_pool import ReplicaPool
+from thread_config import configure_threads
+from model_loader import load_model
+from model_engine import ENGINES
+from inference_backend import BACKENDS, export_onnx, load_backend
+from precision import PRECISIONS, check_precision, load_images
+from preprocessing import INPUT_SHAPE, build_preprocess, normalize_batch, preprocess_bytes
+from preprocess_pool import PreprocessPool
+from postprocessing import top_k_predictions
+from prediction_cache import PredictionCache
+from archive_input import ArchiveError, ArchiveTooLargeError, iter_archive_images
+from tensor_input import TensorInputError, tensor_from_body, to_model_input
+from upload_input import BodyTooLargeError, UploadError, read_body, read_form, read_image_upload
 
 # Monitoring imports
-from logger_config import setup_logging, get_logger, PerformanceLogger
+from logger_config import setup_logging, stop_logging, get_logger, PerformanceLogger
 from metrics import (
     MetricsTracker, track_inference, track_batch, 
-    update_queue_length, get_metrics, model_load_time
+    update_batching_params,
+    get_metrics, model_backend, model_load_time, model_warmup_time, startup_phase_time,
+    update_model_precision, track_prediction_request, track_prediction_success, track_prediction_partial,
+    track_prediction_error,
+    collect_samples, sum_samples, multiprocess_enabled, prepare_multiprocess_dir, mark_worker_dead,
+    STAGES, track_stage, track_log_drop
 )
 
 # Setup structured logging
-setup_logging(log_level="INFO", json_logs=False)  # Set to True for production JSON logs
+setup_logging(
+    log_level="INFO",
+    json_logs=False,  # Set to True for production JSON logs
+    async_queue_size=config.LOG_QUEUE_SIZE if config.LOG_ASYNC else 0,
+    sample_rate=config.LOG_SAMPLE_RATE,
+    on_drop=track_log_drop
+)
 logger = get_logger(__name__)
 
-# Global counters
-request_count = 0
-success_count = 0
-error_count = 0
-total_latency = 0.0
+_import_time = time.time() - _import_start
 
 # Initialize FastAPI
 app = FastAPI(
@@ -43,44 +80,93 @@ app = FastAPI(
 # Global variables
 model = None
 preprocess = None
+preprocess_pool = None
+prediction_cache = None
 batch_manager = None
+batch_controller = None
+readiness = None
+thread_plan = None
+model_ready = False
+precision_report = None
+startup_phases = {}
 
-# ImageNet class labels (subset for demo)
-IMAGENET_CLASSES = {
-    0: "tench", 1: "goldfish", 2: "great white shark",
-    207: "golden retriever", 208: "Labrador retriever",
-    258: "Samoyed", 259: "Pomeranian", 260: "Chow",
-    281: "tabby cat", 282: "tiger cat", 283: "Persian cat",
-}
+
+@contextlib.contextmanager
+def startup_phase(name: str):
+    """Time one startup phase: logged, listed under /metrics "startup" and exported to Prometheus."""
+    start = time.time()
+    with PerformanceLogger(logger, name):
+        yield
+    elapsed = time.time() - start
+    startup_phases[name] = round(elapsed, 3)
+    startup_phase_time.labels(phase=name).set(elapsed)
 
 
 @app.on_event("startup")
 async def startup():
     """Load model and start batch manager on application startup."""
-    global model, preprocess, batch_manager
+    global model, preprocess, preprocess_pool, prediction_cache, batch_manager, batch_controller, model_ready
+    global precision_report, readiness, thread_plan
     
     logger.info("="*60)
     logger.info("🚀 Starting ResNet-50 Serving API")
     logger.info("="*60)
+    startup_phases['imports'] = round(_import_time, 3)
+    startup_phase_time.labels(phase='imports').set(_import_time)
     
-    with PerformanceLogger(logger, "model_loading"):
+    if config.MODEL_ENGINE not in ENGINES:
+        raise ValueError(f"MODEL_ENGINE must be one of {', '.join(ENGINES)}, got {config.MODEL_ENGINE!r}")
+    if config.PRECISION not in PRECISIONS:
+        raise ValueError(f"PRECISION must be one of {', '.join(PRECISIONS)}, got {config.PRECISION!r}")
+    if config.PRECISION == 'int8' and not config.CALIBRATION_DIR:
+        raise ValueError("PRECISION=int8 needs CALIBRATION_DIR, a directory of representative images")
+    if config.PRECISION == 'int8' and not config.AGREEMENT_DIR:
+        raise ValueError("PRECISION=int8 needs AGREEMENT_DIR, images not in CALIBRATION_DIR, for the agreement check")
+    if config.PRECISION == 'int8' and os.path.samefile(config.AGREEMENT_DIR, config.CALIBRATION_DIR):
+        raise ValueError("PRECISION=int8 needs an AGREEMENT_DIR other than CALIBRATION_DIR to check unseen images")
+    if config.PRECISION == 'bf16' and not (config.CALIBRATION_DIR or config.AGREEMENT_DIR):
+        raise ValueError("PRECISION=bf16 needs AGREEMENT_DIR (or CALIBRATION_DIR) for the agreement check")
+    if config.INFERENCE_BACKEND not in BACKENDS:
+        raise ValueError(f"INFERENCE_BACKEND must be one of {', '.join(BACKENDS)}, got {config.INFERENCE_BACKEND!r}")
+    if config.INFERENCE_BACKEND == 'onnxruntime' and (
+        config.PRECISION != 'fp32' or config.MODEL_ENGINE != 'eager' or config.CHANNELS_LAST
+    ):
+        raise ValueError(
+            "INFERENCE_BACKEND=onnxruntime runs the exported fp32 graph; "
+            "use PRECISION=fp32, MODEL_ENGINE=eager and CHANNELS_LAST=0"
+        )
+    
+    # Size this worker's torch thread pools (and pin it) before any
+    # forward pass; the inter-op pool cannot be resized later
+    thread_plan = configure_threads(
+        workers=config.WORKERS,
+        concurrency=config.INFERENCE_THREADS,
+        intra_op=config.TORCH_THREADS,
+        inter_op=config.TORCH_INTEROP_THREADS,
+        pin=config.PIN_WORKERS
+    )
+    
+    # Decode/preprocess on worker processes instead of the event loop.
+    # The workers spawn (and import torch) while the model loads.
+    pool_started = None
+    if config.PREPROCESS_WORKERS > 0:
+        preprocess_pool = PreprocessPool(
+            num_workers=config.PREPROCESS_WORKERS,
+            slots_per_worker=config.PREPROCESS_SLOTS_PER_WORKER,
+            jpeg_draft=config.JPEG_DRAFT_DECODE,
+            uint8=config.UINT8_INPUTS
+        )
+        pool_started = asyncio.create_task(preprocess_pool.start())
+    
+    with startup_phase("model_loading"):
         start_time = time.time()
         
-        # Load model
+        # Load model: memory-mapped local weights, no network
         logger.info("Loading ResNet-50 model...")
-        model = models.resnet50(pretrained=True)
-        model.eval()
+        model = await asyncio.to_thread(load_model, config.MODEL_PATH, config.MODEL_DOWNLOAD)
         
-        # Setup preprocessing
-        preprocess = transforms.Compose([
-            transforms.Resize(256),
-            transforms.CenterCrop(224),
-            transforms.ToTensor(),
-            transforms.Normalize(
-                mean=[0.485, 0.456, 0.406],
-                std=[0.229, 0.224, 0.225]
-            ),
-        ])
+        # Setup preprocessing (uint8 pixels when normalizing per batch)
+        preprocess = build_preprocess(uint8=config.UINT8_INPUTS)
         
         elapsed = time.time() - start_time
         model_load_time.set(elapsed)
@@ -94,18 +180,167 @@ async def startup():
             }
         )
     
+    if pool_started is not None:
+        # Only the part of the worker start-up not hidden behind model loading
+        with startup_phase("preprocess_pool"):
+            await pool_started
+        
+        logger.info(
+            "Preprocessing pool started",
+            extra={'workers': config.PREPROCESS_WORKERS}
+        )
+    
+    # Predictions for repeated uploads, keyed by image bytes + model version
+    if config.PREDICTION_CACHE_ENTRIES > 0:
+        prediction_cache = PredictionCache(
+            max_entries=config.PREDICTION_CACHE_ENTRIES,
+            max_bytes=int(config.PREDICTION_CACHE_MB * 1024 * 1024),
+            model_version=config.MODEL_VERSION
+        )
+    
+    # Reduced precision: convert, then refuse to start if the model no
+    # longer agrees with fp32 on the check images
+    served_model = model
+    calibration = None
+    precision_report = {'mode': 'fp32', 'speedup': 1.0, 'top1_agreement': 1.0, 'top5_agreement': 1.0}
+    if config.PRECISION != 'fp32':
+        with startup_phase("precision_check"):
+            if config.CALIBRATION_DIR:
+                calibration = await asyncio.to_thread(
+                    load_images, config.CALIBRATION_DIR, config.CALIBRATION_IMAGES
+                )
+            check_images = calibration
+            if config.AGREEMENT_DIR:
+                check_images = await asyncio.to_thread(
+                    load_images, config.AGREEMENT_DIR, config.CALIBRATION_IMAGES
+                )
+            served_model, precision_report = await asyncio.to_thread(
+                check_precision, model, config.PRECISION, calibration, check_images,
+                config.MIN_TOP1_AGREEMENT, config.MIN_TOP5_AGREEMENT, config.MAX_BATCH_SIZE,
+                config.MIN_CHECK_IMAGES
+            )
+    update_model_precision(
+        precision_report['mode'], precision_report['speedup'],
+        precision_report['top1_agreement'], precision_report['top5_agreement']
+    )
+    
+    # Load the inference backend and run every batch size once, so the
+    # first requests don't pay for compilation
+    if config.INFERENCE_BACKEND == 'onnxruntime':
+        backend_options = {'path': config.ONNX_MODEL_PATH, 'num_threads': config.ONNX_THREADS}
+        # Export here rather than in every replica; later starts reuse the file
+        with startup_phase("onnx_export"):
+            await asyncio.to_thread(export_onnx, model, config.ONNX_MODEL_PATH)
+    else:
+        backend_options = {'engine': config.MODEL_ENGINE, 'channels_last': config.CHANNELS_LAST}
+    prepare = functools.partial(
+        load_backend,
+        backend=config.INFERENCE_BACKEND,
+        max_batch_size=config.MAX_BATCH_SIZE,
+        warmup_iterations=config.WARMUP_ITERATIONS,
+        **backend_options
+    )
+    model_backend.labels(backend=config.INFERENCE_BACKEND).set(1)
+    
+    # Forward passes run off the event loop: on a dedicated inference
+    # thread, or on replica processes sharing the fp32 weights (each
+    # replica converts, builds and warms up its own backend)
+    warmup_start = time.time()
+    with startup_phase("model_warmup"):
+        if config.REPLICAS > 0:
+            if config.INFERENCE_BACKEND == 'torch':
+                prepare = functools.partial(prepare, precision=precision_report['mode'], calibration=calibration)
+            # Replicas split this worker's share of the CPUs
+            threads_per_replica = config.REPLICA_THREADS or max(1, thread_plan['cpus_per_worker'] // config.REPLICAS)
+            executor = ReplicaPool(
+                model,
+                num_replicas=config.REPLICAS,
+                threads_per_replica=threads_per_replica,
+                prepare=prepare
+            )
+            await executor.start(timeout=600.0 if config.MODEL_ENGINE == 'compile' else 120.0)
+        else:
+            model = await asyncio.to_thread(prepare, served_model)
+            executor = InferenceExecutor(num_threads=config.INFERENCE_THREADS)
+    model_warmup_time.set(time.time() - warmup_start)
+    
+    # Requests are written into preallocated batch tensors as they arrive
+    buffer_pool = None
+    if config.BATCH_BUFFERS > 0:
+        buffer_pool = BatchBufferPool(
+            max_batch_size=config.MAX_BATCH_SIZE,
+            item_shape=INPUT_SHAPE,
+            dtype=torch.uint8 if config.UINT8_INPUTS else torch.float32,
+            num_buffers=config.BATCH_BUFFERS,
+            pin_memory=config.PIN_MEMORY
+        )
+    
     # Initialize and start batch manager
-    batch_manager = BatchManager(max_batch_size=8, max_wait_time=0.05)
+    batch_manager = BatchManager(
+        max_batch_size=config.MAX_BATCH_SIZE,
+        max_wait_time=config.MAX_WAIT_TIME_MS / 1000,
+        executor=executor,
+        postprocess=top_k_predictions,
+        buffer_pool=buffer_pool,
+        max_queue_size=config.MAX_QUEUE_SIZE or None,
+        max_queue_wait=config.MAX_QUEUE_WAIT_MS / 1000 or None,
+        batch_transform=normalize_batch if config.UINT8_INPUTS else None,
+        sample_interval=config.BATCH_SAMPLE_INTERVAL_MS / 1000
+    )
     batch_manager.start(model)
+    update_batching_params(config.MAX_BATCH_SIZE, config.MAX_WAIT_TIME_MS / 1000, 0.0)
+    
+    # Retune batch size and wait time against the latency SLO
+    if config.ADAPTIVE_BATCHING:
+        batch_controller = AdaptiveBatchController(
+            batch_manager,
+            latency_slo=config.LATENCY_SLO_MS / 1000,
+            max_wait_time=config.ADAPTIVE_MAX_WAIT_TIME_MS / 1000
+        )
+        batch_controller.start()
     
     logger.info(
         "Batch manager started",
         extra={
-            'max_batch_size': 8,
-            'max_wait_time_ms': 50
+            'max_batch_size': config.MAX_BATCH_SIZE,
+            'max_wait_time_ms': config.MAX_WAIT_TIME_MS,
+            'inference_threads': config.INFERENCE_THREADS,
+            'inference_backend': config.INFERENCE_BACKEND,
+            'model_engine': config.MODEL_ENGINE,
+            'channels_last': config.CHANNELS_LAST,
+            'precision': precision_report['mode'],
+            'replicas': config.REPLICAS,
+            'batch_buffers': config.BATCH_BUFFERS,
+            'uint8_inputs': config.UINT8_INPUTS,
+            'max_queue_size': config.MAX_QUEUE_SIZE,
+            'max_queue_wait_ms': config.MAX_QUEUE_WAIT_MS,
+            'adaptive_batching': config.ADAPTIVE_BATCHING,
+            'latency_slo_ms': config.LATENCY_SLO_MS
         }
     )
     
+    # /ready: every batch size has run during warmup; from here on it
+    # follows the health of the batching loop
+    readiness = ReadinessMonitor(
+        batch_manager,
+        stall_timeout=config.READY_STALL_SECONDS,
+        max_p99=config.READY_MAX_P99_MS / 1000 or None,
+        window=config.READY_WINDOW_SECONDS
+    )
+    
+    model_ready = True
+    readiness.check()  # sets server_ready before the first /ready probe
+    
+    total = time.time() - _import_start
+    startup_phases['total'] = round(total, 3)
+    startup_phase_time.labels(phase='total').set(total)
+    logger.info(
+        f"Startup took {total:.2f}s: " + ", ".join(
+            f"{phase}={seconds:.2f}s" for phase, seconds in startup_phases.items() if phase != 'total'
+        ),
+        extra={'startup_phases': startup_phases}
+    )
+    
     logger.info("="*60)
     logger.info("✅ API Ready to Serve Requests")
     logger.info("="*60)
@@ -114,9 +349,15 @@ async def startup():
 @app.on_event("shutdown")
 async def shutdown():
     """Cleanup on shutdown."""
+    if batch_controller:
+        batch_controller.stop()
     if batch_manager:
         batch_manager.stop()
+    if preprocess_pool:
+        preprocess_pool.shutdown()
+    mark_worker_dead()
     logger.info("Shutdown complete")
+    stop_logging()
 
 
 @app.get("/")
@@ -128,7 +369,11 @@ async def root():
         "status": "running",
         "endpoints": {
             "health": "/health",
+            "ready": "/ready",
+            "debug_batcher": "/debug/batcher",
             "predict": "/predict (POST)",
+            "predict_batch": "/predict/batch (POST, NDJSON)",
+            "predict_tensor": "/predict/tensor (POST, raw pixels or .npy)",
             "metrics": "/metrics",
             "prometheus": "/prometheus",
             "docs": "/docs"
@@ -138,90 +383,171 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
+    """Liveness check endpoint: answers while the event loop runs (see /ready for traffic)."""
     return {
-        "status": "healthy",
+        "status": "healthy" if model_ready else "starting",
         "model_loaded": model is not None,
+        "model_ready": model_ready,
+        "inference_backend": config.INFERENCE_BACKEND,
+        "model_engine": config.MODEL_ENGINE,
         "batch_manager_active": batch_manager is not None,
         "timestamp": time.time()
     }
 
 
-@app.post("/predict")
-async def predict(file: UploadFile = File(...)):
-    """Predict image class using batched inference with full monitoring."""
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness check endpoint for load balancers.
+    
+    200 once startup and warmup are done and while the batching loop is
+    running and making progress (with REPLICAS set, while a replica is
+    alive; and the inference p99 is under READY_MAX_P99_MS, if set);
+    503 with the reasons otherwise.
+    """
+    reasons = readiness.check() if readiness is not None else ["starting"]
+    p99 = readiness.last_p99 if readiness is not None else None
+    return JSONResponse(
+        status_code=503 if reasons else 200,
+        content={
+            "ready": not reasons,
+            "reasons": reasons,
+            "queue_length": len(batch_manager.queue) if batch_manager else 0,
+            "inference_p99_ms": round(p99 * 1000, 2) if p99 is not None else None,
+            "timestamp": time.time()
+        }
+    )
+
+
+@app.get("/debug/batcher")
+async def debug_batcher(limit: int = 20):
+    """
+    Recent batches of this worker and whether batching is latency- or throughput-bound.
     
-    global request_count, success_count, error_count, total_latency
+    Lists the last `limit` batches (newest first) with their size, fill
+    ratio, dispatch trigger, time to fill, model idle time before them,
+    queue depth left behind and service time, plus a summary over them.
+    """
+    if batch_manager is None:
+        raise HTTPException(status_code=503, detail="Batch manager not started")
+    return batch_manager.stats(max(0, min(limit, batch_manager.recent_batches.maxlen)))
+
+
+async def decode_upload(contents: bytes, timings: Optional[dict] = None) -> torch.Tensor:
+    """Decode and preprocess an uploaded image off the event loop (process pool, else a thread)."""
+    if preprocess_pool is not None:
+        return await preprocess_pool.preprocess(contents, timings)
+    return await asyncio.to_thread(preprocess_bytes, contents, preprocess, config.JPEG_DRAFT_DECODE, timings)
+
+
+def server_timing(timings: dict, total: float) -> str:
+    """Server-Timing header value: each measured stage and the total, in milliseconds."""
+    entries = [f"{stage};dur={timings[stage] * 1000:.2f}" for stage in STAGES if stage in timings]
+    return ", ".join(entries + [f"total;dur={total * 1000:.2f}"])
+
+
+async def run_prediction(
+    endpoint: str,
+    read_input: Callable[[], Awaitable[Tuple[bytes, str, Callable[[dict], Awaitable[torch.Tensor]], dict]]],
+    x_request_timeout_ms: Optional[float],
+    x_priority: str
+) -> Response:
+    """
+    Shared request path of the single-image endpoints.
+    
+    Args:
+        endpoint: Endpoint path, for metrics
+        read_input: Reads the request body. Returns (bytes for the cache
+            key, input format for the cache key, coroutine function that
+            builds the 3x224x224 input tensor and records its decode and
+            preprocess times in the dict it is given, extra fields to log).
+            Raises TensorInputError or UploadError for a malformed body
+            (400), BodyTooLargeError for one over MAX_BODY_MB (413).
+        x_request_timeout_ms: X-Request-Timeout-Ms header
+        x_priority: X-Priority header
+    
+    Returns:
+        JSON response, with a Server-Timing header of the stage timings
+        if SERVER_TIMING is enabled
+    """
     
     request_id = str(uuid.uuid4())[:8]
-    request_count += 1
+    track_prediction_request()
+    
+    # Deadline on the monotonic clock, relative to when the request got here
+    timeout_ms = x_request_timeout_ms or config.DEFAULT_REQUEST_TIMEOUT_MS
+    deadline = time.monotonic() + timeout_ms / 1000 if timeout_ms > 0 else None
     
     # Start metrics tracking
-    with MetricsTracker("POST", "/predict"):
+    with MetricsTracker("POST", endpoint):
         
         if model is None:
-            error_count += 1
+            track_prediction_error()
             logger.error(
                 "Model not loaded",
                 extra={'request_id': request_id}
             )
             raise HTTPException(status_code=503, detail="Model not loaded")
         
+        if x_priority not in PRIORITY_CLASSES:
+            track_prediction_error()
+            raise HTTPException(
+                status_code=400,
+                detail=f"X-Priority must be one of {', '.join(PRIORITY_CLASSES)}"
+            )
+        
         try:
             overall_start = time.time()
+            timings = {}
             
-            # Read and preprocess image
-            contents = await file.read()
+            # Read image
+            contents, input_format, make_input, log_extra = await read_input()
+            timings['body_read'] = time.time() - overall_start
             file_size = len(contents)
             
             logger.info(
                 "Request received",
                 extra={
                     'request_id': request_id,
-                    'uploaded_filename': file.filename,
-                    'file_size_bytes': file_size
+                    'file_size_bytes': file_size,
+                    **log_extra
                 }
             )
             
-            # Preprocess
-            image = Image.open(io.BytesIO(contents)).convert('RGB')
-            input_tensor = preprocess(image)
-            
-            # Update queue metrics
-            if batch_manager:
-                update_queue_length(len(batch_manager.queue))
+            # Repeated uploads are answered from the cache, before decoding
+            predictions = None
+            inference_time = 0.0
+            if prediction_cache is not None:
+                cache_key = prediction_cache.key(contents, input_format)
+                predictions = prediction_cache.get(cache_key)
+            cached = predictions is not None
             
-            # Add to batch and wait for result
-            logger.info(
-                "Adding to batch queue",
-                extra={'request_id': request_id}
-            )
-            
-            output, inference_time = await batch_manager.add_to_batch(input_tensor, request_id)
-            
-            # Track inference
-            track_inference("resnet50", inference_time)
-            
-            # Get predictions
-            probabilities = torch.nn.functional.softmax(output, dim=0)
-            top5_prob, top5_catid = torch.topk(probabilities, 5)
-            
-            predictions = []
-            for i in range(5):
-                class_id = top5_catid[i].item()
-                class_name = IMAGENET_CLASSES.get(class_id, f"class_{class_id}")
-                confidence = top5_prob[i].item()
+            if not cached:
+                # Turn overload away before spending time on decoding
+                batch_manager.check_admission()
+                
+                # Preprocess
+                input_tensor = await make_input(timings)
                 
-                predictions.append({
-                    "rank": i + 1,
-                    "class_id": class_id,
-                    "class_name": class_name,
-                    "confidence": round(confidence, 4)
-                })
+                # Add to batch and wait for result
+                logger.info(
+                    "Adding to batch queue",
+                    extra={'request_id': request_id}
+                )
+                
+                # Predictions come back already postprocessed for the whole batch
+                predictions, inference_time = await batch_manager.add_to_batch(
+                    input_tensor, request_id, deadline=deadline, priority=x_priority, timings=timings
+                )
+                
+                # Track inference
+                track_inference("resnet50", inference_time)
+                
+                if prediction_cache is not None:
+                    prediction_cache.put(cache_key, predictions)
             
             total_latency_ms = (time.time() - overall_start) * 1000
-            success_count += 1
-            total_latency += total_latency_ms
+            track_prediction_success(total_latency_ms / 1000)
             
             logger.info(
                 "Request completed successfully",
@@ -231,22 +557,71 @@ async def predict(file: UploadFile = File(...)):
                     'confidence': predictions[0]['confidence'],
                     'total_latency_ms': round(total_latency_ms, 2),
                     'inference_ms': round(inference_time * 1000, 2),
-                    'file_size_bytes': file_size
+                    'file_size_bytes': file_size,
+                    'cached': cached
                 }
             )
             
-            return {
+            serialize_start = time.time()
+            response = JSONResponse({
                 "success": True,
                 "request_id": request_id,
                 "predictions": predictions,
                 "latency_ms": round(total_latency_ms, 2),
                 "inference_ms": round(inference_time * 1000, 2),
                 "model": "ResNet-50",
-                "batched": True
-            }
+                "batched": not cached,
+                "cached": cached
+            })
+            timings['serialization'] = time.time() - serialize_start
+            
+            # queue_wait, inference and postprocess are tracked by the batch manager
+            for stage in ('body_read', 'decode', 'preprocess', 'serialization'):
+                if stage in timings:
+                    track_stage(stage, timings[stage])
+            if config.SERVER_TIMING:
+                response.headers['Server-Timing'] = server_timing(timings, time.time() - overall_start)
+            return response
+            
+        except BodyTooLargeError as e:
+            track_prediction_error()
+            raise HTTPException(status_code=413, detail=str(e)) from e
+            
+        except (TensorInputError, UploadError) as e:
+            track_prediction_error()
+            raise HTTPException(status_code=400, detail=str(e)) from e
+            
+        except QueueFullError as e:
+            track_prediction_error()
+            retry_after = max(1, math.ceil(e.retry_after))
+            logger.warning(
+                "Request rejected, batch queue full",
+                extra={
+                    'request_id': request_id,
+                    'queue_size': len(batch_manager.queue),
+                    'retry_after_s': retry_after
+                }
+            )
+            raise HTTPException(
+                status_code=429,
+                detail=str(e),
+                headers={"Retry-After": str(retry_after)}
+            ) from e
+            
+        except DeadlineExceededError as e:
+            track_prediction_error()
+            logger.warning(
+                "Request dropped before inference",
+                extra={
+                    'request_id': request_id,
+                    'timeout_ms': timeout_ms,
+                    'priority': x_priority
+                }
+            )
+            raise HTTPException(status_code=504, detail=str(e)) from e
             
         except Exception as e:
-            error_count += 1
+            track_prediction_error()
             logger.error(
                 "Request failed",
                 extra={
@@ -259,25 +634,377 @@ async def predict(file: UploadFile = File(...)):
             raise HTTPException(status_code=500, detail=str(e))
 
 
+# /predict reads its body itself (see upload_input), so the accepted
+# bodies are declared for the OpenAPI docs by hand
+PREDICT_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                }
+            },
+            "image/jpeg": {"schema": {"type": "string", "format": "binary"}},
+            "image/png": {"schema": {"type": "string", "format": "binary"}},
+        },
+    }
+}
+
+
+@app.post("/predict", openapi_extra=PREDICT_REQUEST_BODY)
+async def predict(
+    request: Request,
+    x_request_timeout_ms: Optional[float] = Header(None),
+    x_priority: str = Header(DEFAULT_PRIORITY)
+):
+    """
+    Predict image class using batched inference with full monitoring.
+    
+    The image is either the `file` part of a multipart/form-data body or
+    the whole body (Content-Type: image/jpeg, image/png, ...). The body is
+    streamed, not spooled, and refused with 413 above MAX_BODY_MB.
+    
+    Optional headers:
+        X-Request-Timeout-Ms: How long the client will wait. Requests that
+            cannot be answered in time are dropped before inference (504).
+        X-Priority: high, normal or low. Higher classes are batched first.
+    
+    With SERVER_TIMING=1 the response has a Server-Timing header with the
+    time spent in each stage (body_read, decode, preprocess, queue_wait,
+    inference, postprocess, serialization) and the total.
+    """
+    async def read_input():
+        contents, filename, body_format = await read_image_upload(request, config.MAX_BODY_BYTES)
+        log_extra = {'uploaded_filename': filename, 'body_format': body_format}
+        return contents, "", lambda timings: decode_upload(contents, timings), log_extra
+    
+    return await run_prediction("/predict", read_input, x_request_timeout_ms, x_priority)
+
+
+@app.post("/predict/tensor")
+async def predict_tensor(
+    request: Request,
+    x_tensor_shape: Optional[str] = Header(None),
+    x_tensor_dtype: Optional[str] = Header(None),
+    x_request_timeout_ms: Optional[float] = Header(None),
+    x_priority: str = Header(DEFAULT_PRIORITY)
+):
+    """
+    Predict from pre-decoded pixels, skipping JPEG decode.
+    
+    The body is either raw bytes (Content-Type: application/octet-stream,
+    with X-Tensor-Shape and optionally X-Tensor-Dtype) or a .npy file
+    (Content-Type: application/x-npy). Accepts uint8 [H, W, 3] RGB pixels
+    (224x224 = already cropped) or, unless UINT8_INPUTS=1, a normalized
+    float32 [3, 224, 224] input. Timeout and priority headers work as for /predict.
+    """
+    async def read_input():
+        contents = await read_body(request, config.MAX_BODY_BYTES)
+        content_type = request.headers.get("content-type", "").split(";")[0].strip()
+        tensor, input_format = tensor_from_body(contents, content_type, x_tensor_shape, x_tensor_dtype)
+        
+        async def make_input(timings):
+            start = time.time()
+            model_input = to_model_input(tensor, normalize=not config.UINT8_INPUTS)
+            timings['preprocess'] = time.time() - start
+            return model_input
+        
+        return contents, input_format, make_input, {'input_format': input_format}
+    
+    return await run_prediction("/predict/tensor", read_input, x_request_timeout_ms, x_priority)
+
+
+# /predict/batch parses its form itself, to limit the body size while
+# streaming, so its parts are declared for the OpenAPI docs by hand
+PREDICT_BATCH_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "files": {"type": "array", "items": {"type": "string", "format": "binary"}},
+                        "archive": {"type": "string", "format": "binary"},
+                    },
+                }
+            },
+        },
+    }
+}
+
+
+@app.post("/predict/batch", openapi_extra=PREDICT_BATCH_REQUEST_BODY)
+async def predict_batch(
+    request: Request,
+    x_request_timeout_ms: Optional[float] = Header(None),
+    x_priority: str = Header(DEFAULT_PRIORITY)
+):
+    """
+    Predict many images in one call.
+    
+    Takes any number of `files` parts and/or one tar or zip `archive` part.
+    Images are decoded in parallel and queued as one group, and results
+    are streamed back as NDJSON in completion order, one line per image:
+    
+        {"index": 0, "filename": "a.jpg", "predictions": [...], "cached": false}
+        {"index": 2, "filename": "c.jpg", "error": "..."}
+    
+    followed by one {"summary": {...}} line. Admission control, deadlines
+    and priority work as for /predict and apply to the group as a whole.
+    The request counts as a success if every image succeeded, partial if
+    some failed, and an error if all failed or the client disconnected
+    before every image's line was sent.
+    
+    The body is refused with 413 above MAX_BODY_MB, and the archive above
+    MAX_ARCHIVE_IMAGE_MB per image or MAX_ARCHIVE_TOTAL_MB decompressed.
+    """
+    
+    request_id = str(uuid.uuid4())[:8]
+    track_prediction_request()
+    overall_start = time.time()
+    
+    timeout_ms = x_request_timeout_ms or config.DEFAULT_REQUEST_TIMEOUT_MS
+    deadline = time.monotonic() + timeout_ms / 1000 if timeout_ms > 0 else None
+    
+    # Tracks the request up to the point where results start streaming
+    with MetricsTracker("POST", "/predict/batch"):
+        
+        if model is None:
+            track_prediction_error()
+            raise HTTPException(status_code=503, detail="Model not loaded")
+        
+        if x_priority not in PRIORITY_CLASSES:
+            track_prediction_error()
+            raise HTTPException(
+                status_code=400,
+                detail=f"X-Priority must be one of {', '.join(PRIORITY_CLASSES)}"
+            )
+        
+        # Gather (filename, bytes) from the file parts and the archive
+        images = []
+        try:
+            form = await read_form(request, config.MAX_BODY_BYTES, max_files=config.MAX_BATCH_REQUEST_IMAGES + 1)
+            try:
+                archive = form.get("archive")
+                uploads = form.getlist("files")
+                if not all(isinstance(part, UploadFile) for part in uploads + ([archive] if archive is not None else [])):
+                    raise UploadError("`files` and `archive` must be file parts")
+                for upload in uploads:
+                    images.append((upload.filename, await upload.read()))
+                if archive is not None:
+                    remaining = config.MAX_BATCH_REQUEST_IMAGES - len(images)
+                    images.extend(await asyncio.to_thread(
+                        lambda: list(iter_archive_images(
+                            archive.file,
+                            remaining,
+                            int(config.MAX_ARCHIVE_IMAGE_MB * 1024 * 1024),
+                            int(config.MAX_ARCHIVE_TOTAL_MB * 1024 * 1024)
+                        ))
+                    ))
+            finally:
+                await form.close()
+        except (BodyTooLargeError, ArchiveTooLargeError) as e:
+            track_prediction_error()
+            raise HTTPException(status_code=413, detail=str(e)) from e
+        except (ArchiveError, UploadError) as e:
+            track_prediction_error()
+            raise HTTPException(status_code=400, detail=str(e)) from e
+        
+        if not images:
+            track_prediction_error()
+            raise HTTPException(status_code=400, detail="No images: send `files` parts or an `archive`")
+        if len(images) > config.MAX_BATCH_REQUEST_IMAGES:
+            track_prediction_error()
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {config.MAX_BATCH_REQUEST_IMAGES} images per request"
+            )
+        
+        logger.info(
+            "Batch request received",
+            extra={
+                'request_id': request_id,
+                'images': len(images),
+                'total_bytes': sum(len(data) for _, data in images)
+            }
+        )
+        
+        # Lines that are ready right away: cache hits and undecodable images
+        ready = []
+        misses = []
+        for index, (filename, data) in enumerate(images):
+            cache_key = prediction_cache.key(data) if prediction_cache is not None else None
+            predictions = prediction_cache.get(cache_key) if cache_key is not None else None
+            if predictions is not None:
+                ready.append({'index': index, 'filename': filename, 'predictions': predictions, 'cached': True})
+            else:
+                misses.append((index, filename, data, cache_key))
+        
+        queued = []
+        futures = []
+        if misses:
+            try:
+                batch_manager.check_admission(len(misses))
+                
+                decoded = await asyncio.gather(
+                    *(decode_upload(data) for _, _, data, _ in misses),
+                    return_exceptions=True
+                )
+                for (index, filename, _, cache_key), tensor in zip(misses, decoded):
+                    if isinstance(tensor, Exception):
+                        ready.append({'index': index, 'filename': filename, 'error': "Cannot decode image"})
+                    else:
+                        queued.append((index, filename, cache_key, tensor))
+                
+                if queued:
+                    futures = await batch_manager.add_many(
+                        [tensor for *_, tensor in queued],
+                        [f"{request_id}-{index}" for index, *_ in queued],
+                        deadline=deadline,
+                        priority=x_priority
+                    )
+            
+            except QueueFullError as e:
+                track_prediction_error()
+                raise HTTPException(
+                    status_code=429,
+                    detail=str(e),
+                    headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+                ) from e
+            except DeadlineExceededError as e:
+                track_prediction_error()
+                raise HTTPException(status_code=504, detail=str(e)) from e
+    
+    async def wait_for(index, filename, cache_key, future):
+        try:
+            predictions, inference_time = await future
+        except Exception as e:
+            return {'index': index, 'filename': filename, 'error': str(e)}
+        track_inference("resnet50", inference_time)
+        if prediction_cache is not None:
+            prediction_cache.put(cache_key, predictions)
+        return {
+            'index': index,
+            'filename': filename,
+            'predictions': predictions,
+            'cached': False,
+            'inference_ms': round(inference_time * 1000, 2)
+        }
+    
+    async def stream():
+        waiters = [
+            asyncio.ensure_future(wait_for(index, filename, cache_key, future))
+            for (index, filename, cache_key, _), future in zip(queued, futures)
+        ]
+        failed = sum('error' in line for line in ready)
+        finished = False
+        try:
+            for line in ready:
+                yield json.dumps(line) + "\n"
+            for waiter in asyncio.as_completed(waiters):
+                line = await waiter
+                failed += 'error' in line
+                yield json.dumps(line) + "\n"
+            finished = True
+        finally:
+            # Client went away: queued images are dropped before inference
+            for future in futures:
+                future.cancel()
+            for waiter in waiters:
+                waiter.cancel()
+            
+            total_latency_ms = (time.time() - overall_start) * 1000
+            if not finished:
+                track_prediction_error()
+                logger.warning(
+                    "Batch request aborted before all results were sent",
+                    extra={'request_id': request_id, 'images': len(images), 'failed': failed}
+                )
+            elif failed == 0:
+                track_prediction_success(total_latency_ms / 1000)
+            elif failed < len(images):
+                track_prediction_partial()
+            else:
+                track_prediction_error()
+        
+        logger.info(
+            "Batch request completed",
+            extra={
+                'request_id': request_id,
+                'images': len(images),
+                'failed': failed,
+                'total_latency_ms': round(total_latency_ms, 2)
+            }
+        )
+        yield json.dumps({
+            'summary': {
+                'request_id': request_id,
+                'images': len(images),
+                'failed': failed,
+                'latency_ms': round(total_latency_ms, 2),
+                'model': 'ResNet-50'
+            }
+        }) + "\n"
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
 @app.get("/metrics")
 async def metrics():
-    """Basic metrics endpoint."""
-    avg_latency = total_latency / success_count if success_count > 0 else 0
+    """
+    Service summary.
+    
+    Request and prediction cache figures are totals over all worker
+    processes (read from the shared Prometheus metrics); startup, thread
+    and model details are those of the worker that answered.
+    """
+    samples = collect_samples()
+    received = sum_samples(samples, 'prediction_requests_total')
+    successful = sum_samples(samples, 'prediction_results_total', result='success')
+    failed = sum_samples(samples, 'prediction_results_total', result='error')
+    total_latency = sum_samples(samples, 'prediction_latency_seconds_total') * 1000
+    avg_latency = total_latency / successful if successful > 0 else 0
     
     return {
         "service": "resnet50-serving",
         "model_loaded": model is not None,
         "batch_manager_active": batch_manager is not None,
+        "workers": {
+            "configured": config.WORKERS,
+            "ready": int(sum_samples(samples, 'server_ready')),
+            "aggregated": multiprocess_enabled(),
+            "answered_by_pid": os.getpid()
+        },
         "requests": {
-            "total": request_count,
-            "successful": success_count,
-            "failed": error_count,
-            "success_rate": round(success_count / request_count * 100, 2) if request_count > 0 else 0
+            "total": int(received),
+            "successful": int(successful),
+            "partial": int(sum_samples(samples, 'prediction_results_total', result='partial')),
+            "failed": int(failed),
+            "success_rate": round(successful / received * 100, 2) if received > 0 else 0
         },
         "performance": {
             "avg_latency_ms": round(avg_latency, 2),
             "total_latency_ms": round(total_latency, 2)
         },
+        "startup": startup_phases,
+        "threads": thread_plan,
+        "model": {
+            "backend": config.INFERENCE_BACKEND,
+            "engine": config.MODEL_ENGINE,
+            "channels_last": config.CHANNELS_LAST,
+            "precision": precision_report
+        },
+        "prediction_cache": {
+            "entries": int(sum_samples(samples, 'prediction_cache_entries')),
+            "bytes": int(sum_samples(samples, 'prediction_cache_bytes')),
+            "hits": int(sum_samples(samples, 'prediction_cache_lookups_total', result='hit')),
+            "misses": int(sum_samples(samples, 'prediction_cache_lookups_total', result='miss')),
+            "evictions": int(sum_samples(samples, 'prediction_cache_evictions_total'))
+        } if prediction_cache is not None else None,
         "timestamp": time.time()
     }
 
@@ -287,17 +1014,28 @@ async def prometheus_metrics():
     """
     Prometheus metrics endpoint.
     
-    Returns metrics in Prometheus format for scraping.
+    Returns metrics in Prometheus format for scraping, aggregated over all
+    worker processes when they share PROMETHEUS_MULTIPROC_DIR.
     """
     metrics_data, content_type = get_metrics()
     return Response(content=metrics_data, media_type=content_type)
 
 
 if __name__ == "__main__":
+    import tempfile
     import uvicorn
+    if config.WORKERS > 1:
+        # Workers inherit the variable and share their metrics through it
+        prepare_multiprocess_dir(
+            config.METRICS_DIR or os.path.join(tempfile.gettempdir(), f"resnet50-serving-metrics-{os.getpid()}")
+        )
     uvicorn.run(
-        app, 
+        "api:app" if config.WORKERS > 1 else app, 
         host="0.0.0.0", 
         port=8000,
-        log_level="info"
+        workers=config.WORKERS,
+        log_level="info",
+        # With LOG_ASYNC, uvicorn's loggers (one access line per request)
+        # propagate to the root logger's queue instead of writing to stdout
+        log_config=None if config.LOG_ASYNC else uvicorn.config.LOGGING_CONFIG
     )
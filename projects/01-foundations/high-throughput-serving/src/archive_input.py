@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Read images out of an uploaded tar or zip archive.
+
+Tar archives (optionally gzip/bz2/xz compressed) are read as a stream,
+member by member, so the archive is never unpacked as a whole. Zip needs
+its central directory at the end of the file and is read from the
+(seekable) spooled upload.
+
+A small archive can decompress to far more than its own size (a "zip
+bomb"), so each member's declared size is checked before it is read,
+and members are read in chunks up to one byte past the limit, which
+catches headers that understate the size. The total decompressed size
+of all members is capped as well.
+"""
+
+import tarfile
+import zipfile
+from typing import BinaryIO, Iterator, Tuple
+
+ZIP_MAGIC = b"PK\x03\x04"
+READ_CHUNK_BYTES = 64 * 1024
+
+
+class ArchiveError(ValueError):
+    """Upload is not a readable tar/zip archive or has too many images."""
+
+
+class ArchiveTooLargeError(ArchiveError):
+    """An archive member, or all of them together, decompress to more than allowed."""
+
+
+def _read_member(stream: BinaryIO, name: str, declared_size: int, max_image_bytes: int, budget: int) -> bytearray:
+    """Read one member, refusing more than max_image_bytes or the remaining total budget."""
+    limit = min(max_image_bytes, budget)
+    if declared_size > limit:
+        raise ArchiveTooLargeError(_too_large(name, declared_size, max_image_bytes))
+    data = bytearray()
+    while True:
+        chunk = stream.read(min(READ_CHUNK_BYTES, limit + 1 - len(data)))
+        if not chunk:
+            return data
+        data += chunk
+        if len(data) > limit:
+            raise ArchiveTooLargeError(_too_large(name, len(data), max_image_bytes))
+
+
+def _too_large(name: str, size: int, max_image_bytes: int) -> str:
+    """Error message for a member over the per-image limit, else over the total."""
+    if size > max_image_bytes:
+        return f"{name}: more than the {max_image_bytes} byte limit per image"
+    return "Archive decompresses to more than the total size limit"
+
+
+def iter_archive_images(
+    fileobj: BinaryIO,
+    max_images: int,
+    max_image_bytes: int,
+    max_total_bytes: int
+) -> Iterator[Tuple[str, bytearray]]:
+    """
+    Yield (member name, data) for every regular file in the archive.
+    
+    Args:
+        fileobj: Seekable file object positioned at the start of the archive
+        max_images: Maximum number of files accepted
+        max_image_bytes: Largest decompressed size of one file
+        max_total_bytes: Largest decompressed size of all files together
+    
+    Raises:
+        ArchiveError: If the archive cannot be read or holds more than
+            max_images files
+        ArchiveTooLargeError: If a file or all files decompress to more
+            than allowed
+    """
+    magic = fileobj.read(len(ZIP_MAGIC))
+    fileobj.seek(0)
+    
+    count = 0
+    budget = max_total_bytes
+    try:
+        if magic == ZIP_MAGIC:
+            with zipfile.ZipFile(fileobj) as archive:
+                for info in archive.infolist():
+                    if info.is_dir():
+                        continue
+                    count += 1
+                    if count > max_images:
+                        raise ArchiveError(f"Too many images (limit {max_images})")
+                    with archive.open(info) as member:
+                        data = _read_member(member, info.filename, info.file_size, max_image_bytes, budget)
+                    budget -= len(data)
+                    yield info.filename, data
+        else:
+            with tarfile.open(fileobj=fileobj, mode="r|*") as archive:
+                for member in archive:
+                    if not member.isfile():
+                        continue
+                    count += 1
+                    if count > max_images:
+                        raise ArchiveError(f"Too many images (limit {max_images})")
+                    data = _read_member(archive.extractfile(member), member.name, member.size, max_image_bytes, budget)
+                    budget -= len(data)
+                    yield member.name, data
+    except (tarfile.TarError, zipfile.BadZipFile) as e:
+        raise ArchiveError(f"Unreadable archive: {e}") from e
@@ -2,70 +2,353 @@
 """Batch manager for efficient request processing."""
 
 import asyncio
+import math
 import torch
-from typing import List, Tuple
+from collections import Counter, deque
+from typing import Any, Callable, List, Optional, Sequence, Tuple
 import time
 import logging
 
+from inference_executor import run_batch, set_batch_results, set_batch_exception
+from batch_buffers import BatchBuffer, BatchBufferPool, contiguous_view
+from request_queue import (
+    PRIORITY_CLASSES, DEFAULT_PRIORITY, DeadlineExceededError, QueueFullError, RequestQueue
+)
+from metrics import (
+    track_batch_buffer_allocation, track_batch_dispatch, track_model_busy, track_request_shed, track_stage,
+    update_queue_estimated_wait, update_queue_length
+)
+
 logger = logging.getLogger(__name__)
 
+# A batch dispatched for a deadline goes this much earlier than the latest
+# possible moment, so the event loop waking it up a little late does not
+# make shed_expired drop the very request it was dispatched for
+DEADLINE_SLACK = 0.005
+
 
 class BatchManager:
     """Manages batching of inference requests for improved throughput."""
     
-    def __init__(self, max_batch_size: int = 8, max_wait_time: float = 0.05):
+    def __init__(
+        self,
+        max_batch_size: int = 8,
+        max_wait_time: float = 0.05,
+        executor=None,
+        postprocess: Optional[Callable] = None,
+        buffer_pool: Optional[BatchBufferPool] = None,
+        max_queue_size: Optional[int] = None,
+        max_queue_wait: Optional[float] = None,
+        batch_transform: Optional[Callable[[torch.Tensor], torch.Tensor]] = None,
+        sample_interval: float = 0.5
+    ):
         """
         Initialize batch manager.
         
         Args:
             max_batch_size: Maximum number of requests to batch together
             max_wait_time: Maximum time (seconds) to wait for batch to fill
+            executor: Runs forward passes off the event loop
+                (InferenceExecutor or ReplicaPool). If None, inference runs
+                inline and blocks the loop while it runs.
+            postprocess: Maps the [B, ...] model output to one result per
+                request, e.g. postprocessing.top_k_predictions. If None,
+                each request gets its row of the output tensor.
+            buffer_pool: If set, requests are copied into slots of
+                preallocated batch tensors on arrival and batches are
+                dispatched without stacking. If None, each batch is built
+                with torch.stack.
+            max_queue_size: Reject new requests once this many are queued
+                (None = unbounded)
+            max_queue_wait: Reject new requests once the estimated time to
+                drain the queue exceeds this many seconds (None = no limit)
+            batch_transform: Applied to each batch tensor right before
+                inference, e.g. preprocessing.normalize_batch when requests
+                are queued as uint8 pixels
+            sample_interval: Seconds between samples of the queue depth
+                and model duty cycle (0 = no sampling)
         """
         self.max_batch_size = max_batch_size
         self.max_wait_time = max_wait_time
+        self.executor = executor
+        self.postprocess = postprocess
+        self.buffer_pool = buffer_pool
+        self.max_queue_size = max_queue_size
+        self.max_queue_wait = max_queue_wait
+        self.batch_transform = batch_transform
+        self.sample_interval = sample_interval
+        
+        # Buffer currently receiving new requests (buffer pool mode)
+        self.filling_buffer = None
+        
+        # Batch tensors allocated by torch.stack (stack mode and gathers)
+        self.stack_allocations = 0
         
-        # Queue to hold pending requests
-        self.queue = []
+        # Pending requests, most urgent first (priority class, then
+        # earliest deadline, then arrival order)
+        self.queue = RequestQueue()
+        
+        # Smoothed batch service time, used to drop requests that would
+        # miss their deadline before they reach the model
+        self.service_time_estimate = 0.0
+        self.shed_counts = Counter()
+        self.rejected_count = 0
+        
+        # When the batching loop currently plans to dispatch, and when it
+        # last started collecting a batch (i.e. had a free inference slot)
+        self.dispatch_at = float('inf')
+        self.collect_started = 0.0
         
         # Lock for thread-safe operations
         self.lock = asyncio.Lock()
         
-        # Event to signal when batch is ready
-        self.batch_ready = asyncio.Event()
+        # Condition to wake the batching loop when the queue becomes
+        # non-empty or a full batch is available
+        self.batch_ready = asyncio.Condition(self.lock)
         
-        # Processing task
+        # Processing task and batches currently in inference
         self.processing_task = None
+        self.inflight_tasks = set()
+        
+        # Model duty cycle: batches dispatched and not yet completed, busy
+        # time accumulated so far, and since when the model is busy/idle
+        self.sampler_task = None
+        self.busy_batches = 0
+        self.busy_time = 0.0
+        self.busy_since = None
+        self.idle_since = time.monotonic()
+        self.busy_ratio = 0.0
+        
+        # Recent batch history and arrival count, read by the adaptive
+        # controller and monitoring
+        self.recent_batches = deque(maxlen=1024)
+        self.arrival_count = 0
+        
+        # Last time a batch was dispatched or completed, read by the
+        # readiness check to spot a wedged loop or executor
+        self.last_progress = time.monotonic()
         
         logger.info(f"BatchManager initialized: max_batch_size={max_batch_size}, max_wait_time={max_wait_time}s")
     
-    async def add_to_batch(self, tensor: torch.Tensor, request_id: str) -> Tuple[torch.Tensor, float]:
+    async def add_to_batch(
+        self,
+        tensor: torch.Tensor,
+        request_id: str,
+        deadline: Optional[float] = None,
+        priority: str = DEFAULT_PRIORITY,
+        timings: Optional[dict] = None
+    ) -> Tuple[Any, float]:
         """
         Add a request to the batch and wait for result.
         
         Args:
             tensor: Input tensor for this request
             request_id: Unique identifier for this request
+            deadline: time.monotonic() by which the client needs the
+                result, or None. Requests that can no longer make it are
+                dropped before inference.
+            priority: Priority class from PRIORITY_CLASSES
+            timings: Receives this request's queue_wait, inference and
+                postprocess times in seconds (None = not needed)
             
         Returns:
-            Tuple of (output_tensor, inference_time)
+            Tuple of (result, inference_time), where result is this
+            request's postprocessed output (or output row without postprocess)
+            
+        Raises:
+            DeadlineExceededError: If the request was dropped for its deadline
+            QueueFullError: If the queue is at its admission limit
         """
-        # Create a future to hold the result
-        future = asyncio.Future()
+        futures = await self.add_many(
+            [tensor], [request_id], deadline=deadline, priority=priority,
+            timings=None if timings is None else [timings]
+        )
         
-        # Add to queue
-        async with self.lock:
-            self.queue.append({
+        # Wait for result
+        result = await futures[0]
+        return result
+    
+    async def add_many(
+        self,
+        tensors: Sequence[torch.Tensor],
+        request_ids: Sequence[str],
+        deadline: Optional[float] = None,
+        priority: str = DEFAULT_PRIORITY,
+        timings: Optional[Sequence[dict]] = None
+    ) -> List[asyncio.Future]:
+        """
+        Queue a group of requests at once, e.g. the images of one multi-image call.
+        
+        The group is admitted as a whole and enqueued under one lock
+        acquisition, so it lands in as few batches as possible.
+        
+        Args:
+            tensors: Input tensor for each request
+            request_ids: Unique identifier for each request
+            deadline: time.monotonic() deadline shared by the group, or None
+            priority: Priority class from PRIORITY_CLASSES
+            timings: One stage timings dict per request (see add_to_batch), or None
+            
+        Returns:
+            One future per request, resolving to (result, inference_time)
+            
+        Raises:
+            DeadlineExceededError: If the group cannot finish before its deadline
+            QueueFullError: If the group does not fit under the admission limit
+        """
+        arrival_time = time.monotonic()
+        if deadline is not None and deadline < arrival_time + self.service_time_estimate:
+            for request_id in request_ids:
+                self._count_shed(request_id, 'deadline')
+            raise DeadlineExceededError(f"Request {request_ids[0]} cannot finish before its deadline")
+        
+        # Create futures to hold the results
+        items = [
+            {
                 'tensor': tensor,
                 'request_id': request_id,
-                'future': future,
-                'arrival_time': time.time()
-            })
+                'future': asyncio.Future(),
+                'arrival_time': arrival_time,
+                'deadline': deadline,
+                'priority': PRIORITY_CLASSES[priority],
+                'timings': request_timings
+            }
+            for tensor, request_id, request_timings in zip(tensors, request_ids, timings or [None] * len(tensors))
+        ]
+        
+        # Add to queue
+        async with self.batch_ready:
+            self.check_admission(len(items))
+            was_empty = not self.queue
+            for item in items:
+                self.arrival_count += 1
+                if self.buffer_pool is not None:
+                    self._write_to_buffer(item)
+                self.queue.append(item)
             queue_size = len(self.queue)
-            logger.debug(f"Request {request_id} added to queue. Queue size: {queue_size}")
+            
+            # The loop only cares about the first request (starts the wait
+            # budget), a full batch (dispatch early) and a deadline that
+            # needs an earlier dispatch than planned
+            if (was_empty or queue_size >= self.max_batch_size or
+                    (deadline is not None and
+                     deadline - self.service_time_estimate - DEADLINE_SLACK < self.dispatch_at)):
+                self.batch_ready.notify()
+            logger.debug(f"{len(items)} request(s) added to queue. Queue size: {queue_size}")
         
-        # Wait for result
-        result = await future
-        return result
+        return [item['future'] for item in items]
+    
+    def estimated_wait(self, count: int = 1) -> float:
+        """
+        Estimated time (seconds) for requests arriving now to be dispatched.
+        
+        Counts the batches queued ahead of it plus those in inference, at
+        the smoothed batch service time, spread over the executor's
+        concurrent batch slots.
+        """
+        slots = self.executor.max_inflight if self.executor else 1
+        batches = math.ceil((len(self.queue) + count) / self.max_batch_size) - 1 + len(self.inflight_tasks)
+        return batches * self.service_time_estimate / slots
+    
+    def check_admission(self, count: int = 1) -> None:
+        """
+        Reject new requests if the queue is at its admission limit.
+        
+        Cheap enough to call before decoding a request, so overload is
+        turned away before it costs any work; add_to_batch checks again.
+        A group always fits into an empty queue, so a group larger than
+        max_queue_size is not rejected forever.
+        
+        Args:
+            count: Number of requests to admit together
+            
+        Raises:
+            QueueFullError: With the estimated drain time as retry_after
+        """
+        queue_size = len(self.queue)
+        if (self.max_queue_size is not None and queue_size > 0 and
+                queue_size + count > self.max_queue_size):
+            reason = f"{queue_size} requests queued (limit {self.max_queue_size})"
+        elif self.max_queue_wait is not None and self.estimated_wait(count) > self.max_queue_wait:
+            reason = (f"estimated wait {self.estimated_wait(count)*1000:.0f}ms "
+                      f"(limit {self.max_queue_wait*1000:.0f}ms)")
+        else:
+            return
+        
+        self.rejected_count += 1
+        raise QueueFullError(f"Batch queue full: {reason}", retry_after=self.estimated_wait())
+    
+    def _write_to_buffer(self, item: dict) -> None:
+        """Copy a request into the next free slot of the filling buffer."""
+        buffer = self.filling_buffer
+        if buffer is None or buffer.count >= min(buffer.capacity, self.max_batch_size):
+            if buffer is not None:
+                self._seal(buffer)
+            buffer = self.filling_buffer = self.buffer_pool.acquire()
+        
+        slot = buffer.count
+        buffer.tensor[slot].copy_(item.pop('tensor'))
+        buffer.count += 1
+        buffer.refs += 1
+        item['buffer'] = buffer
+        item['slot'] = slot
+    
+    def _seal(self, buffer: BatchBuffer) -> None:
+        """Stop writing to a buffer; return it now if none of its requests are left."""
+        buffer.sealed = True
+        if buffer.refs == 0:
+            self.buffer_pool.release(buffer)
+    
+    def _seal_dispatched(self, batch_items: List[dict]) -> None:
+        """Stop writing to the filling buffer once part of it is dispatched."""
+        if self.filling_buffer is not None and any(
+            item['buffer'] is self.filling_buffer for item in batch_items
+        ):
+            self._seal(self.filling_buffer)
+            self.filling_buffer = None
+    
+    def release_buffers(self, batch_items: List[dict]) -> None:
+        """Return buffers to the pool once all of their requests are done."""
+        if self.buffer_pool is None:
+            return
+        for item in batch_items:
+            buffer = item['buffer']
+            buffer.refs -= 1
+            if buffer.refs == 0 and buffer.sealed:
+                self.buffer_pool.release(buffer)
+    
+    def build_batch(self, batch_items: List[dict]) -> torch.Tensor:
+        """
+        Build the batch input tensor.
+        
+        In buffer pool mode this is normally a view of the buffer the
+        requests were written into; otherwise the request tensors are
+        stacked. batch_transform, if set, is applied to the result. Safe
+        to call from an inference thread; it does not touch the event
+        loop.
+        
+        Args:
+            batch_items: List of request items to process
+            
+        Returns:
+            Batch input tensor
+        """
+        if self.buffer_pool is not None:
+            batch_tensor = contiguous_view(batch_items)
+            if batch_tensor is None:
+                batch_tensor = torch.stack([item['buffer'].tensor[item['slot']] for item in batch_items])
+                self.stack_allocations += 1
+                track_batch_buffer_allocation("stack")
+        else:
+            batch_tensor = torch.stack([item['tensor'] for item in batch_items])
+            self.stack_allocations += 1
+            track_batch_buffer_allocation("stack")
+        
+        if self.batch_transform is not None:
+            batch_tensor = self.batch_transform(batch_tensor)
+        
+        logger.debug(f"Batch tensor shape: {batch_tensor.shape}")
+        return batch_tensor
     
     async def process_batch(self, model, batch_items: List[dict]) -> None:
         """
@@ -78,62 +361,333 @@ class BatchManager:
         if not batch_items:
             return
         
+        batch = self._record_dispatch(batch_items, time.monotonic())
+        inference_time = None
+        try:
+            inference_time = await self._run_batch(model, batch_items)
+        finally:
+            self.release_buffers(batch_items)
+            self._record_batch(batch, inference_time)
+    
+    def _record_dispatch(self, batch_items: List[dict], dispatched_at: float) -> dict:
+        """Track a batch leaving the queue; returns its history entry (completed by _record_batch)."""
+        queue_waits = []
+        for item in batch_items:
+            queue_wait = dispatched_at - item['arrival_time']
+            queue_waits.append(queue_wait)
+            track_stage('queue_wait', queue_wait)
+            if item['timings'] is not None:
+                item['timings']['queue_wait'] = queue_wait
+        
+        # Why the batch left: it was full, its oldest request had already
+        # waited max_wait_time before an inference slot came free, it
+        # waited max_wait_time for the batch to fill, or a deadline needed
+        # it to go early
+        time_to_fill = max(queue_waits)
+        oldest_arrival = dispatched_at - time_to_fill
+        if len(batch_items) >= self.max_batch_size:
+            reason = 'full'
+        elif oldest_arrival + self.max_wait_time <= self.collect_started:
+            reason = 'model_busy'
+        elif time_to_fill >= self.max_wait_time:
+            reason = 'max_wait'
+        else:
+            reason = 'deadline'
+        track_batch_dispatch(len(batch_items), self.max_batch_size, time_to_fill, reason)
+        
+        idle_before = 0.0
+        if self.busy_batches == 0:
+            idle_before = dispatched_at - self.idle_since
+            self.busy_since = dispatched_at
+        self.busy_batches += 1
+        
+        return {
+            'size': len(batch_items),
+            'max_batch_size': self.max_batch_size,
+            'fill_ratio': len(batch_items) / self.max_batch_size,
+            'dispatch_reason': reason,
+            'time_to_fill': time_to_fill,
+            'idle_before': idle_before,
+            'queue_depth': len(self.queue),
+            'dispatched_at': dispatched_at,
+            'queue_waits': queue_waits,
+        }
+    
+    def _record_batch(self, batch: dict, inference_time: Optional[float] = None) -> None:
+        """
+        Keep per-batch timings for the adaptive controller and monitoring.
+        
+        service_time is dispatch to completion (batch build, transfer,
+        forward pass, postprocess); inference_time is the forward pass
+        alone, None if the batch failed.
+        """
+        completed_at = self.last_progress = time.monotonic()
+        service_time = completed_at - batch['dispatched_at']
+        self.service_time_estimate = 0.8 * self.service_time_estimate + 0.2 * service_time
+        
+        self.busy_batches -= 1
+        if self.busy_batches == 0:
+            self.busy_time += completed_at - self.busy_since
+            self.idle_since = completed_at
+        
+        batch.update(completed_at=completed_at, service_time=service_time, inference_time=inference_time)
+        self.recent_batches.append(batch)
+    
+    def busy_seconds(self, now: Optional[float] = None) -> float:
+        """Total time so far with at least one batch in inference."""
+        if self.busy_batches == 0:
+            return self.busy_time
+        return self.busy_time + (now or time.monotonic()) - self.busy_since
+    
+    async def run_sampler(self):
+        """Publish queue depth and model duty cycle every sample_interval."""
+        last_time = time.monotonic()
+        last_busy = self.busy_seconds(last_time)
+        while True:
+            await asyncio.sleep(self.sample_interval)
+            now = time.monotonic()
+            busy = self.busy_seconds(now)
+            self.busy_ratio = min(1.0, (busy - last_busy) / (now - last_time))
+            track_model_busy(busy - last_busy, self.busy_ratio)
+            update_queue_length(len(self.queue))
+            update_queue_estimated_wait(self.estimated_wait())
+            last_time, last_busy = now, busy
+    
+    def stats(self, limit: int = 20) -> dict:
+        """
+        Recent batch history and a summary of it, for /debug/batcher.
+        
+        Args:
+            limit: Number of most recent batches to list and summarize
+            
+        Returns:
+            JSON-serializable dict with the current batching parameters,
+            queue depth and duty cycle, a summary of the last batches and
+            the batches themselves (times in milliseconds)
+        """
+        batches = list(self.recent_batches)[-limit:] if limit > 0 else []
+        now = time.monotonic()
+        
+        summary = None
+        if batches:
+            span = batches[-1]['completed_at'] - batches[0]['dispatched_at']
+            images = sum(batch['size'] for batch in batches)
+            reasons = Counter(batch['dispatch_reason'] for batch in batches)
+            mean_fill = sum(batch['fill_ratio'] for batch in batches) / len(batches)
+            
+            # Duty cycle over these batches: union of their in-inference intervals
+            busy = 0.0
+            busy_until = batches[0]['dispatched_at']
+            for batch in sorted(batches, key=lambda batch: batch['dispatched_at']):
+                start = max(batch['dispatched_at'], busy_until)
+                if batch['completed_at'] > start:
+                    busy += batch['completed_at'] - start
+                    busy_until = batch['completed_at']
+            busy_ratio = busy / span if span > 0 else 1.0
+            
+            # Throughput-bound: the model is busy nearly all the time and the
+            # queue, not the batching wait, sets the latency. Latency-bound:
+            # the model waits for batches that leave on max_wait_time
+            # before filling up.
+            if busy_ratio >= 0.9:
+                regime = 'throughput-bound'
+            elif reasons['max_wait'] + reasons['deadline'] > len(batches) / 2:
+                regime = 'latency-bound'
+            else:
+                regime = 'balanced'
+            
+            summary = {
+                'batches': len(batches),
+                'images_per_second': round(images / span, 2) if span > 0 else None,
+                'mean_size': round(images / len(batches), 2),
+                'mean_fill_ratio': round(mean_fill, 3),
+                'dispatch_reasons': dict(reasons),
+                'mean_time_to_fill_ms': round(
+                    sum(batch['time_to_fill'] for batch in batches) / len(batches) * 1000, 2
+                ),
+                'mean_service_time_ms': round(
+                    sum(batch['service_time'] for batch in batches) / len(batches) * 1000, 2
+                ),
+                'model_busy_ratio': round(busy_ratio, 3),
+                'mean_idle_before_ms': round(
+                    sum(batch['idle_before'] for batch in batches) / len(batches) * 1000, 2
+                ),
+                'regime': regime,
+            }
+        
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_time_ms': round(self.max_wait_time * 1000, 2),
+            'queue_length': len(self.queue),
+            'batches_in_inference': self.busy_batches,
+            'model_busy_ratio_last_interval': round(self.busy_ratio, 3),
+            'summary': summary,
+            'recent_batches': [
+                {
+                    'age_ms': round((now - batch['completed_at']) * 1000, 1),
+                    'size': batch['size'],
+                    'max_batch_size': batch['max_batch_size'],
+                    'fill_ratio': round(batch['fill_ratio'], 3),
+                    'dispatch_reason': batch['dispatch_reason'],
+                    'time_to_fill_ms': round(batch['time_to_fill'] * 1000, 2),
+                    'idle_before_ms': round(batch['idle_before'] * 1000, 2),
+                    'queue_depth_at_dispatch': batch['queue_depth'],
+                    'service_time_ms': round(batch['service_time'] * 1000, 2),
+                    'inference_ms': (
+                        round(batch['inference_time'] * 1000, 2) if batch['inference_time'] is not None else None
+                    ),
+                }
+                for batch in reversed(batches)
+            ],
+        }
+    
+    async def _run_batch(self, model, batch_items: List[dict]) -> Optional[float]:
+        """
+        Run one batch inline or on the executor and resolve its futures.
+        
+        Returns:
+            Forward-pass time in seconds, or None if the batch failed
+        """
         batch_size = len(batch_items)
         logger.info(f"Processing batch of size {batch_size}")
         
-        start_time = time.time()
+        if self.executor is not None:
+            try:
+                inference_time = await self.executor.submit(
+                    model, lambda: self.build_batch(batch_items), batch_items, self.postprocess
+                )
+                logger.info(f"Batch inference completed in {inference_time*1000:.2f}ms")
+                return inference_time
+            except Exception:
+                # Already logged and propagated to the request futures
+                return None
         
         try:
-            # Stack tensors into a batch
-            batch_tensor = torch.stack([item['tensor'] for item in batch_items])
-            logger.debug(f"Batch tensor shape: {batch_tensor.shape}")
-            
-            # Run inference
-            with torch.no_grad():
-                batch_output = model(batch_tensor)
-            
-            inference_time = time.time() - start_time
+            results, inference_time, postprocess_time = run_batch(
+                model, self.build_batch(batch_items), self.postprocess
+            )
             logger.info(f"Batch inference completed in {inference_time*1000:.2f}ms")
             
             # Split results and set futures
-            for i, item in enumerate(batch_items):
-                output = batch_output[i]
-                item['future'].set_result((output, inference_time))
-                logger.debug(f"Result set for request {item['request_id']}")
+            set_batch_results(batch_items, results, inference_time, postprocess_time)
+            return inference_time
         
         except Exception as e:
             logger.error(f"Batch processing error: {e}", exc_info=True)
             # Set exception for all futures
-            for item in batch_items:
-                if not item['future'].done():
-                    item['future'].set_exception(e)
+            set_batch_exception(batch_items, e)
+            return None
+    
+    def _count_shed(self, request_id: str, reason: str) -> None:
+        self.shed_counts[reason] += 1
+        track_request_shed(reason)
+        logger.debug(f"Request {request_id} dropped before inference: {reason}")
+    
+    def shed_expired(self) -> List[dict]:
+        """
+        Drop queued requests that are no longer worth running.
+        
+        A request is dropped if its future is already done (the client
+        went away) or if it would miss its deadline even if it went into
+        the next batch. Must be called with the lock held.
+        
+        Returns:
+            Dropped request items
+        """
+        finish = time.monotonic() + self.service_time_estimate
+        dropped = self.queue.remove_if(
+            lambda item: item['future'].done() or
+            (item['deadline'] is not None and item['deadline'] < finish)
+        )
+        for item in dropped:
+            if item['future'].done():
+                self._count_shed(item['request_id'], 'cancelled')
+            else:
+                self._count_shed(item['request_id'], 'deadline')
+                item['future'].set_exception(DeadlineExceededError(
+                    f"Request {item['request_id']} cannot finish before its deadline"
+                ))
+        self.release_buffers(dropped)
+        return dropped
+    
+    def _dispatch_time(self) -> float:
+        """Latest time the next batch can wait for more requests."""
+        return min(
+            self.queue.oldest_arrival() + self.max_wait_time,
+            self.queue.earliest_deadline() - self.service_time_estimate - DEADLINE_SLACK
+        )
+    
+    async def collect_batch(self) -> List[dict]:
+        """
+        Wait for the next batch to be ready and remove it from the queue.
+        
+        A batch is dispatched as soon as it is full, when the oldest
+        queued request has waited max_wait_time, or when the earliest
+        deadline leaves just enough time for inference, whichever comes
+        first. Requests that can no longer meet their deadline are dropped
+        instead of dispatched.
+        
+        Returns:
+            List of request items to process
+        """
+        self.collect_started = time.monotonic()
+        async with self.batch_ready:
+            while True:
+                await self.batch_ready.wait_for(lambda: self.queue)
+                
+                while self.queue and len(self.queue) < self.max_batch_size:
+                    self.dispatch_at = self._dispatch_time()
+                    remaining = self.dispatch_at - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        await asyncio.wait_for(self.batch_ready.wait(), timeout=remaining)
+                    except asyncio.TimeoutError:
+                        break
+                self.dispatch_at = float('inf')
+                
+                self.shed_expired()
+                if self.queue:
+                    break
+            
+            # Take up to max_batch_size items, most urgent first
+            batch_size = min(len(self.queue), self.max_batch_size)
+            batch_items = [self.queue.popleft() for _ in range(batch_size)]
+            if self.buffer_pool is not None:
+                self._seal_dispatched(batch_items)
+            self.last_progress = time.monotonic()
+            return batch_items
     
     async def run_batching_loop(self, model):
         """
         Main batching loop that collects and processes batches.
         
+        With an executor, up to executor.max_inflight batches run at once;
+        the next batch keeps filling while they are in inference.
+        
         Args:
             model: PyTorch model to use for inference
         """
         logger.info("Batching loop started")
         
+        slots = asyncio.Semaphore(self.executor.max_inflight if self.executor else 1)
+        
         while True:
             try:
-                # Wait for queue to have items or timeout
-                await asyncio.sleep(self.max_wait_time)
+                await slots.acquire()
                 
                 # Get batch to process
-                async with self.lock:
-                    if not self.queue:
-                        continue
-                    
-                    # Take up to max_batch_size items
-                    batch_items = self.queue[:self.max_batch_size]
-                    self.queue = self.queue[self.max_batch_size:]
+                try:
+                    batch_items = await self.collect_batch()
+                except BaseException:
+                    slots.release()
+                    raise
                 
                 # Process the batch
-                if batch_items:
-                    await self.process_batch(model, batch_items)
+                task = asyncio.create_task(self.process_batch(model, batch_items))
+                self.inflight_tasks.add(task)
+                task.add_done_callback(self.inflight_tasks.discard)
+                task.add_done_callback(lambda _: slots.release())
             
             except asyncio.CancelledError:
                 logger.info("Batching loop cancelled")
@@ -146,10 +700,17 @@ class BatchManager:
         if self.processing_task is None:
             self.processing_task = asyncio.create_task(self.run_batching_loop(model))
             logger.info("Batching loop task created")
+        if self.sampler_task is None and self.sample_interval > 0:
+            self.sampler_task = asyncio.create_task(self.run_sampler())
     
     def stop(self):
         """Stop the batching loop."""
         if self.processing_task:
             self.processing_task.cancel()
             self.processing_task = None
-            logger.info("Batching loop stopped")
\ No newline at end of file
+            logger.info("Batching loop stopped")
+        if self.sampler_task:
+            self.sampler_task.cancel()
+            self.sampler_task = None
+        if self.executor is not None:
+            self.executor.shutdown()
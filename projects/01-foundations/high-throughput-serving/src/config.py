@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Runtime configuration for the serving API.
+
+Every setting can be overridden with an environment variable of the same
+name, e.g. `MAX_BATCH_SIZE=16 python src/api.py`.
+"""
+
+import json
+import os
+
+
+def _get_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, default))
+
+
+def _get_float(name: str, default: float) -> float:
+    return float(os.environ.get(name, default))
+
+
+# Thread-pool split measured by benchmarks/bench_thread_sweep.py. Its
+# values replace the defaults below; environment variables still win.
+THREAD_CONFIG_FILE = os.environ.get(
+    "THREAD_CONFIG_FILE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "threads.json")
+)
+_thread_defaults = {}
+if os.path.exists(THREAD_CONFIG_FILE):
+    with open(THREAD_CONFIG_FILE) as f:
+        _thread_defaults = json.load(f)
+
+
+# Batching
+MAX_BATCH_SIZE = _get_int("MAX_BATCH_SIZE", 8)
+MAX_WAIT_TIME_MS = _get_float("MAX_WAIT_TIME_MS", 50.0)
+# Queue depth and model duty cycle are sampled this often (0 = off)
+BATCH_SAMPLE_INTERVAL_MS = _get_float("BATCH_SAMPLE_INTERVAL_MS", 500.0)
+
+# Admission control: /predict answers 429 once this many requests are
+# queued, or once the estimated queue drain time exceeds MAX_QUEUE_WAIT_MS
+# (0 = no limit)
+MAX_QUEUE_SIZE = _get_int("MAX_QUEUE_SIZE", 64)
+MAX_QUEUE_WAIT_MS = _get_float("MAX_QUEUE_WAIT_MS", 0.0)
+
+# Requests without an X-Request-Timeout-Ms header get this timeout
+# (0 = no deadline). Requests that cannot finish in time are dropped
+# before inference.
+DEFAULT_REQUEST_TIMEOUT_MS = _get_float("DEFAULT_REQUEST_TIMEOUT_MS", 0.0)
+
+# Adaptive batching: retune batch size (up to MAX_BATCH_SIZE) and wait
+# time at runtime to keep p99 latency under LATENCY_SLO_MS
+ADAPTIVE_BATCHING = _get_int("ADAPTIVE_BATCHING", 0) == 1
+LATENCY_SLO_MS = _get_float("LATENCY_SLO_MS", 250.0)
+ADAPTIVE_MAX_WAIT_TIME_MS = _get_float("ADAPTIVE_MAX_WAIT_TIME_MS", 100.0)
+
+# Most images accepted by one /predict/batch call
+MAX_BATCH_REQUEST_IMAGES = _get_int("MAX_BATCH_REQUEST_IMAGES", 64)
+
+# Largest /predict, /predict/tensor and /predict/batch body, enforced
+# while streaming (413 above)
+MAX_BODY_MB = _get_float("MAX_BODY_MB", 20.0)
+MAX_BODY_BYTES = int(MAX_BODY_MB * 1024 * 1024)
+
+# Decompressed size limits for a /predict/batch archive, per image and in
+# total (413 above); checked while reading, so archive bombs are refused
+MAX_ARCHIVE_IMAGE_MB = _get_float("MAX_ARCHIVE_IMAGE_MB", 20.0)
+MAX_ARCHIVE_TOTAL_MB = _get_float("MAX_ARCHIVE_TOTAL_MB", 256.0)
+
+# Prediction cache keyed by a hash of the uploaded bytes (0 entries =
+# disabled). Bump MODEL_VERSION whenever the weights change.
+MODEL_VERSION = os.environ.get("MODEL_VERSION", "resnet50-imagenet1k-v1")
+PREDICTION_CACHE_ENTRIES = _get_int("PREDICTION_CACHE_ENTRIES", 10000)
+PREDICTION_CACHE_MB = _get_float("PREDICTION_CACHE_MB", 64.0)
+
+# Preallocated batch input buffers (0 = torch.stack every batch)
+BATCH_BUFFERS = _get_int("BATCH_BUFFERS", 2)
+PIN_MEMORY = _get_int("PIN_MEMORY", 0) == 1
+
+# Model weights: a local state dict (written by download_model.py),
+# memory-mapped at startup without network access. If the file is missing,
+# the pretrained weights come from the torch hub cache or are downloaded,
+# unless MODEL_DOWNLOAD=0.
+MODEL_PATH = os.environ.get(
+    "MODEL_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models", "resnet50.pth")
+)
+MODEL_DOWNLOAD = _get_int("MODEL_DOWNLOAD", 1) == 1
+
+# Inference
+INFERENCE_THREADS = _get_int("INFERENCE_THREADS", 1)
+# Torch thread pools per worker (see thread_config.py). WORKERS is the
+# number of uvicorn worker processes sharing the CPUs (uvicorn's
+# WEB_CONCURRENCY if unset). 0 threads = split the available CPUs (cgroup
+# quota aware) over WORKERS x INFERENCE_THREADS. PIN_WORKERS=1 pins each
+# worker to its own cores.
+WORKERS = _get_int("WORKERS", _thread_defaults.get("WORKERS", _get_int("WEB_CONCURRENCY", 1)))
+TORCH_THREADS = _get_int("TORCH_THREADS", _thread_defaults.get("TORCH_THREADS", 0))
+TORCH_INTEROP_THREADS = _get_int("TORCH_INTEROP_THREADS", _thread_defaults.get("TORCH_INTEROP_THREADS", 0))
+PIN_WORKERS = _get_int("PIN_WORKERS", _thread_defaults.get("PIN_WORKERS", 0)) == 1
+# Execution engine: eager, torchscript or compile (see model_engine.py)
+MODEL_ENGINE = os.environ.get("MODEL_ENGINE", "eager")
+CHANNELS_LAST = _get_int("CHANNELS_LAST", 0) == 1
+# Forward passes per batch size (1..MAX_BATCH_SIZE) before serving (0 = no warmup)
+WARMUP_ITERATIONS = _get_int("WARMUP_ITERATIONS", 2)
+
+# Inference precision: fp32, bf16 or int8 (see precision.py). int8 is
+# calibrated on CALIBRATION_DIR; reduced precision is checked against fp32
+# on AGREEMENT_DIR and the server refuses to start below the minimum
+# top-1/top-5 agreement. There is no default image set: int8 needs both
+# directories, and they must differ (agreement on the calibration images
+# is in-sample and overstates it); bf16 fits nothing to its images, so it
+# takes AGREEMENT_DIR or falls back to CALIBRATION_DIR. Each set must
+# hold at least MIN_CHECK_IMAGES images, since a few images calibrate
+# poorly and make the agreement check meaningless.
+PRECISION = os.environ.get("PRECISION", "fp32")
+CALIBRATION_DIR = os.environ.get("CALIBRATION_DIR", "")
+CALIBRATION_IMAGES = _get_int("CALIBRATION_IMAGES", 256)
+AGREEMENT_DIR = os.environ.get("AGREEMENT_DIR", "")
+MIN_CHECK_IMAGES = _get_int("MIN_CHECK_IMAGES", 32)
+MIN_TOP1_AGREEMENT = _get_float("MIN_TOP1_AGREEMENT", 0.95)
+MIN_TOP5_AGREEMENT = _get_float("MIN_TOP5_AGREEMENT", 0.90)
+
+# Inference backend: torch or onnxruntime (see inference_backend.py).
+# onnxruntime exports the fp32 eager model once to ONNX_MODEL_PATH and
+# reuses the file on later starts; it needs the onnx and onnxruntime packages.
+INFERENCE_BACKEND = os.environ.get("INFERENCE_BACKEND", "torch")
+ONNX_MODEL_PATH = os.environ.get(
+    "ONNX_MODEL_PATH",
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models", f"{MODEL_VERSION}.onnx"
+    )
+)
+ONNX_THREADS = _get_int("ONNX_THREADS", 0)  # 0 = torch.get_num_threads()
+
+# Readiness (/ready): not ready while queued requests see no batch
+# dispatched or completed for READY_STALL_SECONDS, or while the p99 batch
+# inference time (forward pass only) over the last READY_WINDOW_SECONDS
+# exceeds READY_MAX_P99_MS (0 = no latency check)
+READY_STALL_SECONDS = _get_float("READY_STALL_SECONDS", 10.0)
+READY_MAX_P99_MS = _get_float("READY_MAX_P99_MS", 0.0)
+READY_WINDOW_SECONDS = _get_float("READY_WINDOW_SECONDS", 30.0)
+
+# Metrics shared by all worker processes (prometheus_client multiprocess
+# mode, see metrics.py). `python src/api.py` with WORKERS > 1 enables it,
+# in this directory or a fresh temporary one, and clears it at start. When
+# starting workers another way (uvicorn --workers, gunicorn), export
+# PROMETHEUS_MULTIPROC_DIR as an empty directory before starting them.
+METRICS_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR", "")
+# Return per-request stage timings in a Server-Timing header (/predict,
+# /predict/tensor); the stage histograms are recorded either way
+SERVER_TIMING = _get_int("SERVER_TIMING", 0) == 1
+
+# Logging: write records from a background thread through a bounded
+# buffer (records are dropped, and counted, when it is full), and let at
+# most LOG_SAMPLE_RATE INFO/DEBUG records per second through per logger
+# (0 = all; warnings and errors are never sampled)
+LOG_ASYNC = _get_int("LOG_ASYNC", 0) == 1
+LOG_QUEUE_SIZE = _get_int("LOG_QUEUE_SIZE", 10000)
+LOG_SAMPLE_RATE = _get_float("LOG_SAMPLE_RATE", 0.0)
+
+# Replica mode (0 = run inference in the API process)
+REPLICAS = _get_int("REPLICAS", 0)
+REPLICA_THREADS = _get_int("REPLICA_THREADS", 0)  # 0 = cores / replicas
+
+# Preprocessing (0 = decode and preprocess on a thread of this process)
+PREPROCESS_WORKERS = _get_int("PREPROCESS_WORKERS", 0)
+# Decode JPEGs at reduced resolution when the short side stays >= 256.
+# Opt-in until top-1/top-5 parity is measured (bench_jpeg_draft.py)
+JPEG_DRAFT_DECODE = _get_int("JPEG_DRAFT_DECODE", 0) == 1
+PREPROCESS_SLOTS_PER_WORKER = _get_int("PREPROCESS_SLOTS_PER_WORKER", 2)
+# Queue uint8 pixels and normalize once per batch (1/4 of the queue memory)
+UINT8_INPUTS = _get_int("UINT8_INPUTS", 0) == 1
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 """Download and test ResNet-50 model."""
 
+import os
+
 import torch
 import torchvision.models as models
 from torchvision import transforms
@@ -8,15 +10,18 @@ from PIL import Image
 import requests
 from io import BytesIO
 
+import config
+
 def download_model():
     """Download pre-trained ResNet-50."""
     print("Downloading ResNet-50...")
     model = models.resnet50(pretrained=True)
     model.eval()
     
-    # Save model
-    torch.save(model.state_dict(), "models/resnet50.pth")
-    print("Model saved to models/resnet50.pth")
+    # Save the state dict where the API loads it from (config.MODEL_PATH)
+    os.makedirs(os.path.dirname(config.MODEL_PATH), exist_ok=True)
+    torch.save(model.state_dict(), config.MODEL_PATH)
+    print(f"Model saved to {config.MODEL_PATH}")
     
     return model
 
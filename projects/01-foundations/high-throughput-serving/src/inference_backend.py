@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Pluggable inference backends.
+
+An InferenceBackend owns the model in its runtime form and exposes
+load() (build/compile/open a session), warmup() (run every batch size
+once before serving) and infer(batch) (logits for a [B, 3, 224, 224]
+float32 batch). run_forward calls infer() on a backend, so the batcher,
+inference thread and replica processes do not care which runtime runs.
+
+- TorchBackend: the PyTorch model, with the execution engine and
+  precision options of model_engine.py and precision.py
+- OnnxRuntimeBackend: exports the model to ONNX once (cached on disk) and
+  runs it with ONNX Runtime's CPU execution provider. Needs the optional
+  onnx and onnxruntime packages.
+
+load_backend is module-level so ReplicaPool can send it to replica
+processes, which then load their own backend.
+"""
+
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+import torch
+
+from model_engine import build_engine, warmup
+from precision import apply_precision
+from preprocessing import INPUT_SHAPE
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('torch', 'onnxruntime')
+
+
+class InferenceBackend(ABC):
+    """Interface shared by all inference backends."""
+    
+    name = None
+    
+    @abstractmethod
+    def load(self) -> None:
+        """Prepare the model for inference (export, compile, open sessions)."""
+    
+    @abstractmethod
+    def infer(self, batch: torch.Tensor) -> torch.Tensor:
+        """Return [B, 1000] logits for a [B, 3, 224, 224] float32 batch."""
+    
+    def warmup(self, max_batch_size: int, iterations: int = 2) -> Dict[int, float]:
+        """Run every batch size from 1 to max_batch_size; see model_engine.warmup."""
+        return warmup(self.infer, max_batch_size, iterations)
+    
+    def __call__(self, batch: torch.Tensor) -> torch.Tensor:
+        return self.infer(batch)
+
+
+class TorchBackend(InferenceBackend):
+    """PyTorch model, optionally reduced-precision and compiled."""
+    
+    name = 'torch'
+    
+    def __init__(
+        self,
+        model: torch.nn.Module,
+        engine: str = 'eager',
+        channels_last: bool = False,
+        precision: str = 'fp32',
+        calibration: Optional[torch.Tensor] = None
+    ):
+        """
+        Initialize PyTorch backend.
+        
+        Args:
+            model: fp32 model
+            engine: Execution engine (model_engine.ENGINES)
+            channels_last: Run convolutions on NHWC activations
+            precision: Precision (precision.PRECISIONS)
+            calibration: Calibration images, required for int8
+        """
+        self.model = model
+        self.engine = engine
+        self.channels_last = channels_last
+        self.precision = precision
+        self.calibration = calibration
+        self.module = None
+    
+    def load(self) -> None:
+        module = self.model.eval()
+        if self.precision != 'fp32':
+            module, self.precision = apply_precision(module, self.precision, self.calibration)
+        self.module = build_engine(module, self.engine, self.channels_last)
+    
+    def infer(self, batch: torch.Tensor) -> torch.Tensor:
+        # Grad mode is thread-local, so this must run on the thread doing
+        # the forward pass
+        with torch.no_grad():
+            return self.module(batch)
+
+
+def export_onnx(model: torch.nn.Module, path: str, opset: int = 17) -> None:
+    """
+    Export the model to ONNX with a dynamic batch dimension, unless path exists.
+    
+    The file is written under a temporary name and renamed, so processes
+    exporting at the same time never load a partial file.
+    """
+    if os.path.exists(path):
+        return
+    
+    start = time.time()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with torch.no_grad():
+        torch.onnx.export(
+            model.eval(),
+            torch.zeros(1, *INPUT_SHAPE),
+            tmp_path,
+            input_names=['input'],
+            output_names=['logits'],
+            dynamic_axes={'input': {0: 'batch'}, 'logits': {0: 'batch'}},
+            opset_version=opset,
+            dynamo=False
+        )
+    os.replace(tmp_path, path)
+    logger.info(f"Model exported to ONNX: {path}, took {time.time() - start:.1f}s")
+
+
+class OnnxRuntimeBackend(InferenceBackend):
+    """ResNet-50 exported to ONNX and run by ONNX Runtime on CPU."""
+    
+    name = 'onnxruntime'
+    
+    def __init__(self, model: torch.nn.Module, path: str, num_threads: int = 0, opset: int = 17):
+        """
+        Initialize ONNX Runtime backend.
+        
+        Args:
+            model: fp32 model, exported on first load if path does not exist
+            path: Location of the cached .onnx file. Use a new path (e.g.
+                one containing MODEL_VERSION) whenever the weights change.
+            num_threads: Intra-op threads (0 = torch.get_num_threads())
+            opset: ONNX opset for the export
+        """
+        self.model = model
+        self.path = path
+        self.num_threads = num_threads or torch.get_num_threads()
+        self.opset = opset
+        self.session = None
+    
+    def load(self) -> None:
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError(
+                "The onnxruntime backend needs the onnx and onnxruntime packages "
+                "(pip install onnx onnxruntime)"
+            ) from e
+        
+        export_onnx(self.model, self.path, self.opset)
+        
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        # One batch at a time per session: all threads go to intra-op
+        # parallelism, none to running independent graph branches
+        options.intra_op_num_threads = self.num_threads
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(self.path, options, providers=['CPUExecutionProvider'])
+        
+        logger.info(
+            f"ONNX Runtime session ready: path={self.path}, "
+            f"threads={self.num_threads}, onnxruntime={ort.__version__}"
+        )
+    
+    def infer(self, batch: torch.Tensor) -> torch.Tensor:
+        # session.run releases the GIL; the batch is passed without a copy
+        # if it is already contiguous float32
+        inputs = batch.contiguous().numpy()
+        logits, = self.session.run(['logits'], {'input': inputs})
+        return torch.from_numpy(logits)
+
+
+def create_backend(backend: str, model: torch.nn.Module, **options) -> InferenceBackend:
+    """
+    Create an (unloaded) backend by name.
+    
+    Raises:
+        ValueError: For an unknown backend
+    """
+    if backend == 'torch':
+        return TorchBackend(model, **options)
+    if backend == 'onnxruntime':
+        return OnnxRuntimeBackend(model, **options)
+    raise ValueError(f"Unknown inference backend {backend!r} (use {', '.join(BACKENDS)})")
+
+
+def load_backend(
+    model: torch.nn.Module,
+    backend: str = 'torch',
+    max_batch_size: int = 8,
+    warmup_iterations: int = 2,
+    **options
+) -> InferenceBackend:
+    """
+    Create, load and warm up a backend.
+    
+    Args:
+        model: fp32 model
+        backend: One of BACKENDS
+        max_batch_size: Largest batch size to warm up
+        warmup_iterations: Forward passes per batch size (0 = no warmup)
+        **options: Backend-specific constructor arguments
+    
+    Returns:
+        Loaded backend
+    """
+    start = time.time()
+    instance = create_backend(backend, model, **options)
+    instance.load()
+    logger.info(f"Inference backend loaded: {backend}, took {time.time() - start:.1f}s")
+    if warmup_iterations > 0:
+        instance.warmup(max_batch_size, warmup_iterations)
+    return instance
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""Inference executor that runs model forward passes off the event loop."""
+
+import asyncio
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import torch
+
+from inference_backend import InferenceBackend
+from metrics import track_stage
+
+logger = logging.getLogger(__name__)
+
+
+def run_forward(model, batch_tensor: torch.Tensor) -> torch.Tensor:
+    """
+    Run the model on a batch without autograd.
+    
+    Backends run their own infer(); plain modules and callables run under
+    no_grad. Grad mode is thread-local, so this must run on the thread
+    doing the forward pass.
+    """
+    if isinstance(model, InferenceBackend):
+        return model.infer(batch_tensor)
+    with torch.no_grad():
+        return model(batch_tensor)
+
+
+def run_batch(
+    model,
+    batch_tensor: torch.Tensor,
+    postprocess: Optional[Callable] = None
+) -> Tuple[Sequence, float, float]:
+    """
+    Run the forward pass and postprocess the whole batch at once.
+    
+    Args:
+        model: InferenceBackend or PyTorch model to use for inference
+        batch_tensor: Batch input tensor
+        postprocess: Maps the batch output to one result per request.
+            If None, results are the rows of the output tensor.
+            
+    Returns:
+        Tuple of (per-request results, forward pass time in seconds,
+        postprocessing time in seconds)
+    """
+    start_time = time.time()
+    batch_output = run_forward(model, batch_tensor)
+    inference_time = time.time() - start_time
+    
+    if postprocess is None:
+        return batch_output, inference_time, 0.0
+    start_time = time.time()
+    results = postprocess(batch_output)
+    return results, inference_time, time.time() - start_time
+
+
+def set_batch_results(
+    batch_items: List[dict],
+    results: Sequence,
+    inference_time: float,
+    postprocess_time: float = 0.0
+) -> None:
+    """
+    Resolve each request's future with its share of the batch results.
+    
+    Must be called on the event loop thread. Futures whose request was
+    cancelled (e.g. client disconnected) are skipped. The batch's
+    inference and postprocess times are recorded for every request, in
+    the stage histograms and in the request's timings dict if it has one.
+    """
+    for item, result in zip(batch_items, results):
+        if not item['future'].done():
+            track_stage('inference', inference_time)
+            track_stage('postprocess', postprocess_time)
+            if item.get('timings') is not None:
+                item['timings']['inference'] = inference_time
+                item['timings']['postprocess'] = postprocess_time
+            item['future'].set_result((result, inference_time))
+            logger.debug(f"Result set for request {item['request_id']}")
+
+
+def set_batch_exception(batch_items: List[dict], exc: BaseException) -> None:
+    """Fail every pending future in a batch. Must be called on the event loop thread."""
+    for item in batch_items:
+        if not item['future'].done():
+            item['future'].set_exception(exc)
+
+
+class InferenceExecutor:
+    """
+    Runs forward passes on dedicated inference threads.
+    
+    The event loop only hands a batch over and is notified when it is done,
+    so it keeps reading uploads, answering /health and queuing the next
+    batch while the model runs. PyTorch releases the GIL inside its
+    kernels, so the loop thread stays responsive during inference.
+    """
+    
+    def __init__(self, num_threads: int = 1):
+        """
+        Initialize inference executor.
+        
+        Args:
+            num_threads: Number of batches that may run concurrently
+        """
+        self.num_threads = num_threads
+        self.max_inflight = num_threads
+        self._pool = ThreadPoolExecutor(
+            max_workers=num_threads,
+            thread_name_prefix="inference"
+        )
+        logger.info(f"InferenceExecutor initialized: num_threads={num_threads}")
+    
+    def submit(
+        self,
+        model,
+        build_batch: Callable[[], torch.Tensor],
+        batch_items: List[dict],
+        postprocess: Optional[Callable] = None
+    ) -> asyncio.Future:
+        """
+        Run a forward pass on an inference thread.
+        
+        Args:
+            model: InferenceBackend or PyTorch model to use for inference
+            build_batch: Callable returning the batch input tensor; it is
+                called on the inference thread
+            batch_items: Request items whose futures receive the results
+            postprocess: Batch postprocessing, run on the inference thread
+            
+        Returns:
+            Future resolved with the inference time once all request
+            futures have been set
+        """
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+        self._pool.submit(self._run, loop, model, build_batch, batch_items, postprocess, done)
+        return done
+    
+    def _run(self, loop, model, build_batch, batch_items, postprocess, done) -> None:
+        """Inference thread body: run the batch, then hand results back to the loop."""
+        try:
+            results, inference_time, postprocess_time = run_batch(model, build_batch(), postprocess)
+        except Exception as e:
+            logger.error(f"Batch processing error: {e}", exc_info=True)
+            loop.call_soon_threadsafe(self._finish_error, batch_items, done, e)
+            return
+        
+        loop.call_soon_threadsafe(self._finish, batch_items, results, inference_time, postprocess_time, done)
+    
+    @staticmethod
+    def _finish(batch_items, results, inference_time, postprocess_time, done) -> None:
+        set_batch_results(batch_items, results, inference_time, postprocess_time)
+        if not done.done():
+            done.set_result(inference_time)
+    
+    @staticmethod
+    def _finish_error(batch_items, done, exc) -> None:
+        set_batch_exception(batch_items, exc)
+        if not done.done():
+            done.set_exception(exc)
+    
+    def shutdown(self) -> None:
+        """Stop accepting batches; batches already running are left to finish."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        logger.info("InferenceExecutor shut down")
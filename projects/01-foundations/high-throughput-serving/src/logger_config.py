@@ -8,16 +8,27 @@ Features:
 - Multiple log levels
 - Performance tracking
 - Error tracking with context
+- Optional asynchronous output (QueueHandler + QueueListener) with a
+  bounded buffer, and per-logger sampling of success-path records
 """
 
+import atexit
+import copy
 import logging
+import queue
 import sys
 import json
+import threading
+import time
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from pythonjsonlogger import jsonlogger
-from typing import Optional
+from typing import Callable, Dict, List, Optional
 import traceback
 
+# Called with "queue_full" or "sampled" for every record not written
+DropCallback = Callable[[str], None]
+
 
 class CustomJsonFormatter(jsonlogger.JsonFormatter):
     """
@@ -79,10 +90,108 @@ class RequestContextFilter(logging.Filter):
         return True
 
 
+class SamplingFilter(logging.Filter):
+    """
+    Per-logger rate limit for success-path records.
+    
+    Records below WARNING pass at up to `rate` per second per logger (a
+    token bucket holding one second's worth, so short bursts get
+    through); the rest are dropped. WARNING and above are never sampled.
+    """
+    
+    def __init__(self, rate: float, on_drop: Optional[DropCallback] = None):
+        """
+        Initialize the filter.
+        
+        Args:
+            rate: Records per second let through from each logger
+            on_drop: Called with "sampled" for each dropped record
+        """
+        super().__init__()
+        self.rate = rate
+        self.burst = max(1.0, rate)
+        self.on_drop = on_drop
+        self.buckets: Dict[str, List[float]] = {}  # logger name -> [tokens, last refill]
+        self.lock = threading.Lock()
+        # Shared by several handlers, the filter sees each record once per
+        # handler; the decision is taken once and reused
+        self.last_record = None
+        self.last_decision = True
+    
+    def filter(self, record):
+        """Pass warnings and errors; rate-limit everything else per logger."""
+        if record.levelno >= logging.WARNING:
+            return True
+        with self.lock:
+            if record is self.last_record:
+                return self.last_decision
+            now = time.monotonic()
+            bucket = self.buckets.get(record.name)
+            if bucket is None:
+                bucket = self.buckets[record.name] = [self.burst, now]
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            allowed = bucket[0] >= 1.0
+            if allowed:
+                bucket[0] -= 1.0
+            self.last_record, self.last_decision = record, allowed
+        if not allowed and self.on_drop:
+            self.on_drop("sampled")
+        return allowed
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    QueueHandler that drops records instead of blocking when its queue is full.
+    
+    The logging thread (usually the event loop) only merges the message
+    and enqueues the record; formatting and writing happen on the
+    QueueListener's thread. A full queue means the output cannot keep up,
+    so the record is dropped and reported to on_drop.
+    """
+    
+    def __init__(self, log_queue: queue.Queue, on_drop: Optional[DropCallback] = None):
+        super().__init__(log_queue)
+        self.on_drop = on_drop
+    
+    def prepare(self, record):
+        """Merge the message arguments now, while they still hold their values."""
+        # The queue never leaves this process, so unlike the base class
+        # keep exc_info for the formatters downstream
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+    
+    def enqueue(self, record):
+        """Queue the record, or drop it if the queue is full."""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if self.on_drop:
+                self.on_drop("queue_full")
+
+
+class DrainingQueueListener(QueueListener):
+    """QueueListener whose stop() waits for room in a full queue instead of failing."""
+    
+    def enqueue_sentinel(self):
+        """Queue the stop sentinel behind the records still waiting to be written."""
+        self.queue.put(self._sentinel)
+
+
+# Started by setup_logging in asynchronous mode
+_listener: Optional[DrainingQueueListener] = None
+_queue_handler: Optional[BoundedQueueHandler] = None
+
+
 def setup_logging(
     log_level: str = "INFO",
     json_logs: bool = True,
-    log_file: Optional[str] = None
+    log_file: Optional[str] = None,
+    async_queue_size: int = 0,
+    sample_rate: float = 0.0,
+    on_drop: Optional[DropCallback] = None
 ) -> logging.Logger:
     """
     Setup production-grade logging.
@@ -91,16 +200,25 @@ def setup_logging(
         log_level: Minimum log level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         json_logs: Use JSON format (True) or plain text (False)
         log_file: Optional file path to write logs
-        
+        async_queue_size: Write records from a background thread, buffering
+            up to this many (0 = write synchronously in the logging thread)
+        sample_rate: Records below WARNING let through per second per
+            logger (0 = all)
+        on_drop: Called with "queue_full" or "sampled" for each dropped record
+    
     Returns:
         Configured logger instance
     """
+    global _listener, _queue_handler
+    
     # Create root logger
     logger = logging.getLogger()
     logger.setLevel(getattr(logging, log_level.upper()))
     
     # Remove existing handlers
+    stop_logging()
     logger.handlers.clear()
+    handlers = []
     
     # Create console handler
     console_handler = logging.StreamHandler(sys.stdout)
@@ -121,7 +239,7 @@ def setup_logging(
         )
     
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    handlers.append(console_handler)
     
     # Add file handler if specified
     if log_file:
@@ -129,18 +247,60 @@ def setup_logging(
         file_handler.setLevel(getattr(logging, log_level.upper()))
         file_handler.addFilter(RequestContextFilter())
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
+    
+    # Sample before queueing, so dropped records cost no buffer space
+    sampler = SamplingFilter(sample_rate, on_drop) if sample_rate > 0 else None
+    
+    if async_queue_size > 0:
+        _queue_handler = BoundedQueueHandler(queue.Queue(async_queue_size), on_drop)
+        if sampler:
+            _queue_handler.addFilter(sampler)
+        _listener = DrainingQueueListener(_queue_handler.queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        logger.addHandler(_queue_handler)
+    else:
+        for handler in handlers:
+            if sampler:
+                handler.addFilter(sampler)
+            logger.addHandler(handler)
     
     return logger
 
 
+def stop_logging() -> None:
+    """
+    Flush and stop the asynchronous output started by setup_logging.
+    
+    Records still queued are written, and the output handlers are moved
+    onto the root logger, so anything logged afterwards is written
+    synchronously instead of being lost. No-op in synchronous mode.
+    """
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    listener, queue_handler = _listener, _queue_handler
+    _listener = _queue_handler = None
+    
+    root = logging.getLogger()
+    root.removeHandler(queue_handler)
+    listener.stop()
+    for handler in listener.handlers:
+        for sampler in queue_handler.filters:
+            handler.addFilter(sampler)
+        root.addHandler(handler)
+
+
+atexit.register(stop_logging)
+
+
 def get_logger(name: str) -> logging.Logger:
     """
     Get a logger instance for a module.
     
     Args:
         name: Module name (usually __name__)
-        
+    
     Returns:
         Logger instance
     """
@@ -8,15 +8,39 @@ Metrics tracked:
 - Request size
 - Error rates
 - Model inference time
-- Batch sizes
+- Per-request time in each pipeline stage
+- Batch sizes, fill ratio, time to fill and dispatch trigger
+- Model busy/idle duty cycle
 - Queue lengths
+- Requests shed before inference
+- Prediction cache hits, misses and evictions
+- Preprocessing pool saturation
+- Inference replica load
+
+With several uvicorn workers each process has its own registry, so a
+scrape would see whichever worker answered. Setting PROMETHEUS_MULTIPROC_DIR
+(api.py does so for WORKERS > 1) switches prometheus_client to
+multiprocess mode: every process writes its values to memory-mapped
+files in that directory and collect_registry() merges them. Counters and
+histograms are summed; each gauge declares how it is combined across
+live processes (multiprocess_mode, ignored in single-process mode).
 """
 
-from prometheus_client import Counter, Histogram, Gauge, generate_latest, CONTENT_TYPE_LATEST
-from typing import Optional
+from prometheus_client import (
+    CollectorRegistry, Counter, Histogram, Gauge, REGISTRY, generate_latest, multiprocess, CONTENT_TYPE_LATEST
+)
+from typing import Dict, List, Optional, Tuple
+import functools
+import glob
+import os
 import time
 
 
+def multiprocess_enabled() -> bool:
+    """Whether metrics are shared through PROMETHEUS_MULTIPROC_DIR."""
+    return bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+
 # Request metrics
 request_count = Counter(
     'http_requests_total',
@@ -31,6 +55,23 @@ request_duration = Histogram(
     buckets=[0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0]
 )
 
+# Prediction requests (/predict, /predict/tensor, /predict/batch)
+prediction_requests = Counter(
+    'prediction_requests',
+    'Prediction requests received'
+)
+
+prediction_results = Counter(
+    'prediction_results',
+    'Prediction requests finished, by result (success, partial, error)',
+    ['result']
+)
+
+prediction_latency = Counter(
+    'prediction_latency_seconds',
+    'End-to-end latency summed over successful prediction requests'
+)
+
 request_size = Histogram(
     'http_request_size_bytes',
     'HTTP request size in bytes',
@@ -48,7 +89,19 @@ model_inference_duration = Histogram(
     'model_inference_duration_seconds',
     'Model inference duration in seconds',
     ['model_name'],
-    buckets=[0.5, 1.0, 2.0, 3.0, 5.0, 10.0]
+    buckets=[0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+)
+
+# Where a prediction request's time goes, one observation per request
+# (batch-level stages are counted once for every request in the batch)
+STAGES = ('body_read', 'decode', 'preprocess', 'queue_wait', 'inference', 'postprocess', 'serialization')
+
+request_stage_duration = Histogram(
+    'request_stage_duration_seconds',
+    'Time a prediction request spent in each pipeline stage '
+    '(' + ', '.join(STAGES) + ')',
+    ['stage'],
+    buckets=[0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
 )
 
 batch_size = Histogram(
@@ -57,9 +110,148 @@ batch_size = Histogram(
     buckets=[1, 2, 4, 8, 16, 32]
 )
 
+batch_fill_ratio = Histogram(
+    'batch_fill_ratio',
+    'Batch size divided by the max_batch_size in effect at dispatch',
+    buckets=[0.125, 0.25, 0.375, 0.5, 0.625, 0.75, 0.875, 1.0]
+)
+
+batch_time_to_fill = Histogram(
+    'batch_time_to_fill_seconds',
+    'Time from the oldest request of a batch arriving to the batch being dispatched',
+    buckets=[0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0]
+)
+
+batch_dispatches = Counter(
+    'batch_dispatches_total',
+    'Batches dispatched, by trigger (full, model_busy = oldest request had waited '
+    'max_wait_time for a free inference slot, max_wait = batch waited max_wait_time '
+    'to fill, deadline = earliest deadline forced an early dispatch)',
+    ['reason']
+)
+
+model_busy_time = Counter(
+    'model_busy_seconds_total',
+    'Time with at least one batch in inference (its rate() is the model duty cycle)'
+)
+
+model_busy_ratio = Gauge(
+    'model_busy_ratio',
+    'Fraction of the last sampling interval with at least one batch in inference',
+    multiprocess_mode='livemax'
+)
+
 queue_length = Gauge(
     'batch_queue_length',
-    'Current length of batch queue'
+    'Current length of batch queue (sampled by the batcher on a timer)',
+    multiprocess_mode='livesum'
+)
+
+queue_estimated_wait = Gauge(
+    'batch_queue_estimated_wait_seconds',
+    'Estimated time for a new request to be dispatched (used for admission control)',
+    multiprocess_mode='livemax'
+)
+
+requests_shed = Counter(
+    'requests_shed_total',
+    'Requests dropped from the batch queue before inference, by reason '
+    '(deadline = could not finish in time, cancelled = client went away)',
+    ['reason']
+)
+
+# Prediction cache metrics
+prediction_cache_lookups = Counter(
+    'prediction_cache_lookups_total',
+    'Prediction cache lookups, by result (hit, miss)',
+    ['result']
+)
+
+prediction_cache_evictions = Counter(
+    'prediction_cache_evictions_total',
+    'Predictions evicted from the cache to stay within its entry/memory budget'
+)
+
+prediction_cache_entries = Gauge(
+    'prediction_cache_entries',
+    'Predictions currently cached',
+    multiprocess_mode='livesum'
+)
+
+prediction_cache_bytes = Gauge(
+    'prediction_cache_bytes',
+    'Estimated memory used by cached predictions',
+    multiprocess_mode='livesum'
+)
+
+# Preprocessing pool metrics
+preprocess_pool_workers = Gauge(
+    'preprocess_pool_workers',
+    'Number of preprocessing worker processes',
+    multiprocess_mode='livesum'
+)
+
+preprocess_pool_inflight = Gauge(
+    'preprocess_pool_inflight',
+    'Images currently being decoded/preprocessed by the pool',
+    multiprocess_mode='livesum'
+)
+
+preprocess_pool_waiting = Gauge(
+    'preprocess_pool_waiting',
+    'Images waiting for a free preprocessing slot',
+    multiprocess_mode='livesum'
+)
+
+preprocess_pool_utilization = Gauge(
+    'preprocess_pool_utilization',
+    'Fraction of preprocessing workers that are busy (1.0 = saturated)',
+    multiprocess_mode='livemax'
+)
+
+preprocess_pool_wait = Histogram(
+    'preprocess_pool_wait_seconds',
+    'Time spent waiting for a free preprocessing slot',
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0]
+)
+
+batch_max_size_current = Gauge(
+    'batch_max_size_current',
+    'Current max_batch_size used by the batcher',
+    multiprocess_mode='livemax'
+)
+
+batch_max_wait_current = Gauge(
+    'batch_max_wait_seconds_current',
+    'Current max_wait_time used by the batcher',
+    multiprocess_mode='livemax'
+)
+
+batch_arrival_rate = Gauge(
+    'batch_arrival_rate',
+    'Estimated request arrival rate (requests/second) seen by the batcher',
+    multiprocess_mode='livesum'
+)
+
+batch_tensor_allocations = Counter(
+    'batch_tensor_allocations_total',
+    'Batch input tensors allocated, by source (pool = preallocated buffer, stack = torch.stack)',
+    ['source']
+)
+
+# Inference replica metrics
+replica_queue_depth = Gauge(
+    'replica_queue_depth',
+    'Batches queued or running on an inference replica',
+    ['replica'],
+    multiprocess_mode='livesum'
+)
+
+replica_utilization = Gauge(
+    'replica_utilization',
+    'Fraction of recent time an inference replica spent running batches',
+    ['replica'],
+    multiprocess_mode='livemax'
 )
 
 # Error metrics
@@ -69,17 +261,84 @@ error_count = Counter(
     ['error_type', 'endpoint']
 )
 
+# Logging metrics
+log_records_dropped = Counter(
+    'log_records_dropped_total',
+    'Log records not written, by reason (queue_full = asynchronous log buffer '
+    'was full, sampled = over the per-logger rate limit)',
+    ['reason']
+)
+
 # System metrics
 active_requests = Gauge(
     'active_requests',
-    'Number of requests currently being processed'
+    'Number of requests currently being processed',
+    multiprocess_mode='livesum'
 )
 
 model_load_time = Gauge(
     'model_load_time_seconds',
-    'Time taken to load the model'
+    'Time taken to load the model',
+    multiprocess_mode='livemax'
+)
+
+server_ready = Gauge(
+    'server_ready',
+    'Worker processes /ready reports ready for traffic (1 per ready worker)',
+    multiprocess_mode='livesum'
+)
+
+startup_phase_time = Gauge(
+    'startup_phase_seconds',
+    'Time taken by each startup phase, from importing the API to serving (phase="total")',
+    ['phase'],
+    multiprocess_mode='livemax'
 )
 
+model_warmup_time = Gauge(
+    'model_warmup_time_seconds',
+    'Time taken to build the execution engine and warm up every batch size',
+    multiprocess_mode='livemax'
+)
+
+model_backend = Gauge(
+    'model_backend_info',
+    'Inference backend running the forward passes (1 for the active backend)',
+    ['backend'],
+    multiprocess_mode='livemax'
+)
+
+model_precision = Gauge(
+    'model_precision_info',
+    'Inference precision being served (1 for the active mode)',
+    ['mode'],
+    multiprocess_mode='livemax'
+)
+
+model_precision_speedup = Gauge(
+    'model_precision_speedup',
+    'Measured forward-pass speedup of the active precision over fp32',
+    multiprocess_mode='livemax'
+)
+
+model_precision_agreement = Gauge(
+    'model_precision_agreement',
+    'Prediction agreement with the fp32 model on the check images',
+    ['k'],
+    multiprocess_mode='livemin'
+)
+
+
+@functools.lru_cache(maxsize=None)
+def labelled(metric, *label_values):
+    """
+    metric.labels(*label_values), cached.
+    
+    Resolving the labelled child costs more than updating it, so hot
+    paths reuse it. Values are given in the order of the metric's labels.
+    """
+    return metric.labels(*label_values)
+
 
 class MetricsTracker:
     """Helper class for tracking request metrics."""
@@ -108,10 +367,7 @@ class MetricsTracker:
         duration = time.time() - self.start_time
         
         # Record duration
-        request_duration.labels(
-            method=self.method,
-            endpoint=self.endpoint
-        ).observe(duration)
+        labelled(request_duration, self.method, self.endpoint).observe(duration)
         
         # Record status
         if exc_type is None:
@@ -121,18 +377,14 @@ class MetricsTracker:
         else:
             status = '500'
         
-        request_count.labels(
-            method=self.method,
-            endpoint=self.endpoint,
-            status=status
-        ).inc()
+        labelled(request_count, self.method, self.endpoint, status).inc()
         
-        # Record errors
+        # Record errors (an HTTPException raised "from" another error is
+        # counted under the original error type, e.g. QueueFullError)
         if exc_type is not None:
-            error_count.labels(
-                error_type=exc_type.__name__,
-                endpoint=self.endpoint
-            ).inc()
+            cause = getattr(exc_val, '__cause__', None)
+            error_type = type(cause).__name__ if cause is not None else exc_type.__name__
+            labelled(error_count, error_type, self.endpoint).inc()
         
         active_requests.dec()
         
@@ -141,17 +393,37 @@ class MetricsTracker:
     def set_request_size(self, size: int):
         """Record request size."""
         self.request_size_bytes = size
-        request_size.labels(
-            method=self.method,
-            endpoint=self.endpoint
-        ).observe(size)
+        labelled(request_size, self.method, self.endpoint).observe(size)
     
     def set_response_size(self, size: int):
         """Record response size."""
-        response_size.labels(
-            method=self.method,
-            endpoint=self.endpoint
-        ).observe(size)
+        labelled(response_size, self.method, self.endpoint).observe(size)
+
+
+def track_prediction_request():
+    """Count a prediction request received."""
+    prediction_requests.inc()
+
+
+def track_prediction_success(latency_seconds: float):
+    """
+    Count a successful prediction request.
+    
+    Args:
+        latency_seconds: End-to-end request latency
+    """
+    labelled(prediction_results, 'success').inc()
+    prediction_latency.inc(latency_seconds)
+
+
+def track_prediction_partial():
+    """Count a /predict/batch request that streamed results but failed some images."""
+    labelled(prediction_results, 'partial').inc()
+
+
+def track_prediction_error():
+    """Count a failed prediction request."""
+    labelled(prediction_results, 'error').inc()
 
 
 def track_inference(model_name: str, duration_seconds: float):
@@ -162,7 +434,18 @@ def track_inference(model_name: str, duration_seconds: float):
         model_name: Name of the model
         duration_seconds: Inference duration in seconds
     """
-    model_inference_duration.labels(model_name=model_name).observe(duration_seconds)
+    labelled(model_inference_duration, model_name).observe(duration_seconds)
+
+
+def track_stage(stage: str, duration_seconds: float):
+    """
+    Track the time one request spent in a pipeline stage.
+    
+    Args:
+        stage: One of STAGES
+        duration_seconds: Stage duration in seconds
+    """
+    labelled(request_stage_duration, stage).observe(duration_seconds)
 
 
 def track_batch(size: int):
@@ -175,6 +458,34 @@ def track_batch(size: int):
     batch_size.observe(size)
 
 
+def track_batch_dispatch(size: int, max_batch_size: int, time_to_fill: float, reason: str):
+    """
+    Track a dispatched batch.
+    
+    Args:
+        size: Requests in the batch
+        max_batch_size: Batch size limit in effect at dispatch
+        time_to_fill: Seconds from the oldest request arriving to dispatch
+        reason: "full", "model_busy", "max_wait" or "deadline"
+    """
+    track_batch(size)
+    batch_fill_ratio.observe(size / max_batch_size)
+    batch_time_to_fill.observe(time_to_fill)
+    labelled(batch_dispatches, reason).inc()
+
+
+def track_model_busy(busy_seconds: float, busy_ratio: float):
+    """
+    Track model duty cycle over one sampling interval.
+    
+    Args:
+        busy_seconds: Time in the interval with a batch in inference
+        busy_ratio: busy_seconds divided by the interval length
+    """
+    model_busy_time.inc(busy_seconds)
+    model_busy_ratio.set(busy_ratio)
+
+
 def update_queue_length(length: int):
     """
     Update batch queue length.
@@ -185,14 +496,209 @@ def update_queue_length(length: int):
     queue_length.set(length)
 
 
+def update_queue_estimated_wait(seconds: float):
+    """
+    Update the estimated queue wait.
+    
+    Args:
+        seconds: Estimated time for a new request to be dispatched
+    """
+    queue_estimated_wait.set(seconds)
+
+
+def track_request_shed(reason: str):
+    """
+    Count a request dropped before inference.
+    
+    Args:
+        reason: "deadline" or "cancelled"
+    """
+    labelled(requests_shed, reason).inc()
+
+
+def track_log_drop(reason: str):
+    """
+    Count a log record that was not written.
+    
+    Args:
+        reason: "queue_full" or "sampled"
+    """
+    labelled(log_records_dropped, reason).inc()
+
+
+def track_prediction_cache(result: str):
+    """
+    Count a prediction cache lookup.
+    
+    Args:
+        result: "hit" or "miss"
+    """
+    labelled(prediction_cache_lookups, result).inc()
+
+
+def track_prediction_cache_eviction():
+    """Count a prediction evicted from the cache."""
+    prediction_cache_evictions.inc()
+
+
+def update_prediction_cache(entries: int, size_bytes: int):
+    """
+    Update prediction cache size gauges.
+    
+    Args:
+        entries: Cached predictions
+        size_bytes: Estimated memory used by the cache
+    """
+    prediction_cache_entries.set(entries)
+    prediction_cache_bytes.set(size_bytes)
+
+
+def update_preprocess_pool(workers: int, inflight: int, waiting: int):
+    """
+    Update preprocessing pool saturation gauges.
+    
+    Args:
+        workers: Number of worker processes
+        inflight: Images handed to workers
+        waiting: Images waiting for a free slot
+    """
+    preprocess_pool_workers.set(workers)
+    preprocess_pool_inflight.set(inflight)
+    preprocess_pool_waiting.set(waiting)
+    preprocess_pool_utilization.set(min(inflight, workers) / workers if workers else 0)
+
+
+def track_preprocess_wait(duration_seconds: float):
+    """
+    Track time spent waiting for a preprocessing slot.
+    
+    Args:
+        duration_seconds: Wait duration in seconds
+    """
+    preprocess_pool_wait.observe(duration_seconds)
+
+
+def update_batching_params(max_batch_size: int, max_wait_time: float, arrival_rate: float):
+    """
+    Update the batcher's current parameters.
+    
+    Args:
+        max_batch_size: Current maximum batch size
+        max_wait_time: Current maximum wait time in seconds
+        arrival_rate: Estimated arrival rate in requests/second
+    """
+    batch_max_size_current.set(max_batch_size)
+    batch_max_wait_current.set(max_wait_time)
+    batch_arrival_rate.set(arrival_rate)
+
+
+def track_batch_buffer_allocation(source: str):
+    """
+    Count an allocated batch input tensor.
+    
+    Args:
+        source: "pool" for a buffer pool allocation, "stack" for torch.stack
+    """
+    labelled(batch_tensor_allocations, source).inc()
+
+
+def update_replica_stats(replica: int, depth: int, utilization: float):
+    """
+    Update load gauges for one inference replica.
+    
+    Args:
+        replica: Replica index
+        depth: Batches queued or running on the replica
+        utilization: Busy fraction over the recent window (0-1)
+    """
+    labelled(replica_queue_depth, str(replica)).set(depth)
+    labelled(replica_utilization, str(replica)).set(utilization)
+
+
+def update_model_precision(mode: str, speedup: float, top1_agreement: float, top5_agreement: float):
+    """
+    Record the active inference precision and its startup check results.
+    
+    Args:
+        mode: fp32, bf16 or int8
+        speedup: Forward-pass speedup over fp32
+        top1_agreement: Fraction of check images with the same top-1 class
+        top5_agreement: Mean top-5 overlap with fp32
+    """
+    model_precision.labels(mode=mode).set(1)
+    model_precision_speedup.set(speedup)
+    model_precision_agreement.labels(k="top1").set(top1_agreement)
+    model_precision_agreement.labels(k="top5").set(top5_agreement)
+
+
+def prepare_multiprocess_dir(path: str) -> str:
+    """
+    Enable multiprocess mode for worker processes started after this call.
+    
+    Must run in the parent before the workers start (and before they
+    import prometheus_client). Values left by a previous run are removed.
+    
+    Args:
+        path: Directory for the per-process metric files
+    
+    Returns:
+        The directory
+    """
+    os.makedirs(path, exist_ok=True)
+    for stale in glob.glob(os.path.join(path, "*.db")):
+        os.remove(stale)
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = path
+    return path
+
+
+def mark_worker_dead(pid: Optional[int] = None):
+    """Drop a stopped worker's live gauges from the aggregate (multiprocess mode only)."""
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+def collect_registry() -> CollectorRegistry:
+    """Registry with every worker's metrics in multiprocess mode, else this process's."""
+    if not multiprocess_enabled():
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def collect_samples(registry: Optional[CollectorRegistry] = None) -> Dict[str, List[Tuple[dict, float]]]:
+    """
+    Read all current samples.
+    
+    Args:
+        registry: Registry to read (default: collect_registry())
+    
+    Returns:
+        Sample name (e.g. "prediction_requests_total") -> list of (labels, value)
+    """
+    samples = {}
+    for metric in (registry or collect_registry()).collect():
+        for sample in metric.samples:
+            samples.setdefault(sample.name, []).append((sample.labels, sample.value))
+    return samples
+
+
+def sum_samples(samples: Dict[str, List[Tuple[dict, float]]], name: str, **labels) -> float:
+    """Sum of the samples called name whose labels include labels."""
+    return sum(
+        value for sample_labels, value in samples.get(name, [])
+        if all(sample_labels.get(key) == wanted for key, wanted in labels.items())
+    )
+
+
 def get_metrics() -> tuple:
     """
-    Get current metrics in Prometheus format.
+    Get current metrics in Prometheus format, aggregated over all workers.
     
     Returns:
         Tuple of (metrics_data, content_type)
     """
-    return generate_latest(), CONTENT_TYPE_LATEST
+    return generate_latest(collect_registry()), CONTENT_TYPE_LATEST
 
 
 # Example usage
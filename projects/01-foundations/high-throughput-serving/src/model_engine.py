@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Optimized model execution: TorchScript, torch.compile and channels_last.
+
+The eager ResNet-50 module dispatches every op from Python and keeps
+BatchNorm as a separate op after each convolution. build_engine turns it
+into an optimized graph once at startup:
+
+- torchscript: trace, freeze (weights become constants, Conv+BatchNorm
+  are folded) and optimize_for_inference (oneDNN-friendly rewrites)
+- compile: torch.compile with the default Inductor backend; the first
+  call per input shape compiles, later shapes share a dynamic-batch graph
+
+channels_last stores activations NHWC, which the CPU convolution kernels
+prefer. The input is converted inside the module, so callers keep
+passing NCHW batches.
+
+Both optimized engines compile lazily or specialize on the first calls,
+so warmup() runs every batch size once before the server takes traffic.
+"""
+
+import logging
+import time
+from typing import Dict, Tuple
+
+import torch
+
+from preprocessing import INPUT_SHAPE
+
+logger = logging.getLogger(__name__)
+
+ENGINES = ('eager', 'torchscript', 'compile')
+
+
+class ChannelsLast(torch.nn.Module):
+    """Runs the wrapped model with NHWC (channels_last) activations."""
+    
+    def __init__(self, model: torch.nn.Module):
+        super().__init__()
+        self.model = model.to(memory_format=torch.channels_last)
+    
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        return self.model(x.contiguous(memory_format=torch.channels_last))
+
+
+def build_engine(
+    model: torch.nn.Module,
+    engine: str = 'eager',
+    channels_last: bool = False,
+    input_shape: Tuple[int, ...] = INPUT_SHAPE
+) -> torch.nn.Module:
+    """
+    Wrap a loaded eval-mode model in the requested execution engine.
+    
+    TorchScript freezing and channels_last copy the weights, so the
+    result no longer shares parameters with model.
+    
+    Args:
+        model: Eager model in eval mode
+        engine: One of ENGINES
+        channels_last: Run convolutions on NHWC activations
+        input_shape: Shape of one input, used to trace
+    
+    Returns:
+        Callable module taking a [B, *input_shape] float32 batch
+    
+    Raises:
+        ValueError: For an unknown engine
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown model engine {engine!r} (use {', '.join(ENGINES)})")
+    
+    start = time.time()
+    if channels_last:
+        model = ChannelsLast(model).eval()
+    
+    if engine == 'torchscript':
+        with torch.no_grad():
+            traced = torch.jit.trace(model, torch.zeros(1, *input_shape))
+            model = torch.jit.optimize_for_inference(torch.jit.freeze(traced))
+    elif engine == 'compile':
+        model = torch.compile(model)
+    
+    logger.info(
+        f"Model engine built: engine={engine}, channels_last={channels_last}, "
+        f"took {time.time() - start:.1f}s"
+    )
+    return model
+
+
+def warmup(
+    model,
+    max_batch_size: int,
+    iterations: int = 2,
+    input_shape: Tuple[int, ...] = INPUT_SHAPE
+) -> Dict[int, float]:
+    """
+    Run every batch size from 1 to max_batch_size before serving.
+    
+    The first calls per shape pay for compilation (torch.compile), graph
+    specialization (TorchScript's profiling executor) and allocator growth.
+    
+    Args:
+        model: Model or engine to warm up
+        max_batch_size: Largest batch size the batcher will send
+        iterations: Forward passes per batch size
+        input_shape: Shape of one input
+    
+    Returns:
+        Seconds spent on each batch size
+    """
+    timings = {}
+    with torch.no_grad():
+        batch = torch.zeros(max_batch_size, *input_shape)
+        for batch_size in range(1, max_batch_size + 1):
+            start = time.time()
+            for _ in range(iterations):
+                model(batch[:batch_size])
+            timings[batch_size] = time.time() - start
+    
+    logger.info(
+        f"Model warmed up: batch sizes 1-{max_batch_size} x {iterations}, "
+        f"took {sum(timings.values()):.1f}s"
+    )
+    return timings
+
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+ResNet-50 loading for a fast, offline cold start.
+
+models.resnet50(pretrained=True) allocates the model, runs the random
+weight initialization, then reads the checkpoint from the torch hub cache
+(downloading it if missing) and copies every tensor into the model. With
+a local state dict (see download_model.py) load_model instead:
+
+- builds the model on the meta device: no memory is allocated and no
+  random initialization runs
+- memory-maps the checkpoint with torch.load(mmap=True, weights_only=True):
+  pages are read on first touch, straight from the page cache on a warm
+  host
+- assigns the mapped tensors as the model parameters (load_state_dict
+  with assign=True) instead of copying them
+
+No network access is needed. torchvision is imported here, not at module
+import, so it is only paid for when a model is actually built.
+"""
+
+import logging
+import os
+import time
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+
+def load_local_model(path: str) -> torch.nn.Module:
+    """
+    Load ResNet-50 from a local state dict without a copy or random init.
+    
+    Args:
+        path: File written by torch.save(model.state_dict(), path)
+    
+    Returns:
+        Model in eval mode whose tensors are backed by the mapped file
+    """
+    from torchvision.models import resnet50
+    
+    start = time.time()
+    with torch.device('meta'):
+        model = resnet50(weights=None)
+    build_time = time.time() - start
+    
+    state_dict = torch.load(path, map_location='cpu', mmap=True, weights_only=True)
+    model.load_state_dict(state_dict, assign=True)
+    model.eval()
+    
+    logger.info(
+        f"Model loaded from {path}: build={build_time * 1000:.0f}ms, "
+        f"total={(time.time() - start) * 1000:.0f}ms"
+    )
+    return model
+
+
+def load_model(path: str, allow_download: bool = True) -> torch.nn.Module:
+    """
+    Load ResNet-50 from path, falling back to the pretrained download.
+    
+    Args:
+        path: Local state dict (see load_local_model)
+        allow_download: If path does not exist, load the torchvision
+            pretrained weights (torch hub cache or network) instead
+    
+    Returns:
+        Model in eval mode
+    
+    Raises:
+        FileNotFoundError: If path does not exist and allow_download is False
+    """
+    if os.path.exists(path):
+        return load_local_model(path)
+    
+    if not allow_download:
+        raise FileNotFoundError(
+            f"Model weights not found at {path}; run download_model.py or set MODEL_PATH"
+        )
+    
+    from torchvision.models import ResNet50_Weights, resnet50
+    
+    logger.warning(f"Model weights not found at {path}, loading pretrained weights from torch hub")
+    return resnet50(weights=ResNet50_Weights.IMAGENET1K_V1).eval()
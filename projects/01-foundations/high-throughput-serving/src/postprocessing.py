@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Batch-level postprocessing: softmax and top-k over the whole model output."""
+
+import functools
+from typing import List
+
+import torch
+
+TOP_K = 5
+
+
+@functools.lru_cache(maxsize=None)
+def imagenet_labels() -> List[str]:
+    """Labels for all 1000 ImageNet classes, indexed by class id (torchvision is imported on first use)."""
+    from torchvision.models import ResNet50_Weights
+    return list(ResNet50_Weights.IMAGENET1K_V1.meta["categories"])
+
+
+def top_k_predictions(batch_output: torch.Tensor, k: int = TOP_K) -> List[List[dict]]:
+    """
+    Turn a [B, 1000] logits tensor into per-request prediction lists.
+    
+    Runs one softmax and one topk over the whole batch and converts the
+    results to Python with a single tolist() each, so the API can return
+    them without further tensor work.
+    
+    Args:
+        batch_output: Model output logits, shape [B, num_classes]
+        k: Number of predictions per request
+        
+    Returns:
+        One list of k prediction dicts per request, best first
+    """
+    labels = imagenet_labels()
+    probabilities = torch.softmax(batch_output, dim=1)
+    top_prob, top_catid = torch.topk(probabilities, k, dim=1)
+    
+    batch_predictions = []
+    for probs, class_ids in zip(top_prob.tolist(), top_catid.tolist()):
+        batch_predictions.append([
+            {
+                "rank": rank + 1,
+                "class_id": class_id,
+                "class_name": labels[class_id],
+                "confidence": round(confidence, 4)
+            }
+            for rank, (class_id, confidence) in enumerate(zip(class_ids, probs))
+        ])
+    return batch_predictions
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Reduced-precision CPU inference: int8 static quantization and bf16 autocast.
+
+- int8: post-training static quantization with FX graph mode. Observers
+  are inserted, a local image set is run through the model to calibrate
+  activation ranges, and the graph is converted to quantized kernels
+  (x86 backend: fbgemm/oneDNN, VNNI/AMX where available).
+- bf16: the fp32 model runs under torch.autocast, so convolutions and
+  matmuls use bfloat16 where the CPU supports it (AVX512-BF16/AMX).
+  Elsewhere the server falls back to fp32.
+
+check_precision compares a candidate against the fp32 model on an image
+set and refuses it (PrecisionCheckError) if top-1 or top-5 agreement
+drops below the configured thresholds. For int8 the set must not be the
+calibration set: activation ranges fitted on the same images would make
+the agreement look better than it is on unseen inputs.
+"""
+
+import copy
+import logging
+import os
+import time
+from typing import Optional, Tuple
+
+import torch
+
+from preprocessing import build_preprocess, decode_image
+
+logger = logging.getLogger(__name__)
+
+PRECISIONS = ('fp32', 'bf16', 'int8')
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+
+
+class PrecisionCheckError(RuntimeError):
+    """Reduced-precision model disagrees with fp32 more than allowed."""
+
+
+class Bf16Autocast(torch.nn.Module):
+    """Runs the wrapped fp32 model under bf16 autocast, returning fp32 logits."""
+    
+    def __init__(self, model: torch.nn.Module):
+        super().__init__()
+        self.model = model
+    
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        with torch.autocast('cpu', dtype=torch.bfloat16):
+            return self.model(x).float()
+
+
+def bf16_supported() -> bool:
+    """Whether the CPU has native bf16 support (AVX512-BF16 or AMX)."""
+    return torch.backends.mkldnn.is_available() and torch.ops.mkldnn._is_mkldnn_bf16_supported()
+
+
+def load_images(directory: str, limit: int = 256) -> torch.Tensor:
+    """
+    Load and preprocess up to limit images from a directory.
+    
+    Returns:
+        [N, 3, 224, 224] float32 tensor
+    
+    Raises:
+        ValueError: If the directory holds no readable images
+    """
+    preprocess = build_preprocess()
+    tensors = []
+    for filename in sorted(os.listdir(directory)):
+        if not filename.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        with open(os.path.join(directory, filename), 'rb') as f:
+            tensors.append(preprocess(decode_image(f.read())))
+        if len(tensors) >= limit:
+            break
+    if not tensors:
+        raise ValueError(f"No images found in {directory}")
+    return torch.stack(tensors)
+
+
+def quantize_int8(model: torch.nn.Module, calibration: torch.Tensor, batch_size: int = 8) -> torch.nn.Module:
+    """
+    Post-training static int8 quantization with FX graph mode.
+    
+    Args:
+        model: fp32 model in eval mode (not modified)
+        calibration: [N, 3, 224, 224] preprocessed calibration images
+        batch_size: Calibration batch size
+    
+    Returns:
+        Quantized GraphModule
+    """
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+    
+    start = time.time()
+    qconfig_mapping = get_default_qconfig_mapping(torch.backends.quantized.engine)
+    prepared = prepare_fx(copy.deepcopy(model).eval(), qconfig_mapping, (calibration[:1],))
+    with torch.no_grad():
+        for batch in calibration.split(batch_size):
+            prepared(batch)
+    quantized = convert_fx(prepared)
+    
+    logger.info(
+        f"Model quantized to int8: backend={torch.backends.quantized.engine}, "
+        f"calibration_images={len(calibration)}, took {time.time() - start:.1f}s"
+    )
+    return quantized
+
+
+def apply_precision(
+    model: torch.nn.Module,
+    precision: str,
+    calibration: Optional[torch.Tensor] = None
+) -> Tuple[torch.nn.Module, str]:
+    """
+    Convert an fp32 model to the requested precision.
+    
+    Args:
+        model: fp32 model in eval mode (not modified)
+        precision: One of PRECISIONS
+        calibration: Calibration images, required for int8
+    
+    Returns:
+        Tuple of (model, precision actually used). bf16 falls back to fp32
+        on CPUs without native bf16.
+    
+    Raises:
+        ValueError: For an unknown precision or int8 without calibration data
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision {precision!r} (use {', '.join(PRECISIONS)})")
+    
+    if precision == 'int8':
+        if calibration is None:
+            raise ValueError("int8 quantization needs calibration images")
+        return quantize_int8(model, calibration), 'int8'
+    
+    if precision == 'bf16':
+        if not bf16_supported():
+            logger.warning("CPU has no native bf16 support, serving in fp32")
+            return model, 'fp32'
+        return Bf16Autocast(model).eval(), 'bf16'
+    
+    return model, 'fp32'
+
+
+def agreement(
+    reference: torch.nn.Module,
+    candidate: torch.nn.Module,
+    images: torch.Tensor,
+    batch_size: int = 8
+) -> Tuple[float, float]:
+    """
+    Prediction agreement of candidate with reference.
+    
+    Returns:
+        Tuple of (fraction of images with the same top-1 class, mean
+        fraction of the reference top-5 classes also in the candidate top-5)
+    """
+    top1_same = 0
+    top5_overlap = 0
+    with torch.no_grad():
+        for batch in images.split(batch_size):
+            reference_top5 = reference(batch).topk(5).indices
+            candidate_top5 = candidate(batch).topk(5).indices
+            top1_same += (reference_top5[:, 0] == candidate_top5[:, 0]).sum().item()
+            for ref, cand in zip(reference_top5.tolist(), candidate_top5.tolist()):
+                top5_overlap += len(set(ref) & set(cand)) / 5
+    return top1_same / len(images), top5_overlap / len(images)
+
+
+def measure_speedup(
+    reference: torch.nn.Module,
+    candidate: torch.nn.Module,
+    batch: torch.Tensor,
+    iterations: int = 3
+) -> float:
+    """Ratio of reference to candidate forward-pass time on one batch."""
+    def run(model):
+        with torch.no_grad():
+            model(batch)  # warm-up
+            start = time.perf_counter()
+            for _ in range(iterations):
+                model(batch)
+            return time.perf_counter() - start
+    
+    return run(reference) / run(candidate)
+
+
+def check_precision(
+    model: torch.nn.Module,
+    precision: str,
+    calibration: Optional[torch.Tensor],
+    images: torch.Tensor,
+    min_top1: float,
+    min_top5: float,
+    batch_size: int = 8,
+    min_images: int = 0
+) -> Tuple[torch.nn.Module, dict]:
+    """
+    Convert the model and verify it against fp32 before serving it.
+    
+    Args:
+        model: fp32 model in eval mode (not modified)
+        precision: One of PRECISIONS
+        calibration: Calibration images (int8)
+        images: Images for the agreement check; for int8, not the
+            calibration images
+        min_top1: Lowest accepted top-1 agreement
+        min_top5: Lowest accepted top-5 agreement
+        batch_size: Batch size for the checks and the speedup measurement
+        min_images: Fewest calibration (int8) and check images accepted
+    
+    Returns:
+        Tuple of (converted model, report with mode, agreement and speedup)
+    
+    Raises:
+        PrecisionCheckError: If agreement is below min_top1 or min_top5,
+            an image set is smaller than min_images, or int8 would be
+            checked on its calibration images
+    """
+    if precision == 'int8' and images is calibration:
+        raise PrecisionCheckError("The int8 agreement check needs images that were not used for calibration")
+    
+    sets = [('agreement check', images)]
+    if precision == 'int8':
+        sets.insert(0, ('int8 calibration', calibration))
+    for purpose, tensor in sets:
+        count = 0 if tensor is None else len(tensor)
+        if count < min_images:
+            raise PrecisionCheckError(
+                f"{count} image(s) for the {purpose}, at least {min_images} are needed "
+                f"for a meaningful result; point the directory at more representative images"
+            )
+    
+    candidate, mode = apply_precision(model, precision, calibration)
+    if mode == 'fp32':
+        return candidate, {'mode': 'fp32', 'speedup': 1.0, 'top1_agreement': 1.0, 'top5_agreement': 1.0}
+    
+    top1, top5 = agreement(model, candidate, images, batch_size)
+    batch = images[torch.arange(batch_size) % len(images)]
+    report = {
+        'mode': mode,
+        'speedup': round(measure_speedup(model, candidate, batch), 2),
+        'top1_agreement': round(top1, 4),
+        'top5_agreement': round(top5, 4),
+        'images': len(images),
+    }
+    logger.info(f"Precision check: {report}")
+    
+    if top1 < min_top1 or top5 < min_top5:
+        raise PrecisionCheckError(
+            f"{mode} model agrees with fp32 on top-1 {top1:.1%} / top-5 {top5:.1%} of "
+            f"{len(images)} images (minimum {min_top1:.1%} / {min_top5:.1%})"
+        )
+    return candidate, report
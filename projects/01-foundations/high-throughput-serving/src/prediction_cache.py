@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Prediction cache keyed by a hash of the uploaded image bytes.
+
+Repeated uploads (thumbnails, client retries) otherwise pay full decode,
+preprocess and inference. The key is a BLAKE2b digest of the raw bytes
+plus the model version, so it can be checked before decoding and entries
+never outlive the model that produced them. The cache is bounded by entry
+count and by an estimate of its memory, and evicts least recently used
+entries first.
+"""
+
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Optional
+
+from metrics import track_prediction_cache, track_prediction_cache_eviction, update_prediction_cache
+
+logger = logging.getLogger(__name__)
+
+# Rough per-entry overhead (key, OrderedDict node, containers) in bytes
+ENTRY_OVERHEAD_BYTES = 256
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory held by a cached prediction, from its JSON size."""
+    return len(json.dumps(value)) + ENTRY_OVERHEAD_BYTES
+
+
+class PredictionCache:
+    """LRU cache of predictions, bounded by entries and bytes."""
+    
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024, model_version: str = ""):
+        """
+        Initialize prediction cache.
+        
+        Args:
+            max_entries: Maximum number of cached predictions
+            max_bytes: Maximum estimated memory for cached predictions
+            model_version: Part of every key, so a new model never serves
+                the previous model's predictions
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.model_version = model_version
+        
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (value, size)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        logger.info(
+            f"PredictionCache initialized: max_entries={max_entries}, "
+            f"max_bytes={max_bytes}, model_version={model_version}"
+        )
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def key(self, data: bytes, input_format: str = "") -> str:
+        """
+        Cache key for an uploaded image.
+        
+        Args:
+            data: Uploaded bytes
+            input_format: Anything besides the bytes that determines how
+                they are read (e.g. the shape of a raw tensor)
+        """
+        digest = hashlib.blake2b(data, digest_size=16)
+        digest.update(input_format.encode())
+        return f"{self.model_version}:{digest.hexdigest()}"
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached prediction for key (and mark it recently used), or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            track_prediction_cache("miss")
+            return None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        track_prediction_cache("hit")
+        return entry[0]
+    
+    def put(self, key: str, value: Any) -> None:
+        """Cache a prediction, evicting least recently used entries to stay in budget."""
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        self._entries[key] = (value, size)
+        self.bytes += size
+        
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.bytes -= evicted_size
+            self.evictions += 1
+            track_prediction_cache_eviction()
+        
+        update_prediction_cache(len(self._entries), self.bytes)
+    
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
+        self.bytes = 0
+        update_prediction_cache(0, 0)
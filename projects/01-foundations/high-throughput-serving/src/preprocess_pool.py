@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Process pool for image decoding and preprocessing.
+
+Decoding and the Resize/CenterCrop/ToTensor/Normalize transforms are CPU
+bound and hold the GIL, so running them on the event loop serializes every
+upload on one core. PreprocessPool moves them to worker processes.
+
+Workers write the finished 3x224x224 tensor into a slot of a shared-memory
+block owned by the API process, so results come back without pickling.
+Only the (small) encoded image bytes are sent to the worker.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+import torch
+
+from preprocessing import INPUT_SHAPE, build_preprocess, preprocess_bytes
+from metrics import update_preprocess_pool, track_preprocess_wait
+
+logger = logging.getLogger(__name__)
+
+SLOT_DTYPE = np.float32
+UINT8_SLOT_DTYPE = np.uint8
+
+# Per-worker state, set by _init_worker
+_worker_shm = None
+_worker_slots = None
+_worker_preprocess = None
+_worker_jpeg_draft = False
+
+
+def _init_worker(shm_name: str, num_slots: int, jpeg_draft: bool = False, uint8: bool = False) -> None:
+    """Attach to the shared slot block and build the transforms once per worker."""
+    global _worker_shm, _worker_slots, _worker_preprocess, _worker_jpeg_draft
+    
+    # One worker per core; intra-op threads would only oversubscribe
+    torch.set_num_threads(1)
+    
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    dtype = UINT8_SLOT_DTYPE if uint8 else SLOT_DTYPE
+    slots = np.ndarray((num_slots, *INPUT_SHAPE), dtype=dtype, buffer=_worker_shm.buf)
+    _worker_slots = torch.from_numpy(slots)
+    _worker_preprocess = build_preprocess(uint8)
+    _worker_jpeg_draft = jpeg_draft
+
+
+def _preprocess_into_slot(data: bytes, slot: int) -> dict:
+    """Worker task: decode, preprocess and write the result into a slot; returns the stage timings."""
+    timings = {}
+    _worker_slots[slot].copy_(preprocess_bytes(data, _worker_preprocess, _worker_jpeg_draft, timings))
+    return timings
+
+
+def _ping() -> None:
+    """No-op used to start workers ahead of the first request."""
+
+
+class PreprocessPool:
+    """Pool of worker processes that decode uploads into input tensors."""
+    
+    def __init__(
+        self,
+        num_workers: int,
+        slots_per_worker: int = 2,
+        start_method: str = "spawn",
+        jpeg_draft: bool = False,
+        uint8: bool = False
+    ):
+        """
+        Initialize preprocessing pool.
+        
+        Args:
+            num_workers: Number of worker processes
+            slots_per_worker: Shared-memory result slots per worker. More than
+                one lets the next job be handed over while a worker is busy.
+            start_method: multiprocessing start method. "spawn" avoids
+                forking a process that already runs torch threads.
+            jpeg_draft: Decode JPEGs at reduced resolution (see
+                preprocessing.decode_image)
+            uint8: Return uint8 pixels instead of normalized float32 (a
+                quarter of the shared memory per slot); see
+                preprocessing.normalize_batch
+        """
+        self.num_workers = num_workers
+        self.num_slots = num_workers * slots_per_worker
+        
+        dtype = UINT8_SLOT_DTYPE if uint8 else SLOT_DTYPE
+        slot_bytes = int(np.prod(INPUT_SHAPE)) * np.dtype(dtype).itemsize
+        self._shm = shared_memory.SharedMemory(create=True, size=self.num_slots * slot_bytes)
+        self._slots = torch.from_numpy(
+            np.ndarray((self.num_slots, *INPUT_SHAPE), dtype=dtype, buffer=self._shm.buf)
+        )
+        
+        self._free_slots = asyncio.Queue()
+        for slot in range(self.num_slots):
+            self._free_slots.put_nowait(slot)
+        
+        self._pool = ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=multiprocessing.get_context(start_method),
+            initializer=_init_worker,
+            initargs=(self._shm.name, self.num_slots, jpeg_draft, uint8)
+        )
+        
+        # Saturation tracking
+        self.inflight = 0
+        self.waiting = 0
+        
+        logger.info(
+            f"PreprocessPool initialized: num_workers={num_workers}, "
+            f"slots={self.num_slots}, shared_memory={self._shm.size / 1e6:.1f}MB"
+        )
+    
+    async def start(self) -> None:
+        """Spawn all workers now so the first requests don't pay for it."""
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[
+            loop.run_in_executor(self._pool, _ping) for _ in range(self.num_workers)
+        ])
+        self._report()
+        logger.info("PreprocessPool workers started")
+    
+    async def preprocess(self, data: bytes, timings: Optional[dict] = None) -> torch.Tensor:
+        """
+        Decode and preprocess image bytes on a worker process.
+        
+        Args:
+            data: Encoded JPEG/PNG bytes
+            timings: Receives the worker's decode and preprocess times in seconds
+            
+        Returns:
+            3x224x224 float32 input tensor (uint8 pixels in uint8 mode)
+        """
+        loop = asyncio.get_running_loop()
+        
+        self.waiting += 1
+        self._report()
+        wait_start = time.time()
+        try:
+            slot = await self._free_slots.get()
+        finally:
+            self.waiting -= 1
+        track_preprocess_wait(time.time() - wait_start)
+        
+        self.inflight += 1
+        self._report()
+        job = loop.run_in_executor(self._pool, _preprocess_into_slot, data, slot)
+        try:
+            worker_timings = await asyncio.shield(job)
+            if timings is not None:
+                timings.update(worker_timings)
+            # Copy out of the slot so it can be reused right away
+            return self._slots[slot].clone()
+        except asyncio.CancelledError:
+            if not job.done():
+                # The worker may still be writing into the slot; free it later
+                job.add_done_callback(lambda j: self._release(slot, j))
+            raise
+        finally:
+            if job.done():
+                self._release(slot)
+    
+    def _release(self, slot: int, job: asyncio.Future = None) -> None:
+        """Return a slot to the free list once no worker is writing to it."""
+        if job is not None and not job.cancelled():
+            job.exception()  # Mark as retrieved; the request is already gone
+        self.inflight -= 1
+        self._free_slots.put_nowait(slot)
+        self._report()
+    
+    def _report(self) -> None:
+        update_preprocess_pool(self.num_workers, self.inflight, self.waiting)
+    
+    def shutdown(self) -> None:
+        """Stop the workers and release the shared memory."""
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        del self._slots
+        self._shm.close()
+        self._shm.unlink()
+        logger.info("PreprocessPool shut down")
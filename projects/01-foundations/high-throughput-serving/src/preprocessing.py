@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Image decoding and preprocessing shared by the API and preprocessing workers.
+
+torchvision is imported when a pipeline is first built: importing it pulls
+in torch._dynamo and takes longer than importing torch itself, so the API
+module and other importers of INPUT_SHAPE don't pay for it up front.
+"""
+
+import io
+import time
+from typing import Callable, Optional
+
+import torch
+from PIL import Image
+
+# ImageNet normalization used by ResNet-50
+IMAGENET_MEAN = [0.485, 0.456, 0.406]
+IMAGENET_STD = [0.229, 0.224, 0.225]
+
+INPUT_SHAPE = (3, 224, 224)
+
+# Short side after the first resize
+RESIZE_SIZE = 256
+
+# ToTensor + Normalize folded into one multiply-add on uint8 pixels:
+# (x / 255 - mean) / std = x * SCALE + SHIFT
+_SCALE = 1 / (255 * torch.tensor(IMAGENET_STD).view(3, 1, 1))
+_SHIFT = -torch.tensor(IMAGENET_MEAN).view(3, 1, 1) / torch.tensor(IMAGENET_STD).view(3, 1, 1)
+
+
+def build_preprocess(uint8: bool = False) -> Callable[[Image.Image], torch.Tensor]:
+    """
+    Standard ResNet-50 preprocessing: resize, center crop, normalize.
+    
+    Args:
+        uint8: Stop after the crop and return uint8 pixels; normalize_batch
+            finishes the job for a whole batch at once
+    """
+    from torchvision import transforms
+    
+    if uint8:
+        return transforms.Compose([
+            transforms.Resize(RESIZE_SIZE),
+            transforms.CenterCrop(224),
+            transforms.PILToTensor(),
+        ])
+    return transforms.Compose([
+        transforms.Resize(RESIZE_SIZE),
+        transforms.CenterCrop(224),
+        transforms.ToTensor(),
+        transforms.Normalize(mean=IMAGENET_MEAN, std=IMAGENET_STD),
+    ])
+
+
+def normalize_batch(batch: torch.Tensor) -> torch.Tensor:
+    """
+    Convert a uint8 [B, 3, 224, 224] batch into the normalized float32 model input.
+    
+    Matches ToTensor + Normalize to within float32 rounding (about 1e-6).
+    
+    Raises:
+        TypeError: If the batch is not uint8
+    """
+    if batch.dtype != torch.uint8:
+        raise TypeError(f"normalize_batch expects a uint8 batch, got {batch.dtype}")
+    # The conversion makes a new tensor, so the in-place ops below never
+    # write to the caller's batch (often a pooled buffer)
+    return batch.to(torch.float32).mul_(_SCALE).add_(_SHIFT)
+
+
+class BufferReader(io.RawIOBase):
+    """
+    Seekable read-only file over a bytes-like object, without copying it.
+    
+    io.BytesIO shares a bytes object but copies a bytearray or
+    memoryview up front, which would double the memory held for an
+    upload read into a bytearray (upload_input).
+    """
+    
+    def __init__(self, data):
+        self._view = memoryview(data).cast('B')
+        self._pos = 0
+    
+    def readable(self) -> bool:
+        return True
+    
+    def seekable(self) -> bool:
+        return True
+    
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._view) if size is None or size < 0 else min(self._pos + size, len(self._view))
+        data = bytes(self._view[self._pos:end])
+        self._pos = max(self._pos, end)
+        return data
+    
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+    
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._view)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+    
+    def tell(self) -> int:
+        return self._pos
+    
+    def close(self) -> None:
+        self._view.release()
+        super().close()
+
+
+def decode_image(data: bytes, jpeg_draft: bool = False) -> Image.Image:
+    """
+    Decode JPEG/PNG bytes into an RGB image.
+    
+    Args:
+        data: Encoded image (bytes, bytearray or memoryview)
+        jpeg_draft: Let the JPEG decoder downscale in the DCT domain (by
+            1/2, 1/4 or 1/8) to the smallest size whose short side is
+            still >= RESIZE_SIZE. A 12 MP photo then decodes at about
+            1/64 of the pixels. Other formats always decode at full size.
+            Off by default: the DCT-domain downscale is not bit-identical
+            to a full decode + resize, and its top-1/top-5 parity has not
+            been measured (benchmarks/bench_jpeg_draft.py).
+    """
+    image = Image.open(BufferReader(data))
+    if jpeg_draft and image.format == 'JPEG':
+        image.draft('RGB', (RESIZE_SIZE, RESIZE_SIZE))
+    return image.convert('RGB')
+
+
+def preprocess_bytes(
+    data: bytes,
+    preprocess: Callable,
+    jpeg_draft: bool = False,
+    timings: Optional[dict] = None
+) -> torch.Tensor:
+    """
+    Decode image bytes and return a 3x224x224 input tensor.
+    
+    If timings is given, it receives the decode and preprocess times in seconds.
+    """
+    if timings is None:
+        return preprocess(decode_image(data, jpeg_draft))
+    
+    start = time.perf_counter()
+    image = decode_image(data, jpeg_draft)
+    decoded = time.perf_counter()
+    tensor = preprocess(image)
+    timings['decode'] = decoded - start
+    timings['preprocess'] = time.perf_counter() - decoded
+    return tensor
+
+
+def preprocess_pixels(pixels: torch.Tensor, normalize: bool = True) -> torch.Tensor:
+    """
+    Preprocess already-decoded RGB pixels into a 3x224x224 input tensor.
+    
+    Args:
+        pixels: uint8 tensor of shape [3, H, W]. A 224x224 image is taken
+            as already cropped; anything else gets the same resize and
+            center crop as build_preprocess().
+        normalize: If False, return the cropped uint8 pixels (see
+            build_preprocess(uint8=True))
+    
+    Returns:
+        Normalized float32 tensor, or uint8 pixels (may be a view of
+        pixels, which is not modified)
+    """
+    from torchvision.transforms import functional as F
+    
+    if tuple(pixels.shape[1:]) != INPUT_SHAPE[1:]:
+        pixels = F.center_crop(F.resize(pixels, RESIZE_SIZE, antialias=True), INPUT_SHAPE[1:])
+    if not normalize:
+        return pixels
+    tensor = pixels.to(torch.float32).div_(255)
+    return F.normalize(tensor, IMAGENET_MEAN, IMAGENET_STD, inplace=True)
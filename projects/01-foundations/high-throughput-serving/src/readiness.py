@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Readiness checks for /ready.
+
+/health is a liveness check: it answers as long as the event loop does.
+/ready tells a load balancer whether this process should get traffic:
+
+- startup has finished, including the warmup forward pass at every batch
+  size 1..MAX_BATCH_SIZE (the monitor is only created afterwards)
+- the batching loop task is still running (it has not exited with an
+  exception or been cancelled)
+- with REPLICAS set, at least one inference replica process is alive
+- the loop is making progress: requests have not sat in the queue for
+  more than stall_timeout without a batch being dispatched or completed
+- optionally, the p99 batch inference time (the model forward pass, as
+  in the inference histogram, not batch build or postprocess) over the
+  last window seconds is under max_p99
+
+A process taken out of rotation for latency gets no new batches, so its
+window empties and it becomes ready again once the slow batches age out.
+"""
+
+import logging
+import time
+from typing import List, Optional
+
+from adaptive_batching import percentile
+from metrics import server_ready
+
+logger = logging.getLogger(__name__)
+
+
+class ReadinessMonitor:
+    """Decides whether a warmed-up BatchManager should receive traffic."""
+    
+    def __init__(
+        self,
+        batch_manager,
+        stall_timeout: float = 10.0,
+        max_p99: Optional[float] = None,
+        window: float = 30.0
+    ):
+        """
+        Initialize readiness monitor.
+        
+        Args:
+            batch_manager: Started BatchManager
+            stall_timeout: Seconds queued requests may wait without any
+                batch being dispatched or completed
+            max_p99: Highest accepted p99 batch inference time in seconds
+                (None = no latency check)
+            window: Seconds of batch history the p99 is computed over
+        """
+        self.batch_manager = batch_manager
+        self.stall_timeout = stall_timeout
+        self.max_p99 = max_p99
+        self.window = window
+        self.ready = None
+        self.last_p99 = None
+        
+        limit = "off" if max_p99 is None else f"{max_p99 * 1000:.0f}ms"
+        logger.info(
+            f"ReadinessMonitor initialized: stall_timeout={stall_timeout}s, "
+            f"max_p99={limit}, window={window}s"
+        )
+    
+    def stalled_for(self) -> float:
+        """Seconds the queue has been non-empty without a batch dispatched or completed (0 if empty)."""
+        queue = self.batch_manager.queue
+        if not queue:
+            return 0.0
+        since = max(self.batch_manager.last_progress, queue.oldest_arrival())
+        return max(0.0, time.monotonic() - since)
+    
+    def p99(self) -> Optional[float]:
+        """p99 forward-pass time of the batches completed in the window (None without any)."""
+        cutoff = time.monotonic() - self.window
+        inference_times = [
+            batch['inference_time'] for batch in self.batch_manager.recent_batches
+            if batch['completed_at'] >= cutoff and batch['inference_time'] is not None
+        ]
+        return percentile(inference_times, 99) if inference_times else None
+    
+    def check(self) -> List[str]:
+        """
+        Run all checks.
+        
+        Returns:
+            Reasons the process is not ready (empty if ready)
+        """
+        reasons = []
+        
+        task = self.batch_manager.processing_task
+        if task is None:
+            reasons.append("batching loop not running")
+        elif task.done():
+            error = None if task.cancelled() else task.exception()
+            reasons.append(f"batching loop exited: {error!r}" if error else "batching loop exited")
+        
+        alive = getattr(self.batch_manager.executor, 'alive_replicas', None)
+        if alive == 0:
+            reasons.append("no inference replica alive")
+        
+        stalled = self.stalled_for()
+        if stalled > self.stall_timeout:
+            reasons.append(
+                f"batching stalled: {len(self.batch_manager.queue)} requests queued, "
+                f"no progress for {stalled:.1f}s"
+            )
+        
+        self.last_p99 = self.p99()
+        if self.max_p99 is not None and self.last_p99 is not None and self.last_p99 > self.max_p99:
+            reasons.append(
+                f"inference p99 {self.last_p99 * 1000:.0f}ms over {self.max_p99 * 1000:.0f}ms"
+            )
+        
+        ready = not reasons
+        if ready != self.ready:
+            if ready:
+                logger.info("Ready for traffic")
+            else:
+                logger.warning(f"Not ready: {'; '.join(reasons)}")
+        self.ready = ready
+        server_ready.set(1 if ready else 0)
+        return reasons
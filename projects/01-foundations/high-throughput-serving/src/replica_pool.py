@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Multi-replica inference across CPU cores.
+
+A single process with one model saturates at whatever one intra-op thread
+pool can do. ReplicaPool starts N inference worker processes that all map
+the same copy of the ResNet-50 weights (the parameters are moved to shared
+memory before the workers start), gives each one its own batch queue, and
+sends every batch to the least-loaded replica that is still alive.
+
+A replica process that dies (OOM kill, segfault in a native kernel) is
+noticed within LIVENESS_INTERVAL: its batches fail and it gets no new
+ones. Once no replica is left, every batch fails with NoReplicaAliveError.
+
+ReplicaPool implements the same submit()/shutdown() interface as
+InferenceExecutor, so BatchManager uses it as a drop-in executor.
+"""
+
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import connection as mp_connection
+from typing import Callable, List, Optional
+
+import torch
+import torch.multiprocessing as mp
+
+from inference_executor import run_batch, set_batch_results, set_batch_exception
+from metrics import update_replica_stats
+from thread_config import available_cpus
+
+logger = logging.getLogger(__name__)
+
+# Window over which replica utilization is reported
+UTILIZATION_WINDOW = 10.0
+
+# Seconds between checks that the replica processes are still running
+LIVENESS_INTERVAL = 0.5
+
+
+class NoReplicaAliveError(RuntimeError):
+    """Raised for batches submitted after every replica process has died."""
+
+
+def _replica_main(index: int, model, batches, results, num_threads: int, prepare=None) -> None:
+    """Replica process body: run batches from this replica's queue until told to stop."""
+    torch.set_num_threads(num_threads)
+    model.eval()
+    if prepare is not None:
+        model = prepare(model)
+    results.send((index, None, 'ready', 0.0, 0.0, None))
+    
+    while True:
+        message = batches.get()
+        if message is None:
+            break
+        
+        batch_id, batch_tensor, postprocess = message
+        try:
+            # Postprocessing runs here too, so only plain results travel back
+            output, inference_time, postprocess_time = run_batch(model, batch_tensor, postprocess)
+            results.send((index, batch_id, output, inference_time, postprocess_time, None))
+        except Exception as e:
+            results.send((index, batch_id, None, 0.0, 0.0, f"{type(e).__name__}: {e}"))
+
+
+class Replica:
+    """Bookkeeping for one inference worker process."""
+    
+    def __init__(self, index: int, process, batches, results):
+        self.index = index
+        self.process = process
+        self.batches = batches
+        self.results = results
+        self.inflight = 0
+        self.busy = deque()  # (end_time, duration) of recent batches
+        self.dead = False  # set once the process is found to have exited
+    
+    def utilization(self, now: float) -> float:
+        """Fraction of the last UTILIZATION_WINDOW seconds spent in inference."""
+        while self.busy and self.busy[0][0] < now - UTILIZATION_WINDOW:
+            self.busy.popleft()
+        return min(1.0, sum(duration for _, duration in self.busy) / UTILIZATION_WINDOW)
+
+
+class ReplicaPool:
+    """Inference executor that fans batches out to replica processes."""
+    
+    def __init__(
+        self,
+        model,
+        num_replicas: int,
+        threads_per_replica: int = 0,
+        batches_per_replica: int = 2,
+        start_method: str = "spawn",
+        prepare: Optional[Callable] = None
+    ):
+        """
+        Initialize replica pool and start the replica processes.
+        
+        Args:
+            model: Loaded PyTorch model; its weights are shared, not copied
+            num_replicas: Number of inference worker processes
+            threads_per_replica: Intra-op threads per replica
+                (0 = split the available CPUs evenly)
+            batches_per_replica: Batches that may be queued on one replica.
+                More than one keeps a replica busy while results travel back.
+            start_method: multiprocessing start method
+            prepare: Run by each replica on the shared model before it
+                reports ready, e.g. a functools.partial of
+                inference_backend.load_backend. Engines that copy the
+                weights (TorchScript freezing, channels_last, ONNX Runtime)
+                give every replica its own copy.
+        """
+        self.num_replicas = num_replicas
+        self.max_inflight = num_replicas * batches_per_replica
+        
+        if threads_per_replica <= 0:
+            threads_per_replica = max(1, available_cpus() // num_replicas)
+        
+        # Move the parameters to shared memory once; every replica maps them
+        model.share_memory()
+        
+        ctx = mp.get_context(start_method)
+        self.replicas = []
+        for index in range(num_replicas):
+            batches = ctx.Queue()
+            # One pipe per replica rather than a shared results queue: a
+            # replica killed mid-write would leave a shared queue's lock
+            # held and block every other replica. The closed pipe also
+            # tells the reader the process is gone.
+            results, results_writer = ctx.Pipe(duplex=False)
+            process = ctx.Process(
+                target=_replica_main,
+                args=(index, model, batches, results_writer, threads_per_replica, prepare),
+                name=f"inference-replica-{index}",
+                daemon=True
+            )
+            process.start()
+            results_writer.close()
+            self.replicas.append(Replica(index, process, batches, results))
+        
+        self._batch_ids = itertools.count()
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._ready = 0
+        self._ready_event = threading.Event()
+        
+        # Stacking and pickling a batch happen off the event loop
+        self._dispatcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="replica-dispatch")
+        self._reader = threading.Thread(target=self._read_results, name="replica-results", daemon=True)
+        self._running = True
+        self._reader.start()
+        
+        logger.info(
+            f"ReplicaPool initialized: replicas={num_replicas}, "
+            f"threads_per_replica={threads_per_replica}"
+        )
+    
+    async def start(self, timeout: float = 120.0) -> None:
+        """Wait until every replica has loaded and reported ready."""
+        loop = asyncio.get_running_loop()
+        ready = await loop.run_in_executor(None, self._ready_event.wait, timeout)
+        if not ready:
+            raise RuntimeError(f"Only {self._ready}/{self.num_replicas} replicas became ready")
+        self._report()
+        logger.info("All inference replicas ready")
+    
+    @property
+    def alive_replicas(self) -> int:
+        """Replicas not yet found dead."""
+        return sum(not replica.dead for replica in self.replicas)
+    
+    def submit(
+        self,
+        model,
+        build_batch: Callable[[], torch.Tensor],
+        batch_items: List[dict],
+        postprocess: Optional[Callable] = None
+    ) -> asyncio.Future:
+        """
+        Send a batch to the least-loaded live replica.
+        
+        Args:
+            model: Ignored; replicas run their shared copy of the model
+            build_batch: Callable returning the batch input tensor
+            batch_items: Request items whose futures receive the results
+            postprocess: Batch postprocessing, run on the replica. Must be
+                a module-level function so it can be sent to the process.
+        
+        Returns:
+            Future resolved with the inference time once all request
+            futures have been set (failed with NoReplicaAliveError, as are
+            the request futures, if every replica has died)
+        """
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+        
+        now = time.time()
+        batch_id = next(self._batch_ids)
+        # Under the lock so _check_replicas either sees this batch pending
+        # on the replica or has already marked the replica dead
+        with self._pending_lock:
+            live = [r for r in self.replicas if not r.dead and r.process.is_alive()]
+            if live:
+                replica = min(live, key=lambda r: (r.inflight, r.utilization(now)))
+                replica.inflight += 1
+                self._pending[batch_id] = (loop, replica, batch_items, done)
+        
+        if not live:
+            exc = NoReplicaAliveError(f"All {self.num_replicas} inference replicas have died")
+            logger.error(f"Batch processing error: {exc}")
+            set_batch_exception(batch_items, exc)
+            done.set_exception(exc)
+            return done
+        
+        self._dispatcher.submit(self._send, replica, batch_id, build_batch, postprocess)
+        self._report()
+        return done
+    
+    def _send(self, replica: Replica, batch_id: int, build_batch, postprocess) -> None:
+        """Dispatcher thread: build the batch and put it on the replica's queue."""
+        try:
+            replica.batches.put((batch_id, build_batch(), postprocess))
+        except Exception as e:
+            logger.error(f"Failed to dispatch batch to replica {replica.index}: {e}", exc_info=True)
+            self._complete(batch_id, None, 0.0, e)
+    
+    def _read_results(self) -> None:
+        """Reader thread: hand finished batches back to the event loop."""
+        last_check = time.monotonic()
+        while self._running:
+            # Checked on a timer, not only when idle: under steady traffic
+            # from the other replicas wait() would never time out
+            if time.monotonic() - last_check >= LIVENESS_INTERVAL:
+                self._check_replicas()
+                last_check = time.monotonic()
+            
+            readers = {replica.results: replica for replica in self.replicas if not replica.dead}
+            if not readers:
+                time.sleep(LIVENESS_INTERVAL)
+                continue
+            for conn in mp_connection.wait(list(readers), timeout=LIVENESS_INTERVAL):
+                try:
+                    index, batch_id, output, duration, postprocess_time, error = conn.recv()
+                except (EOFError, OSError):
+                    # The replica exited and its end of the pipe closed
+                    self._mark_dead(readers[conn])
+                    continue
+                
+                if batch_id is None:
+                    self._ready += 1
+                    if self._ready == self.num_replicas:
+                        self._ready_event.set()
+                    continue
+                
+                self.replicas[index].busy.append((time.time(), duration))
+                exc = RuntimeError(f"Replica {index} failed: {error}") if error else None
+                self._complete(batch_id, output, duration, exc, postprocess_time)
+    
+    def _check_replicas(self) -> None:
+        """Mark replicas whose process has exited as dead."""
+        for replica in self.replicas:
+            if not replica.dead and not replica.process.is_alive():
+                self._mark_dead(replica)
+    
+    def _mark_dead(self, replica: Replica) -> None:
+        """Stop sending batches to a replica and fail the ones it still holds."""
+        # The pipe can close just before the process is reaped
+        replica.process.join(timeout=1.0)
+        exitcode = replica.process.exitcode
+        with self._pending_lock:
+            replica.dead = True
+            lost = [bid for bid, entry in self._pending.items() if entry[1] is replica]
+        logger.error(
+            f"Inference replica {replica.index} died (exit code {exitcode}), "
+            f"{self.alive_replicas}/{self.num_replicas} replicas left"
+        )
+        for batch_id in lost:
+            self._complete(
+                batch_id, None, 0.0,
+                RuntimeError(f"Inference replica {replica.index} died (exit code {exitcode})")
+            )
+    
+    def _complete(self, batch_id: int, output, duration: float, exc, postprocess_time: float = 0.0) -> None:
+        with self._pending_lock:
+            entry = self._pending.pop(batch_id, None)
+        if entry is None:
+            return
+        if exc is not None:
+            logger.error(f"Batch processing error: {exc}")
+        loop, replica, batch_items, done = entry
+        loop.call_soon_threadsafe(self._finish, replica, batch_items, output, duration, postprocess_time, exc, done)
+    
+    def _finish(self, replica, batch_items, output, duration, postprocess_time, exc, done) -> None:
+        """Runs on the event loop: resolve request futures and update stats."""
+        replica.inflight -= 1
+        if exc is None:
+            set_batch_results(batch_items, output, duration, postprocess_time)
+            if not done.done():
+                done.set_result(duration)
+        else:
+            set_batch_exception(batch_items, exc)
+            if not done.done():
+                done.set_exception(exc)
+        self._report()
+    
+    def _report(self) -> None:
+        now = time.time()
+        for replica in self.replicas:
+            update_replica_stats(replica.index, replica.inflight, replica.utilization(now))
+    
+    def shutdown(self) -> None:
+        """Stop the replica processes."""
+        self._running = False
+        self._dispatcher.shutdown(wait=False, cancel_futures=True)
+        for replica in self.replicas:
+            replica.batches.put(None)
+        for replica in self.replicas:
+            replica.process.join(timeout=5)
+            if replica.process.is_alive():
+                replica.process.terminate()
+        logger.info("ReplicaPool shut down")
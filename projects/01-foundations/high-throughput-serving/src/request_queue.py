@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Deadline- and priority-aware queue of pending inference requests.
+
+Requests are served by priority class first and earliest deadline first
+within a class. Requests without a deadline sort after those with one in
+the same class, in arrival order, so a queue with no deadlines or
+priorities behaves exactly like the FIFO it replaces.
+"""
+
+import heapq
+import itertools
+import math
+from typing import Callable, Iterator, List
+
+# Priority classes, most urgent first
+PRIORITY_CLASSES = {'high': 0, 'normal': 1, 'low': 2}
+DEFAULT_PRIORITY = 'normal'
+
+
+class DeadlineExceededError(Exception):
+    """Request was dropped because it could not finish before its deadline."""
+
+
+class QueueFullError(Exception):
+    """Request was rejected because the batch queue is at its admission limit."""
+    
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after  # Estimated seconds until the queue drains
+
+
+class RequestQueue:
+    """Pending request items ordered by (priority, deadline, arrival)."""
+    
+    def __init__(self):
+        self._heap = []
+        self._seq = itertools.count()
+    
+    def __len__(self) -> int:
+        return len(self._heap)
+    
+    def __bool__(self) -> bool:
+        return bool(self._heap)
+    
+    def __iter__(self) -> Iterator[dict]:
+        """Iterate over queued items in no particular order."""
+        return (entry[-1] for entry in self._heap)
+    
+    def append(self, item: dict) -> None:
+        """
+        Queue a request item.
+        
+        Uses item['priority'] (index into PRIORITY_CLASSES order) and
+        item['deadline'] (time.monotonic() seconds, or None) if present.
+        """
+        deadline = item.get('deadline')
+        key = (
+            item.get('priority', PRIORITY_CLASSES[DEFAULT_PRIORITY]),
+            math.inf if deadline is None else deadline,
+            next(self._seq)
+        )
+        heapq.heappush(self._heap, (*key, item))
+    
+    def popleft(self) -> dict:
+        """Remove and return the most urgent item."""
+        return heapq.heappop(self._heap)[-1]
+    
+    def oldest_arrival(self) -> float:
+        """Arrival time of the request that has waited longest."""
+        return min(entry[-1]['arrival_time'] for entry in self._heap)
+    
+    def earliest_deadline(self) -> float:
+        """Earliest deadline in the queue (inf if no item has one)."""
+        return min((entry[1] for entry in self._heap), default=math.inf)
+    
+    def remove_if(self, predicate: Callable[[dict], bool]) -> List[dict]:
+        """
+        Remove every item matching predicate.
+        
+        Returns:
+            Removed items
+        """
+        kept, removed = [], []
+        for entry in self._heap:
+            (removed if predicate(entry[-1]) else kept).append(entry)
+        if removed:
+            heapq.heapify(kept)
+            self._heap = kept
+        return [entry[-1] for entry in removed]
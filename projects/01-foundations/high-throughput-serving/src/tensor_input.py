@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Pre-decoded tensor input for /predict/tensor.
+
+Upstream services that already hold decoded pixels can send them as they
+are instead of re-encoding a JPEG for us to decode again. Body formats:
+
+- application/octet-stream: raw C-order bytes, with the shape in an
+  X-Tensor-Shape header (e.g. "224,224,3") and the dtype in
+  X-Tensor-Dtype (uint8 or float32, default uint8)
+- application/x-npy: a .npy file; shape and dtype come from its header
+
+Accepted arrays:
+
+- uint8 [H, W, 3] RGB pixels. 224x224 is taken as already cropped; other
+  sizes get the usual resize and center crop.
+- float32 [3, 224, 224]: a finished, normalized model input
+
+The body is wrapped with torch.frombuffer, without a copy.
+"""
+
+import math
+import warnings
+from typing import Optional, Tuple
+
+import numpy as np
+import torch
+
+from preprocessing import INPUT_SHAPE, BufferReader, preprocess_pixels
+
+NPY_CONTENT_TYPES = ("application/x-npy", "application/npy")
+
+# Largest accepted image side for uint8 pixels
+MAX_SIDE = 4096
+
+DTYPES = {
+    'uint8': torch.uint8,
+    'float32': torch.float32,
+}
+
+
+class TensorInputError(ValueError):
+    """Tensor body is malformed or has an unsupported shape or dtype."""
+
+
+def parse_shape(header: Optional[str]) -> Tuple[int, ...]:
+    """Parse an X-Tensor-Shape header such as "224,224,3"."""
+    if not header:
+        raise TensorInputError("X-Tensor-Shape header is required for raw tensor bodies")
+    try:
+        return tuple(int(dim) for dim in header.replace("x", ",").split(","))
+    except ValueError:
+        raise TensorInputError(f"Invalid X-Tensor-Shape: {header!r}") from None
+
+
+def parse_npy_header(data: bytes) -> Tuple[Tuple[int, ...], str, int]:
+    """
+    Read the header of a .npy body.
+    
+    Returns:
+        Tuple of (shape, dtype name, offset of the array data)
+    """
+    buffer = BufferReader(data)
+    try:
+        version = np.lib.format.read_magic(buffer)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(buffer)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(buffer)
+    except ValueError as e:
+        raise TensorInputError(f"Invalid .npy body: {e}") from e
+    
+    if fortran_order:
+        raise TensorInputError(".npy array must be C-contiguous (fortran_order=False)")
+    if dtype.byteorder == '>':
+        raise TensorInputError(".npy array must be little-endian")
+    return tuple(shape), dtype.name, buffer.tell()
+
+
+def validate(shape: Tuple[int, ...], dtype_name: str) -> None:
+    """Check that shape/dtype is one of the accepted inputs."""
+    if dtype_name == 'uint8':
+        if len(shape) != 3 or shape[2] != 3:
+            raise TensorInputError(f"uint8 input must be [H, W, 3] RGB pixels, got {list(shape)}")
+        if not all(1 <= side <= MAX_SIDE for side in shape[:2]):
+            raise TensorInputError(f"Image sides must be between 1 and {MAX_SIDE}, got {list(shape[:2])}")
+    elif dtype_name == 'float32':
+        if shape != INPUT_SHAPE:
+            raise TensorInputError(f"float32 input must be {list(INPUT_SHAPE)}, got {list(shape)}")
+    else:
+        raise TensorInputError(f"Unsupported dtype {dtype_name!r} (use {' or '.join(DTYPES)})")
+
+
+def tensor_from_body(
+    data: bytes,
+    content_type: str,
+    shape_header: Optional[str] = None,
+    dtype_header: Optional[str] = None
+) -> Tuple[torch.Tensor, str]:
+    """
+    Validate a tensor body and wrap it without copying.
+    
+    Args:
+        data: Request body
+        content_type: application/octet-stream or application/x-npy
+        shape_header: X-Tensor-Shape (raw bodies only)
+        dtype_header: X-Tensor-Dtype (raw bodies only)
+    
+    Returns:
+        Tuple of (tensor viewing the body, input format string for the
+        prediction cache key)
+    
+    Raises:
+        TensorInputError: If the body is malformed or not an accepted input
+    """
+    if content_type in NPY_CONTENT_TYPES:
+        shape, dtype_name, offset = parse_npy_header(data)
+    else:
+        shape, dtype_name, offset = parse_shape(shape_header), dtype_header or 'uint8', 0
+    validate(shape, dtype_name)
+    
+    dtype = DTYPES[dtype_name]
+    count = math.prod(shape)
+    expected = count * dtype.itemsize
+    if len(data) - offset != expected:
+        raise TensorInputError(
+            f"Body holds {len(data) - offset} bytes of array data, "
+            f"{list(shape)} {dtype_name} needs {expected}"
+        )
+    
+    # The tensor is never written to, so ignore torch's warning about
+    # wrapping a non-writable buffer (a bytes body)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        tensor = torch.frombuffer(data, dtype=dtype, count=count, offset=offset).view(shape)
+    
+    if dtype_name == 'float32' and not torch.isfinite(tensor).all():
+        raise TensorInputError("float32 input contains NaN or Inf")
+    
+    return tensor, f"tensor:{dtype_name}:{'x'.join(map(str, shape))}"
+
+
+def to_model_input(tensor: torch.Tensor, normalize: bool = True) -> torch.Tensor:
+    """
+    Turn a validated body tensor into a 3x224x224 model input.
+    
+    Args:
+        tensor: Tensor returned by tensor_from_body
+        normalize: If False, return uint8 pixels for a uint8 batch queue
+            (normalized per batch by preprocessing.normalize_batch)
+    
+    Raises:
+        TensorInputError: For a float32 input when normalize is False; an
+            already normalized input cannot join a uint8 batch
+    """
+    if tensor.dtype == torch.uint8:
+        return preprocess_pixels(tensor.permute(2, 0, 1), normalize)
+    if not normalize:
+        raise TensorInputError("float32 input is not accepted by this server (UINT8_INPUTS=1); send uint8 pixels")
+    return tensor
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Torch thread-pool sizing for each serving worker process.
+
+By default every process starts one intra-op thread per core. With
+several uvicorn workers, or several batches in flight per worker, the
+pools oversubscribe the cores and the threads thrash each other.
+configure_threads sizes the pools per worker instead:
+
+- the CPU budget is the process affinity mask, capped by the cgroup CPU
+  quota (cgroup v2 cpu.max or v1 cpu.cfs_quota_us), so a container
+  limited to 2 CPUs on a 64-core node plans for 2
+- intra-op threads = budget // (workers * concurrent batches per worker)
+- inter-op threads = 1: ResNet-50 has no parallel graph branches
+- optionally each worker claims a slot (a lock file held for its
+  lifetime) and pins itself to that slot's disjoint set of cores. Child
+  processes (preprocessing workers, replicas) inherit the pinning.
+
+bench_thread_sweep.py measures the best workers x threads split for a
+host and writes it to a JSON file that config.py reads as defaults.
+"""
+
+import logging
+import os
+import tempfile
+from typing import List, Optional
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+# Kept open for the life of the process; the lock is the worker slot
+_slot_lock = None
+
+
+def cgroup_cpu_limit() -> Optional[float]:
+    """CPU quota of this process's cgroup in CPUs, or None if unlimited."""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        return quota / period if quota > 0 else None
+    except (OSError, ValueError):
+        return None
+
+
+def allowed_cpus() -> List[int]:
+    """CPU ids this process may run on."""
+    try:
+        return sorted(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS/Windows
+        return list(range(os.cpu_count() or 1))
+
+
+def available_cpus() -> int:
+    """CPUs this process can use: the affinity mask, capped by the cgroup quota."""
+    cpus = len(allowed_cpus())
+    limit = cgroup_cpu_limit()
+    if limit is not None:
+        cpus = min(cpus, max(1, int(limit)))
+    return cpus
+
+
+def plan_threads(
+    workers: int = 1,
+    concurrency: int = 1,
+    intra_op: int = 0,
+    inter_op: int = 0
+) -> dict:
+    """
+    Size the thread pools of one worker process.
+    
+    Args:
+        workers: Serving worker processes sharing the CPU budget
+        concurrency: Batches one worker runs at once (INFERENCE_THREADS)
+        intra_op: Intra-op threads (0 = split the budget)
+        inter_op: Inter-op threads (0 = 1)
+    
+    Returns:
+        Plan with available_cpus, cpus_per_worker, intra_op_threads and
+        inter_op_threads
+    """
+    cpus = available_cpus()
+    per_worker = max(1, cpus // max(1, workers))
+    return {
+        'available_cpus': cpus,
+        'cpus_per_worker': per_worker,
+        'intra_op_threads': intra_op or max(1, per_worker // max(1, concurrency)),
+        'inter_op_threads': inter_op or 1,
+    }
+
+
+def claim_worker_slot(workers: int, lock_dir: Optional[str] = None) -> Optional[int]:
+    """
+    Claim a free worker index in 0..workers-1 for the life of this process.
+    
+    Each index is an flock on a file in lock_dir; the lock goes away with
+    the process, so a restarted worker reuses its predecessor's index.
+    The default lock_dir is keyed by the parent PID, which all uvicorn
+    workers of one server share.
+    
+    Returns:
+        Worker index, or None if all are taken
+    """
+    global _slot_lock
+    import fcntl
+    
+    lock_dir = lock_dir or os.path.join(tempfile.gettempdir(), f"resnet50-serving-{os.getppid()}")
+    os.makedirs(lock_dir, exist_ok=True)
+    for index in range(workers):
+        lock = open(os.path.join(lock_dir, f"worker-{index}.lock"), "w")
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock.close()
+            continue
+        _slot_lock = lock
+        return index
+    return None
+
+
+def pin_to_slot(index: int, cpus_per_worker: int) -> List[int]:
+    """Restrict this process to the index-th block of cpus_per_worker allowed CPUs."""
+    cpus = allowed_cpus()[index * cpus_per_worker:(index + 1) * cpus_per_worker]
+    if cpus:
+        os.sched_setaffinity(0, cpus)
+    return cpus
+
+
+def configure_threads(
+    workers: int = 1,
+    concurrency: int = 1,
+    intra_op: int = 0,
+    inter_op: int = 0,
+    pin: bool = False
+) -> dict:
+    """
+    Size (and optionally pin) this worker's torch thread pools.
+    
+    Must run before the first forward pass: the inter-op pool cannot be
+    resized once it has started.
+    
+    Args:
+        workers: Serving worker processes on this host/container
+        concurrency: Batches this worker runs at once
+        intra_op: Intra-op threads (0 = automatic)
+        inter_op: Inter-op threads (0 = automatic)
+        pin: Pin this worker to its own set of cores
+    
+    Returns:
+        The plan (see plan_threads), plus worker_index and pinned_cpus
+        when pinning
+    """
+    plan = plan_threads(workers, concurrency, intra_op, inter_op)
+    
+    if pin:
+        index = claim_worker_slot(workers)
+        if index is None:
+            logger.warning(f"No free worker slot among {workers}, not pinning")
+        else:
+            plan['worker_index'] = index
+            plan['pinned_cpus'] = pin_to_slot(index, plan['cpus_per_worker'])
+            if not plan['pinned_cpus']:
+                logger.warning(f"More workers than CPUs, worker {index} not pinned")
+    
+    torch.set_num_threads(plan['intra_op_threads'])
+    try:
+        torch.set_num_interop_threads(plan['inter_op_threads'])
+    except RuntimeError as e:
+        # Inter-op pool already started (e.g. configured twice in one process)
+        logger.warning(f"Inter-op threads left at {torch.get_num_interop_threads()}: {e}")
+    
+    logger.info(f"Thread pools configured: {plan}")
+    return plan
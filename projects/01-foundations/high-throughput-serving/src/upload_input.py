@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Streaming image upload ingestion for /predict.
+
+FastAPI's UploadFile path spools a multipart file into a
+SpooledTemporaryFile (on disk above 1 MB) and then reads it back, so an
+upload is copied at least twice before decoding starts, and nothing
+limits its size. Here the body is read straight from the ASGI stream:
+
+- multipart/form-data: parsed incrementally with python-multipart; the
+  `file` part's data is kept as memoryviews of the received chunks
+- image/* or application/octet-stream: the body is the encoded image
+
+Either way each received chunk is copied once, into a bytearray
+preallocated to the declared Content-Length (grown as data arrives when
+there is none), and the decoder reads that buffer in place
+(preprocessing.BufferReader): the body is held in memory once. The body
+size is checked against Content-Length before reading, and again while
+streaming, so an oversized upload is refused (BodyTooLargeError, 413)
+without being buffered.
+"""
+
+from typing import Optional, Tuple
+
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.datastructures import FormData
+from starlette.requests import Request
+
+RAW_CONTENT_TYPES = ("application/octet-stream",)
+
+
+class UploadError(ValueError):
+    """Request body is not a readable image upload."""
+
+
+class BodyTooLargeError(UploadError):
+    """Request body exceeds the configured maximum size."""
+
+
+def _check_length(request: Request, max_bytes: int) -> int:
+    """Declared Content-Length (0 if absent); refuses a body already declared too large."""
+    length = request.headers.get("content-length")
+    if length is None or not length.isdigit():
+        return 0
+    if int(length) > max_bytes:
+        raise BodyTooLargeError(f"Request body of {int(length)} bytes exceeds the {max_bytes} byte limit")
+    return int(length)
+
+
+class _BodyBuffer:
+    """
+    Single bytearray that received data is copied into.
+    
+    Preallocated to the declared body size, so nothing is joined or
+    reallocated at the end; without a size it grows as data arrives.
+    """
+    
+    def __init__(self, size: int):
+        self.data = bytearray(size)
+        self.length = 0
+    
+    def write(self, chunk) -> None:
+        end = self.length + len(chunk)
+        if end <= len(self.data):
+            self.data[self.length:end] = chunk
+        else:
+            # Replacing the (short) tail with the chunk grows the buffer
+            self.data[self.length:] = chunk
+        self.length = end
+    
+    def getvalue(self) -> bytearray:
+        """The data written so far; the buffer itself, trimmed in place."""
+        del self.data[self.length:]
+        return self.data
+
+
+async def _stream(request: Request, max_bytes: int):
+    """Yield body chunks, raising BodyTooLargeError once more than max_bytes arrived."""
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > max_bytes:
+            raise BodyTooLargeError(f"Request body exceeds the {max_bytes} byte limit")
+        yield chunk
+
+
+async def read_body(request: Request, max_bytes: int) -> bytearray:
+    """Read the whole request body into one buffer, refusing more than max_bytes."""
+    buffer = _BodyBuffer(_check_length(request, max_bytes))
+    async for chunk in _stream(request, max_bytes):
+        buffer.write(chunk)
+    return buffer.getvalue()
+
+
+async def read_multipart_file(request: Request, max_bytes: int, field: str = "file") -> Tuple[bytearray, Optional[str]]:
+    """
+    Stream a multipart/form-data body and return one file part.
+    
+    Args:
+        request: Request with a multipart/form-data body
+        max_bytes: Largest accepted body (all parts)
+        field: Form field name of the file part
+    
+    Returns:
+        Tuple of (file data as a bytearray, client filename or None)
+    
+    Raises:
+        UploadError: If the body is malformed or has no such part
+        BodyTooLargeError: If the body exceeds max_bytes
+    """
+    _, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if not boundary:
+        raise UploadError("multipart/form-data body without a boundary")
+    
+    # The file part is never larger than the whole body
+    buffer = _BodyBuffer(_check_length(request, max_bytes))
+    state = {'header_field': b"", 'header_value': b"", 'disposition': b"", 'in_file': False, 'done': False}
+    filename = None
+    
+    def on_part_begin():
+        state.update(header_field=b"", header_value=b"", disposition=b"")
+    
+    def on_header_field(data, start, end):
+        state['header_field'] += data[start:end]
+    
+    def on_header_value(data, start, end):
+        state['header_value'] += data[start:end]
+    
+    def on_header_end():
+        if state['header_field'].lower() == b"content-disposition":
+            state['disposition'] = state['header_value']
+        state.update(header_field=b"", header_value=b"")
+    
+    def on_headers_finished():
+        nonlocal filename
+        _, options = parse_options_header(state['disposition'])
+        state['in_file'] = not state['done'] and options.get(b"name") == field.encode()
+        if state['in_file'] and b"filename" in options:
+            filename = options[b"filename"].decode("utf-8", "replace")
+    
+    def on_part_data(data, start, end):
+        if state['in_file']:
+            buffer.write(memoryview(data)[start:end])
+    
+    def on_part_end():
+        if state['in_file']:
+            state.update(in_file=False, done=True)
+    
+    parser = MultipartParser(boundary, {
+        'on_part_begin': on_part_begin,
+        'on_header_field': on_header_field,
+        'on_header_value': on_header_value,
+        'on_header_end': on_header_end,
+        'on_headers_finished': on_headers_finished,
+        'on_part_data': on_part_data,
+        'on_part_end': on_part_end,
+    })
+    try:
+        async for chunk in _stream(request, max_bytes):
+            parser.write(chunk)
+        parser.finalize()
+    except MultipartParseError as e:
+        raise UploadError(f"Malformed multipart body: {e}") from e
+    
+    if not state['done']:
+        raise UploadError(f"multipart/form-data body has no `{field}` part")
+    return buffer.getvalue(), filename
+
+
+async def read_form(request: Request, max_bytes: int, max_files: int = 1000) -> FormData:
+    """
+    Parse a multipart/form-data body with Starlette, refusing more than max_bytes.
+    
+    For requests with several file parts (/predict/batch); file parts are
+    spooled as UploadFile, as with FastAPI's File(). The caller closes the
+    returned form.
+    
+    Raises:
+        BodyTooLargeError: If the body exceeds max_bytes
+        HTTPException: 400 if the body is malformed (raised by Starlette)
+    """
+    _check_length(request, max_bytes)
+    chunks = _stream(request, max_bytes)
+    
+    async def receive():
+        chunk = await anext(chunks, None)
+        return {"type": "http.request", "body": chunk or b"", "more_body": chunk is not None}
+    
+    return await Request(request.scope, receive).form(max_files=max_files)
+
+
+async def read_image_upload(request: Request, max_bytes: int) -> Tuple[bytearray, Optional[str], str]:
+    """
+    Read an encoded image from a multipart `file` part or a raw image body.
+    
+    Returns:
+        Tuple of (encoded image as a bytearray, client filename or None, "multipart" or "raw")
+    
+    Raises:
+        UploadError: For an unsupported Content-Type or malformed body
+        BodyTooLargeError: If the body exceeds max_bytes
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type == "multipart/form-data":
+        data, filename = await read_multipart_file(request, max_bytes)
+        return data, filename, "multipart"
+    if content_type.startswith("image/") or content_type in RAW_CONTENT_TYPES:
+        return await read_body(request, max_bytes), None, "raw"
+    raise UploadError(
+        f"Unsupported Content-Type {content_type or '(none)'!r}: send multipart/form-data "
+        f"with a `file` part, or the image itself as image/jpeg, image/png, ..."
+    )
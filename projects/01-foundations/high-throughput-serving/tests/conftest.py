@@ -0,0 +1,6 @@
+"""pytest setup: the modules under test live in src/ (flat, like the benchmarks import them)."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
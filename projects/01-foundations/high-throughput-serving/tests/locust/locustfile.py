@@ -5,11 +5,15 @@ Locust load testing for ResNet-50 serving API.
 Usage:
     Basic: locust -f tests/locust/locustfile.py
     Headless: locust -f tests/locust/locustfile.py --headless -u 10 -r 2 -t 60s
+    Mixed images (prediction cache): locust -f tests/locust/locustfile.py \
+        --image-mode mixed --unique-fraction 0.3 --repeated-images 20
 """
 
 from locust import HttpUser, task, between, events
 import os
+import random
 import time
+import uuid
 import logging
 
 # Setup logging
@@ -28,6 +32,36 @@ if not os.path.exists(IMAGE_PATH):
 
 logger.info(f"Test image found: {IMAGE_PATH}")
 
+with open(IMAGE_PATH, 'rb') as f:
+    IMAGE_BYTES = f.read()
+
+
+def image_variant(tag: str) -> bytes:
+    """
+    Same picture, different bytes.
+    
+    JPEG decoders stop at the end-of-image marker, so a trailer changes the
+    content hash (and the prediction cache key) without changing the image.
+    """
+    return IMAGE_BYTES + tag.encode()
+
+
+@events.init_command_line_parser.add_listener
+def add_image_options(parser):
+    """Options for mixing unique and repeated uploads."""
+    parser.add_argument(
+        "--image-mode", choices=["same", "mixed"], default="same",
+        help="same: always upload dog.jpg; mixed: mix unique and repeated images"
+    )
+    parser.add_argument(
+        "--unique-fraction", type=float, default=0.3,
+        help="Share of never-seen-before uploads in mixed mode"
+    )
+    parser.add_argument(
+        "--repeated-images", type=int, default=20,
+        help="Number of distinct images the repeated uploads are drawn from"
+    )
+
 
 class ResNetUser(HttpUser):
     """
@@ -35,8 +69,12 @@ class ResNetUser(HttpUser):
     
     User behavior:
     - Waits 1-3 seconds between requests (realistic user behavior)
-    - Sends image for prediction
+    - Sends image for prediction (the same image, or a unique/repeated
+      mix with --image-mode mixed)
     - Tracks success/failure
+    - Counts 429 (queue full) answers as rejections, reported separately
+      as "predict (rejected)" so they don't skew predict latencies
+    - Reports cache hits separately as "predict (cached)"
     """
     
     # Wait time between requests (simulates think time)
@@ -46,6 +84,8 @@ class ResNetUser(HttpUser):
     request_count = 0
     success_count = 0
     failure_count = 0
+    rejected_count = 0
+    cached_count = 0
     
     def on_start(self):
         """Called when a user starts. Setup goes here."""
@@ -59,6 +99,15 @@ class ResNetUser(HttpUser):
                 logger.error(f"API health check failed: {response.status_code}")
                 response.failure("Health check failed")
     
+    def next_image(self) -> bytes:
+        """Pick the bytes to upload for the current image mode."""
+        options = self.environment.parsed_options
+        if options is None or options.image_mode == "same":
+            return IMAGE_BYTES
+        if random.random() < options.unique_fraction:
+            return image_variant(f"unique-{uuid.uuid4().hex}")
+        return image_variant(f"repeated-{random.randrange(options.repeated_images)}")
+    
     @task(10)  # Weight: 10 (more common)
     def predict_image(self):
         """
@@ -67,39 +116,48 @@ class ResNetUser(HttpUser):
         """
         ResNetUser.request_count += 1
         
-        with open(IMAGE_PATH, 'rb') as image_file:
-            files = {'file': ('dog.jpg', image_file, 'image/jpeg')}
+        files = {'file': ('dog.jpg', self.next_image(), 'image/jpeg')}
+        
+        with self.client.post(
+            "/predict",
+            files=files,
+            catch_response=True,
+            name="predict"  # Groups requests in UI
+        ) as response:
             
-            with self.client.post(
-                "/predict",
-                files=files,
-                catch_response=True,
-                name="predict"  # Groups requests in UI
-            ) as response:
+            if response.status_code == 200:
+                ResNetUser.success_count += 1
+                data = response.json()
                 
-                if response.status_code == 200:
-                    ResNetUser.success_count += 1
-                    data = response.json()
+                # Validate response structure
+                if 'predictions' in data and len(data['predictions']) > 0:
+                    top_prediction = data['predictions'][0]['class_name']
+                    confidence = data['predictions'][0]['confidence']
+                    latency = data.get('latency_ms', 0)
+                    if data.get('cached'):
+                        # Reported separately to compare against full inference
+                        ResNetUser.cached_count += 1
+                        response.request_meta["name"] = "predict (cached)"
                     
-                    # Validate response structure
-                    if 'predictions' in data and len(data['predictions']) > 0:
-                        top_prediction = data['predictions'][0]['class_name']
-                        confidence = data['predictions'][0]['confidence']
-                        latency = data.get('latency_ms', 0)
-                        
-                        logger.debug(
-                            f"Success: {top_prediction} "
-                            f"({confidence:.2%}) in {latency:.0f}ms"
-                        )
-                        response.success()
-                    else:
-                        logger.warning("Response missing predictions")
-                        response.failure("Invalid response structure")
-                        ResNetUser.failure_count += 1
+                    logger.debug(
+                        f"Success: {top_prediction} "
+                        f"({confidence:.2%}) in {latency:.0f}ms"
+                    )
+                    response.success()
                 else:
+                    logger.warning("Response missing predictions")
+                    response.failure("Invalid response structure")
                     ResNetUser.failure_count += 1
-                    logger.error(f"Request failed: {response.status_code}")
-                    response.failure(f"Got status {response.status_code}")
+            elif response.status_code == 429:
+                # Admission control backpressure, not a failure
+                ResNetUser.rejected_count += 1
+                response.request_meta["name"] = "predict (rejected)"
+                logger.debug(f"Rejected, Retry-After: {response.headers.get('Retry-After')}s")
+                response.success()
+            else:
+                ResNetUser.failure_count += 1
+                logger.error(f"Request failed: {response.status_code}")
+                response.failure(f"Got status {response.status_code}")
     
     @task(1)  # Weight: 1 (less common)
     def check_health(self):
@@ -146,6 +204,11 @@ def on_test_stop(environment, **kwargs):
     logger.info(f"Total requests: {ResNetUser.request_count}")
     logger.info(f"Successful: {ResNetUser.success_count}")
     logger.info(f"Failed: {ResNetUser.failure_count}")
+    logger.info(f"Rejected (429): {ResNetUser.rejected_count}")
+    
+    if ResNetUser.success_count > 0:
+        cache_rate = (ResNetUser.cached_count / ResNetUser.success_count) * 100
+        logger.info(f"Served from cache: {ResNetUser.cached_count} ({cache_rate:.2f}%)")
     
     if ResNetUser.request_count > 0:
         success_rate = (ResNetUser.success_count / ResNetUser.request_count) * 100
@@ -0,0 +1,64 @@
+"""BatchManager deadline scheduling."""
+
+import asyncio
+import time
+
+import pytest
+import torch
+
+from batch_manager import BatchManager
+from inference_executor import InferenceExecutor
+from request_queue import DeadlineExceededError
+
+
+def double(batch):
+    return batch * 2
+
+
+async def predict(manager, deadline_in):
+    """Queue one request with a deadline deadline_in seconds from now; returns (result, seconds taken)."""
+    manager.start(double)
+    start = time.monotonic()
+    try:
+        result, _ = await manager.add_to_batch(torch.ones(3), "r1", deadline=start + deadline_in)
+        return result, time.monotonic() - start
+    finally:
+        manager.stop()
+
+
+def test_deadline_dispatches_early_and_is_served():
+    # max_wait_time alone would hold the request for 1s; its deadline
+    # forces a dispatch at about 0.3 - 0.1s, and it must then be run
+    # rather than shed as too late
+    manager = BatchManager(max_batch_size=8, max_wait_time=1.0, sample_interval=0)
+    manager.service_time_estimate = 0.1
+    
+    result, elapsed = asyncio.run(predict(manager, deadline_in=0.3))
+    
+    assert torch.equal(result, torch.full((3,), 2.0))
+    assert 0.15 < elapsed < 0.3
+    assert manager.shed_counts['deadline'] == 0
+
+
+def test_request_that_can_no_longer_make_its_deadline_is_shed():
+    manager = BatchManager(
+        max_batch_size=1, max_wait_time=1.0, executor=InferenceExecutor(num_threads=1), sample_interval=0
+    )
+    manager.service_time_estimate = 0.1
+    
+    async def run():
+        # The first batch occupies the only inference slot for 0.4s, so
+        # the second request cannot start before its deadline minus 0.1s
+        def slow(batch):
+            time.sleep(0.4)
+            return batch
+        manager.start(slow)
+        blocker = asyncio.ensure_future(manager.add_to_batch(torch.ones(3), "blocker"))
+        await asyncio.sleep(0.01)
+        with pytest.raises(DeadlineExceededError):
+            await manager.add_to_batch(torch.ones(3), "late", deadline=time.monotonic() + 0.3)
+        await blocker
+        manager.stop()
+    
+    asyncio.run(run())
+    assert manager.shed_counts['deadline'] == 1
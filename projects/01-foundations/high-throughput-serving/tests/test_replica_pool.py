@@ -0,0 +1,79 @@
+"""ReplicaPool handling of replica processes that die."""
+
+import asyncio
+import os
+import signal
+import time
+
+import pytest
+import torch
+
+from replica_pool import LIVENESS_INTERVAL, NoReplicaAliveError, ReplicaPool
+
+
+def make_items(loop, count):
+    return [{'request_id': f"r{i}", 'future': loop.create_future()} for i in range(count)]
+
+
+async def run_batch(pool, count=2):
+    """Submit a batch of count ones-rows; returns the request results."""
+    items = make_items(asyncio.get_running_loop(), count)
+    done = pool.submit(None, lambda: torch.ones(count, 3), items)
+    _, *results = await asyncio.gather(done, *(item['future'] for item in items))
+    return [result for result, _ in results]
+
+
+def kill(replica):
+    os.kill(replica.process.pid, signal.SIGKILL)
+    replica.process.join(timeout=10)
+
+
+def test_killed_replica_is_skipped_and_pool_fails_once_none_alive():
+    pool = ReplicaPool(torch.nn.Identity(), num_replicas=2, threads_per_replica=1)
+    
+    async def run():
+        await pool.start(timeout=60)
+        
+        # With one replica killed, every batch goes to the other one
+        kill(pool.replicas[0])
+        for _ in range(4):
+            results = await run_batch(pool)
+            assert all(torch.equal(result, torch.ones(3)) for result in results)
+        await asyncio.sleep(LIVENESS_INTERVAL * 3)
+        assert pool.replicas[0].dead
+        assert pool.alive_replicas == 1
+        
+        kill(pool.replicas[1])
+        await asyncio.sleep(LIVENESS_INTERVAL * 3)
+        assert pool.alive_replicas == 0
+        
+        with pytest.raises(NoReplicaAliveError):
+            await run_batch(pool)
+    
+    try:
+        asyncio.run(run())
+    finally:
+        pool.shutdown()
+
+
+def test_batch_on_a_replica_that_dies_fails():
+    pool = ReplicaPool(torch.nn.Identity(), num_replicas=1, threads_per_replica=1)
+    
+    async def run():
+        await pool.start(timeout=60)
+        
+        # The process is stopped, not gone, so the batch sits in its queue
+        # until the liveness check notices the kill
+        os.kill(pool.replicas[0].process.pid, signal.SIGSTOP)
+        submitted = asyncio.ensure_future(run_batch(pool))
+        await asyncio.sleep(0.1)
+        start = time.monotonic()
+        kill(pool.replicas[0])
+        with pytest.raises(RuntimeError, match="replica 0 died"):
+            await asyncio.wait_for(submitted, timeout=10)
+        assert time.monotonic() - start < LIVENESS_INTERVAL * 4
+    
+    try:
+        asyncio.run(run())
+    finally:
+        pool.shutdown()